@@ -0,0 +1,76 @@
+"""
+Benchmarks of reading configs with large numeric sequences, stored as lists (the default)
+vs. stored compactly (see ``figura.arrays``).
+
+See runner.py for running it.
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+
+from figura import read_config
+from figura.settings import set_setting
+
+
+################################################################################
+# Parameters
+
+NUM_ITEMS = 1000000
+
+PACKAGE_NAME = 'figura_bench_arrays'
+
+CONFIG = '''
+class tables:
+    boundaries = [i * 0.5 for i in range(%(n)d)]
+    counts = list(range(%(n)d))
+''' % dict(n=NUM_ITEMS)
+
+
+################################################################################
+
+_tempdir = None
+
+
+def setup():
+    global _tempdir
+    _tempdir = tempfile.mkdtemp(prefix='figura_bench_')
+    pkg_dir = os.path.join(_tempdir, PACKAGE_NAME)
+    os.mkdir(pkg_dir)
+    for filename, content in [('__init__.fig', ''), ('tables.fig', CONFIG)]:
+        with open(os.path.join(pkg_dir, filename), 'w') as f:
+            f.write(content)
+    sys.path.insert(0, _tempdir)
+
+
+def teardown():
+    sys.path.remove(_tempdir)
+    sys.path_importer_cache.pop(_tempdir, None)
+    shutil.rmtree(_tempdir)
+
+
+def _read(storage):
+    orig = set_setting('COMPACT_SEQUENCES', storage)
+    try:
+        return read_config('%s.tables' % PACKAGE_NAME)
+    finally:
+        set_setting('COMPACT_SEQUENCES', orig)
+
+
+################################################################################
+# Benchmarks
+
+def time_read_lists():
+    _read(None)
+
+
+def time_read_compact_array():
+    _read('array')
+
+
+def time_to_json_compact_array():
+    _read('array').to_json()
+
+
+################################################################################
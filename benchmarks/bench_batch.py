@@ -0,0 +1,63 @@
+"""
+Benchmarks of batch rendering (``figura_print --batch``), compared to rendering each job
+from scratch.
+
+See runner.py for running it.
+"""
+
+import sys
+import shutil
+import tempfile
+
+from figura.tools.render import render_config
+from figura.tools.batch import BatchJob, run_batch
+from figura.tools.figura_gen import generate_config_tree
+
+
+################################################################################
+# Parameters
+
+NUM_ENVS = 5    # number of jobs per override-set, each with different extra overrides
+
+PACKAGE_NAME = 'figura_bench_batch'
+GEN_PARAMS = dict(num_files=10, num_override_files=10, overrides_per_file=20, seed=0)
+
+
+################################################################################
+
+_tempdir = None
+_data = {}
+
+
+def setup():
+    global _tempdir
+    _tempdir = tempfile.mkdtemp(prefix='figura_bench_')
+    info = generate_config_tree(_tempdir, PACKAGE_NAME, **GEN_PARAMS)
+    sys.path.insert(0, _tempdir)
+    _data['jobs'] = [
+        BatchJob('%s-%d' % (ov_path, env), (target, ov_path), {'env_id': env}, 'json', None)
+        for ov_path, (target, _) in sorted(info.override_sets.items())
+        for env in range(NUM_ENVS)
+    ]
+
+
+def teardown():
+    sys.path.remove(_tempdir)
+    sys.path_importer_cache.pop(_tempdir, None)
+    shutil.rmtree(_tempdir)
+    _data.clear()
+
+
+################################################################################
+# Benchmarks
+
+def time_render_uncached():
+    for job in _data['jobs']:
+        render_config(job.configs, job.overrides, fmt=job.format)
+
+
+def time_render_batch():
+    run_batch(_data['jobs'])
+
+
+################################################################################
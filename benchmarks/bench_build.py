@@ -0,0 +1,113 @@
+"""
+Benchmarks of building configs, and applying overrides.
+
+See runner.py for running it.
+"""
+
+import sys
+import shutil
+import tempfile
+
+from figura import read_config, build_config, ConfigContainer, ConfigOverrideSet
+from figura.tools.figura_gen import generate_config_tree
+
+
+################################################################################
+# Parameters
+
+NUM_SECTIONS = 50          # number of sections in the base config
+NUM_KEYS = 20              # number of keys in each section
+NUM_OVERRIDE_SETS = 200    # length of the override chain
+
+PACKAGE_NAME = 'figura_bench_build'
+GEN_PARAMS = dict(num_files=5, num_override_files=20, overrides_per_file=50, seed=0)
+
+
+################################################################################
+
+_tempdir = None
+_data = {}
+
+
+def setup():
+    global _tempdir
+    _data['base'] = ConfigContainer.from_dict({
+        's%d' % section: {
+            'k%d' % key: key for key in range(NUM_KEYS)
+        }
+        for section in range(NUM_SECTIONS)
+    })
+    _data['override_sets'] = [
+        ConfigOverrideSet.from_dict({
+            's%d' % (i % NUM_SECTIONS): {'k%d' % (i % NUM_KEYS): -i},
+            's%d.k%d' % ((i + 1) % NUM_SECTIONS, (i + 1) % NUM_KEYS): -i,
+        })
+        for i in range(NUM_OVERRIDE_SETS)
+    ]
+    # a single override-set, overriding every key of the base config (using dotted keys)
+    _data['large_override_set'] = ConfigOverrideSet({
+        's%d.k%d' % (section, key): -key
+        for section in range(NUM_SECTIONS)
+        for key in range(NUM_KEYS)
+    })
+
+    # generated config files, and all the override-set files applied to them:
+    _tempdir = tempfile.mkdtemp(prefix='figura_bench_')
+    info = generate_config_tree(_tempdir, PACKAGE_NAME, **GEN_PARAMS)
+    sys.path.insert(0, _tempdir)
+    _data['gen_base'] = read_config(info.modules[0])
+    _data['gen_override_sets'] = [read_config(path) for path in sorted(info.override_sets)]
+    _data['gen_override_paths'] = [
+        path for path, (target, _) in sorted(info.override_sets.items())
+        if target == info.modules[0]
+    ]
+    _data['gen_module'] = info.modules[0]
+
+
+def teardown():
+    sys.path.remove(_tempdir)
+    sys.path_importer_cache.pop(_tempdir, None)
+    shutil.rmtree(_tempdir)
+    _data.clear()
+
+
+################################################################################
+# Benchmarks
+
+def time_build_config_override_chain():
+    base = _data['base'].copy()  # a shallow copy is enough for timing purposes
+    build_config(base, *_data['override_sets'])
+
+
+def time_apply_overrides_with_callback():
+    base = _data['base'].copy()
+    for ov in _data['override_sets']:
+        base.apply_overrides(ov, callback=_noop)
+
+
+def time_apply_large_override_set_with_callback():
+    base = _data['base'].copy()
+    base.apply_overrides(_data['large_override_set'], callback=_noop)
+
+
+def time_apply_large_override_set_audit():
+    base = _data['base'].copy()
+    base.apply_overrides(_data['large_override_set'], audit=True)
+
+
+def time_apply_generated_overrides():
+    base = _data['gen_base'].copy()
+    for ov in _data['gen_override_sets']:
+        # override-sets of other configs may add new keys, which is fine for timing purposes
+        base.apply_overrides(ov)
+
+
+def time_build_config_generated():
+    build_config(_data['gen_module'], *_data['gen_override_paths'])
+
+
+def _noop(*args):
+    pass
+
+
+################################################################################
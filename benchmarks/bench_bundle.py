@@ -0,0 +1,75 @@
+"""
+Benchmarks of reading a config at startup (in a fresh interpreter), from figura files vs.
+from a bundle (see ``figura.bundle``).
+
+See runner.py for running it.
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import subprocess
+
+from figura.bundle import build_bundle
+from figura.tools.figura_gen import generate_config_tree
+
+
+################################################################################
+# Parameters
+
+PACKAGE_NAME = 'figura_bench_bundle'
+GEN_PARAMS = dict(num_files=100, seed=0)
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+READ_SCRIPT = 'import sys; from figura import read_config; read_config(sys.argv[1])'
+
+
+################################################################################
+
+_tempdir = None
+_data = {}
+
+
+def setup():
+    global _tempdir
+    _tempdir = tempfile.mkdtemp(prefix='figura_bench_')
+    info = generate_config_tree(_tempdir, PACKAGE_NAME, **GEN_PARAMS)
+    sys.path.insert(0, _tempdir)
+    bundle_file = os.path.join(_tempdir, 'bench.figbundle')
+    build_bundle(PACKAGE_NAME, bundle_file)
+    env = dict(os.environ)
+    env.pop('FIGURA_BUNDLE_FILE', None)
+    env['PYTHONPATH'] = os.pathsep.join([ROOT_DIR, _tempdir])
+    _data['env'] = env
+    _data['bundle_env'] = dict(env, FIGURA_BUNDLE_FILE=bundle_file)
+    # a config importing others, in the middle of the package:
+    _data['path'] = sorted(info.modules)[len(info.modules) // 2]
+
+
+def teardown():
+    sys.path.remove(_tempdir)
+    sys.path_importer_cache.pop(_tempdir, None)
+    shutil.rmtree(_tempdir)
+    _data.clear()
+
+
+def _run(env):
+    subprocess.check_call(
+        [sys.executable, '-c', READ_SCRIPT, _data['path']], env=env, cwd=ROOT_DIR,
+        stdout=subprocess.DEVNULL)
+
+
+################################################################################
+# Benchmarks
+
+def time_startup_read_source():
+    _run(_data['env'])
+
+
+def time_startup_read_bundle():
+    _run(_data['bundle_env'])
+
+
+################################################################################
@@ -0,0 +1,99 @@
+"""
+Benchmarks of parsing CLI overrides, with multi-megabyte override strings (e.g. long
+host lists).
+
+See runner.py for running it.
+"""
+
+import argparse
+
+from figura import ConfigContainer
+from figura.cli import (
+    add_override_argument, split_list_value, escape_list_value, _dict_from_string,
+    compile_override_coercer)
+
+
+################################################################################
+# Parameters
+
+NUM_ENTRIES = 100000    # number of entries in the list values
+LONG_VALUE_LEN = 2 ** 21  # length of a single (escaped) value
+NUM_SECTIONS = 100      # sections of the config to coerce overrides to
+NUM_KEYS = 100          # keys per section
+NUM_OVERRIDES = 500     # number of overrides to coerce
+
+
+################################################################################
+
+_data = {}
+
+
+def setup():
+    hosts = ['host-%06d.dc1.example.com:8080' % i for i in range(NUM_ENTRIES)]
+    # ~3.5MB, nothing escaped:
+    _data['host_list'] = ','.join(hosts)
+    # ~3.5MB, with the commas inside the values escaped:
+    _data['escaped_host_list'] = ','.join(
+        escape_list_value('%s,%s' % (hosts[i], hosts[i + 1])) for i in range(0, NUM_ENTRIES, 2))
+    # a single ~2MB value, with some escaped chars:
+    _data['long_value'] = escape_list_value(('x' * 1000 + ',@') * (LONG_VALUE_LEN // 1002))
+    # many overrides in one string:
+    _data['overrides'] = ','.join(
+        'section%d.key%d=%s' % (i % 100, i, hosts[i]) for i in range(NUM_ENTRIES))
+    # overrides with list values (escaped commas):
+    _data['list_overrides'] = ','.join(
+        'pool%d.hosts=%s' % (i, escape_list_value(','.join(hosts[i:i + 10])))
+        for i in range(0, NUM_ENTRIES, 10))
+    parser = argparse.ArgumentParser()
+    add_override_argument(parser)
+    _data['parser'] = parser
+    # a config with typed values, and overrides of them:
+    value_types = [1, 1.5, True, 'x', [1, 2], ('a', 'b')]
+    _data['typed_config'] = ConfigContainer.from_dict({
+        's%d' % i: {'k%d' % j: value_types[j % len(value_types)] for j in range(NUM_KEYS)}
+        for i in range(NUM_SECTIONS)
+    })
+    override_values = ['7', '2.5', 'yes', 'y', '3,4', 'c,d']
+    _data['typed_overrides'] = ConfigContainer({
+        's%d.k%d' % (i % NUM_SECTIONS, i % NUM_KEYS): override_values[i % NUM_KEYS % 6]
+        for i in range(NUM_OVERRIDES)
+    })
+    _data['coercer'] = compile_override_coercer(_data['typed_config'])
+
+
+def teardown():
+    _data.clear()
+
+
+################################################################################
+# Benchmarks
+
+def time_split_host_list():
+    split_list_value(_data['host_list'])
+
+
+def time_split_escaped_host_list():
+    split_list_value(_data['escaped_host_list'])
+
+
+def time_split_long_value():
+    split_list_value(_data['long_value'])
+
+
+def time_dict_from_string():
+    _dict_from_string(_data['overrides'])
+
+
+def time_parse_override_args():
+    _data['parser'].parse_args(['-O', _data['overrides'], '-O', _data['list_overrides']])
+
+
+def time_compile_override_coercer():
+    compile_override_coercer(_data['typed_config'])
+
+
+def time_coerce_overrides():
+    _data['coercer'](_data['typed_overrides'])
+
+
+################################################################################
@@ -0,0 +1,91 @@
+"""
+Benchmarks of converting between python constructs, dicts, ConfigContainers and
+python-strings, on wide and deep trees.
+
+See runner.py for running it.
+"""
+
+import types
+
+from figura import ConfigContainer
+from figura.parser import ConfigParser
+
+
+################################################################################
+# Parameters
+
+WIDE_NUM_SECTIONS = 2000  # number of top-level sections
+WIDE_NUM_KEYS = 20        # number of keys in each section
+DEEP_NESTING = 5000       # nesting depth of the deep trees (way beyond the recursion limit)
+
+
+################################################################################
+# Generating the data
+
+def _gen_wide_module():
+    module = types.ModuleType('figura_bench_wide')
+    for section in range(WIDE_NUM_SECTIONS):
+        attrs = {'k%d' % key: key for key in range(WIDE_NUM_KEYS)}
+        attrs['table'] = {'t%d' % key: [key, float(key)] for key in range(WIDE_NUM_KEYS)}
+        attrs['nested'] = type('nested', (), {'n': section})
+        setattr(module, 's%d' % section, type('s%d' % section, (), attrs))
+    return module
+
+
+def _gen_wide_dict():
+    return {
+        's%d' % section: dict(
+            {'k%d' % key: key for key in range(WIDE_NUM_KEYS)},
+            nested={'n': section})
+        for section in range(WIDE_NUM_SECTIONS)
+    }
+
+
+def _gen_deep_dict():
+    root = cur = {}
+    for depth in range(DEEP_NESTING):
+        cur['x%d' % depth] = depth
+        cur['sub'] = {}
+        cur = cur['sub']
+    return root
+
+
+_data = {}
+
+
+def setup():
+    _data['wide_module'] = _gen_wide_module()
+    _data['wide_dict'] = _gen_wide_dict()
+    _data['wide_container'] = ConfigContainer.from_dict(_data['wide_dict'])
+    _data['deep_dict'] = _gen_deep_dict()
+    _data['deep_container'] = ConfigContainer.from_dict(_data['deep_dict'])
+
+
+def teardown():
+    _data.clear()
+
+
+################################################################################
+# Benchmarks
+
+def time_python_to_conf_wide():
+    ConfigParser()._python_to_conf(_data['wide_module'])
+
+
+def time_from_dict_wide():
+    ConfigContainer.from_dict(_data['wide_dict'])
+
+
+def time_from_dict_deep():
+    ConfigContainer.from_dict(_data['deep_dict'])
+
+
+def time_to_python_string_wide():
+    _data['wide_container'].to_python_string()
+
+
+def time_to_python_string_deep():
+    _data['deep_container'].to_python_string()
+
+
+################################################################################
@@ -0,0 +1,73 @@
+"""
+Benchmarks of flat (dotted-key) conversions of a large config, and of dotted-key lookups using
+the cached flat view vs. ``deep_getattr``.
+
+See runner.py for running it.
+"""
+
+from figura.container import ConfigContainer
+
+
+################################################################################
+# Parameters
+
+NUM_SECTIONS = 500   # number of top-level sections
+NUM_KEYS = 20        # number of keys in each nested section
+NUM_LOOKUPS = 10000
+
+KEY = 'section250.nested.deeper.k10'
+
+
+################################################################################
+
+_config = None
+_flat = None
+_other = None
+
+
+def setup():
+    global _config, _flat, _other
+    _config = ConfigContainer()
+    for i in range(NUM_SECTIONS):
+        deeper = ConfigContainer(('k%d' % j, j) for j in range(NUM_KEYS))
+        _config['section%d' % i] = ConfigContainer(
+            nested=ConfigContainer(deeper=deeper, name='s%d' % i))
+    _flat = _config.flatten()
+    _config.flat_view()
+    _other = ConfigContainer(a=ConfigContainer(b=0))
+
+
+def teardown():
+    global _config, _flat, _other
+    _config = _flat = _other = None
+
+
+################################################################################
+# Benchmarks
+
+def time_flatten():
+    _config.flatten()
+
+
+def time_unflatten():
+    ConfigContainer.unflatten(_flat)
+
+
+def time_lookups_deep_getattr():
+    for _ in range(NUM_LOOKUPS):
+        _config.deep_getattr(KEY)
+
+
+def time_lookups_flat_view():
+    for _ in range(NUM_LOOKUPS):
+        _config.flat_view()[KEY]
+
+
+def time_lookups_flat_view_other_config_modified():
+    # modifying another config doesn't invalidate the view
+    for i in range(NUM_LOOKUPS):
+        _other.deep_setattr('a.b', i)
+        _config.flat_view()[KEY]
+
+
+################################################################################
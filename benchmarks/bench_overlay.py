@@ -0,0 +1,108 @@
+"""
+Benchmarks of parsing overlay-heavy configs, i.e. configs with deep and wide
+hierarchies of containers which are built through inheritance.
+
+See runner.py for running it.
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+
+from figura import read_config
+from figura.tools.figura_gen import generate_config_tree
+
+
+################################################################################
+# Parameters
+
+DEEP_NUM_LEVELS = 20     # length of the inheritance chain
+DEEP_NESTING = 40        # nesting depth of the sections overlaid by each level
+
+WIDE_NUM_LEVELS = 4      # length of the inheritance chain
+WIDE_NUM_SECTIONS = 200  # number of sections overlaid by each level
+WIDE_NUM_KEYS = 10       # number of keys in each section
+
+PACKAGE_NAME = 'figura_bench_overlay'
+
+# a generated package, where most sections are derived from others (and overlay them)
+GEN_PACKAGE_NAME = 'figura_bench_overlay_gen'
+GEN_PARAMS = dict(
+    num_files=10, num_sections=20, section_depth=4, inherit_density=0.8, import_density=0.8,
+    overlay_density=0.9, opaque_density=0.05, num_override_files=0, seed=0,
+)
+
+
+################################################################################
+# Generating the configs
+
+def _gen_deep():
+    lines = []
+    for level in range(DEEP_NUM_LEVELS):
+        base = '(L%d)' % (level - 1) if level else ''
+        lines.append('class L%d%s:' % (level, base))
+        for depth in range(DEEP_NESTING):
+            indent = '    ' * (depth + 1)
+            lines.append('%sk%d = %d' % (indent, level, level))
+            lines.append('%sclass s:' % (indent, ))
+        lines.append('%sk%d = %d' % ('    ' * (DEEP_NESTING + 1), level, level))
+    return lines
+
+
+def _gen_wide():
+    lines = []
+    for level in range(WIDE_NUM_LEVELS):
+        base = '(L%d)' % (level - 1) if level else ''
+        lines.append('class L%d%s:' % (level, base))
+        for section in range(WIDE_NUM_SECTIONS):
+            lines.append('    class s%d:' % (section, ))
+            for key in range(WIDE_NUM_KEYS):
+                lines.append('        k%d_%d = %d' % (level, key, key))
+            lines.append('        class nested:')
+            lines.append('            k%d = %d' % (level, level))
+    return lines
+
+
+_tempdir = None
+
+
+def setup():
+    global _tempdir
+    _tempdir = tempfile.mkdtemp(prefix='figura_bench_')
+    pkg_dir = os.path.join(_tempdir, PACKAGE_NAME)
+    os.mkdir(pkg_dir)
+    files = {
+        '__init__.fig': [],
+        'deep.fig': _gen_deep(),
+        'wide.fig': _gen_wide(),
+    }
+    for filename, lines in files.items():
+        with open(os.path.join(pkg_dir, filename), 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+    generate_config_tree(_tempdir, GEN_PACKAGE_NAME, **GEN_PARAMS)
+    sys.path.insert(0, _tempdir)
+
+
+def teardown():
+    sys.path.remove(_tempdir)
+    sys.path_importer_cache.pop(_tempdir, None)
+    shutil.rmtree(_tempdir)
+
+
+################################################################################
+# Benchmarks
+
+def time_deep_overlay():
+    read_config('%s.deep' % PACKAGE_NAME, enable_path_spliting=False)
+
+
+def time_wide_overlay():
+    read_config('%s.wide' % PACKAGE_NAME, enable_path_spliting=False)
+
+
+def time_generated_overlay():
+    read_config(GEN_PACKAGE_NAME)
+
+
+################################################################################
@@ -0,0 +1,74 @@
+"""
+Benchmarks of querying a large config by path patterns (see ``figura.query``), compared to
+walking the config for each lookup.
+
+See runner.py for running it.
+"""
+
+from figura.container import ConfigContainer
+from figura.query import query
+
+
+################################################################################
+# Parameters
+
+NUM_SERVICES = 500   # number of top-level sections
+NUM_KEYS = 20        # number of keys in each nested section
+
+
+################################################################################
+
+_config = None
+
+
+def setup():
+    global _config
+    _config = ConfigContainer()
+    for i in range(NUM_SERVICES):
+        service = ConfigContainer(
+            enabled=bool(i % 2),
+            db=ConfigContainer(host='db%d' % i, port=5000 + i),
+            limits=ConfigContainer(('k%d' % j, j) for j in range(NUM_KEYS)),
+        )
+        _config['service%d' % i] = service
+    query(_config, '**')  # build the index
+
+
+def teardown():
+    global _config
+    _config = None
+
+
+def _walk(config, path=()):
+    # the straightforward alternative: a recursive walk per lookup
+    for k, v in config.items():
+        yield path + (k, ), v
+        if isinstance(v, ConfigContainer):
+            yield from _walk(v, path + (k, ))
+
+
+################################################################################
+# Benchmarks
+
+def time_walk_last_key():
+    [v for p, v in _walk(_config) if len(p) == 3 and p[1] == 'db' and p[2] == 'host']
+
+
+def time_query_last_key():
+    query(_config, '*.db.host')
+
+
+def time_query_recursive_wildcard():
+    query(_config, '**.limits.*')
+
+
+def time_query_predicate():
+    query(_config, '*[enabled == True].db[port > 5200]')
+
+
+def time_build_index():
+    _config['service0'].enabled = True  # invalidates the index
+    query(_config, 'service0')
+
+
+################################################################################
@@ -0,0 +1,100 @@
+"""
+Benchmarks of reading configs: ``read_config`` (cold and warm), reading packages,
+resolving paths and accessing values.
+
+The configs are generated using ``figura.tools.figura_gen``.
+
+See runner.py for running it.
+"""
+
+import sys
+import shutil
+import tempfile
+import importlib
+
+from figura import read_config
+from figura.path import FiguraPath
+from figura.importutils import FiguraImportContext
+from figura.settings import set_setting
+from figura.tools.figura_gen import generate_config_tree
+
+
+################################################################################
+# Parameters
+
+PACKAGE_NAME = 'figura_bench_read'
+GEN_PARAMS = dict(num_files=50, num_override_files=0, seed=0)
+
+
+################################################################################
+
+_tempdir = None
+_data = {}
+
+
+def setup():
+    global _tempdir
+    _tempdir = tempfile.mkdtemp(prefix='figura_bench_')
+    info = generate_config_tree(_tempdir, PACKAGE_NAME, **GEN_PARAMS)
+    sys.path.insert(0, _tempdir)
+    # the deepest module, and the deepest leaf in it
+    module = max(info.modules, key=lambda path: (path.count('.'), path))
+    leaf = max(info.leaves[module], key=lambda path: (path.count('.'), path))
+    _data['module'] = module
+    _data['leaf'] = leaf
+    _data['leaf_path'] = '%s.%s' % (module, leaf)
+    _data['config'] = read_config(module)
+
+
+def teardown():
+    sys.path.remove(_tempdir)
+    _drop_finder_caches()
+    shutil.rmtree(_tempdir)
+    _data.clear()
+
+
+def _drop_finder_caches():
+    for path in list(sys.path_importer_cache):
+        if path.startswith(_tempdir):
+            del sys.path_importer_cache[path]
+    importlib.invalidate_caches()
+
+
+################################################################################
+# Benchmarks
+
+def time_read_config_cold():
+    _drop_finder_caches()
+    read_config(_data['module'])
+
+
+def time_read_config_warm():
+    read_config(_data['module'])
+
+
+def time_read_config_attr_path():
+    read_config(_data['leaf_path'])
+
+
+def time_read_package():
+    read_config(PACKAGE_NAME)
+
+
+def time_split_parts():
+    with FiguraImportContext():
+        FiguraPath(_data['leaf_path']).split_parts()
+
+
+def time_split_parts_no_probe_cache():
+    orig = set_setting('IMPORT_PROBE_CACHE', False)
+    try:
+        time_split_parts()
+    finally:
+        set_setting('IMPORT_PROBE_CACHE', orig)
+
+
+def time_deep_getattr():
+    _data['config'].deep_getattr(_data['leaf'])
+
+
+################################################################################
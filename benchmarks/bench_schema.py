@@ -0,0 +1,75 @@
+"""
+Benchmarks of compiling schemas, and validating configs against them (configs with 100k
+leaves).
+
+See runner.py for running it.
+"""
+
+from figura import ConfigContainer
+from figura.schema import Schema
+
+
+################################################################################
+# Parameters
+
+NUM_SECTIONS = 1000   # top-level sections
+NUM_SUBSECTIONS = 4   # subsections per section
+NUM_KEYS = 20         # keys per (sub)section
+
+FIELDS = [
+    ('int(0..)', 1),
+    ('float(0..1)', 0.5),
+    ('str(1..)', 'value'),
+    ('bool', True),
+    ('str{debug,info,warning}', 'info'),
+    ('list[str]', ['a', 'b']),
+    ('int?', None),
+]
+
+
+################################################################################
+
+_data = {}
+
+
+def _make_section(make_leaf):
+    return {'k%d' % i: make_leaf(FIELDS[i % len(FIELDS)]) for i in range(NUM_KEYS)}
+
+
+def _make_tree(make_leaf):
+    return {
+        's%d' % i: dict(
+            _make_section(make_leaf),
+            **{'sub%d' % j: _make_section(make_leaf) for j in range(NUM_SUBSECTIONS)})
+        for i in range(NUM_SECTIONS)
+    }
+
+
+def setup():
+    _data['schema_spec'] = _make_tree(lambda field: field[0])
+    _data['config'] = ConfigContainer.from_dict(_make_tree(lambda field: field[1]))
+    _data['schema'] = Schema(_data['schema_spec'])
+    _data['strict_schema'] = Schema(_data['schema_spec'], allow_extra_keys=False)
+    assert not _data['schema'].validate(_data['config'])
+
+
+def teardown():
+    _data.clear()
+
+
+################################################################################
+# Benchmarks
+
+def time_compile_schema():
+    Schema(_data['schema_spec'])
+
+
+def time_validate():
+    _data['schema'].validate(_data['config'])
+
+
+def time_validate_strict():
+    _data['strict_schema'].validate(_data['config'])
+
+
+################################################################################
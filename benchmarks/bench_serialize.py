@@ -0,0 +1,57 @@
+"""
+Benchmarks of serializing and deserializing ConfigContainers.
+
+See runner.py for running it.
+"""
+
+from figura import ConfigContainer
+
+
+################################################################################
+# Parameters
+
+NUM_SECTIONS = 500  # number of top-level sections
+NUM_KEYS = 20       # number of keys in each section
+
+
+################################################################################
+
+_data = {}
+
+
+def setup():
+    config = ConfigContainer.from_dict({
+        's%d' % section: dict(
+            {'k%d' % key: 'value%d' % key for key in range(NUM_KEYS)},
+            nested={'n': section, 'values': list(range(NUM_KEYS))},
+        )
+        for section in range(NUM_SECTIONS)
+    })
+    _data['config'] = config
+    _data['json'] = config.to_json()
+
+
+def teardown():
+    _data.clear()
+
+
+################################################################################
+# Benchmarks
+
+def time_to_json():
+    _data['config'].to_json()
+
+
+def time_from_json():
+    ConfigContainer.from_json(_data['json'])
+
+
+def time_to_dict():
+    _data['config'].to_dict()
+
+
+def time_to_python_string():
+    _data['config'].to_python_string()
+
+
+################################################################################
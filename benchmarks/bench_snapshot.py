@@ -0,0 +1,94 @@
+"""
+Benchmarks of reading a config from several threads while another thread keeps replacing it:
+using a `ConfigSnapshotHolder` (lock-free reads), vs. a dict guarded by a lock.
+
+See runner.py for running it.
+"""
+
+import threading
+
+from figura.container import ConfigContainer
+from figura.snapshot import ConfigSnapshotHolder
+
+
+################################################################################
+# Parameters
+
+NUM_READERS = 4
+NUM_READS = 20000   # per reader
+NUM_SECTIONS = 50   # sections of the config
+
+
+################################################################################
+
+_config = None
+
+
+def setup():
+    global _config
+    _config = ConfigContainer.from_dict({
+        's%d' % i: {'host': 'h%d' % i, 'port': i} for i in range(NUM_SECTIONS)
+    })
+
+
+def teardown():
+    global _config
+    _config = None
+
+
+def _run(read, publish):
+    # NUM_READERS threads read, while a writer thread keeps publishing
+    stop = threading.Event()
+
+    def write():
+        while not stop.is_set():
+            publish(_config)
+            stop.wait(0.001)
+
+    def read_many():
+        for _ in range(NUM_READS):
+            read()
+
+    writer = threading.Thread(target=write)
+    readers = [threading.Thread(target=read_many) for _ in range(NUM_READERS)]
+    writer.start()
+    for t in readers:
+        t.start()
+    for t in readers:
+        t.join()
+    stop.set()
+    writer.join()
+
+
+################################################################################
+# Benchmarks
+
+def time_snapshot_holder():
+    holder = ConfigSnapshotHolder(_config)
+
+    def read():
+        config = holder.get()
+        return config.s10.host, config.s10.port
+
+    _run(read, holder.publish)
+
+
+def time_locked_dict():
+    lock = threading.Lock()
+    current = {'config': _config.copy()}
+
+    def read():
+        # the lock is held while reading, so the writer can't replace the config midway
+        with lock:
+            config = current['config']
+            return config.s10.host, config.s10.port
+
+    def publish(config):
+        config = config.copy()
+        with lock:
+            current['config'] = config
+
+    _run(read, publish)
+
+
+################################################################################
@@ -0,0 +1,47 @@
+"""
+End-to-end benchmarks of running ``figura_print`` (including interpreter startup).
+
+See runner.py for running it.
+"""
+
+import os
+import sys
+import subprocess
+
+
+################################################################################
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_env = None
+
+
+def setup():
+    global _env
+    _env = dict(os.environ)
+    _env['PYTHONPATH'] = os.pathsep.join(
+        [ROOT_DIR] + [p for p in [os.environ.get('PYTHONPATH')] if p])
+
+
+def _run(*args):
+    subprocess.check_call(
+        [sys.executable] + list(args), env=_env, cwd=ROOT_DIR, stdout=subprocess.DEVNULL)
+
+
+################################################################################
+# Benchmarks
+
+def time_python_startup():
+    # the baseline: an interpreter doing nothing
+    _run('-c', 'pass')
+
+
+def time_import_figura():
+    _run('-c', 'import figura')
+
+
+def time_figura_print():
+    _run('-m', 'figura.tools.figura_print', 'figura.hello_world')
+
+
+################################################################################
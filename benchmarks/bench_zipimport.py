@@ -0,0 +1,65 @@
+"""
+Benchmarks of reading a generated config package from a directory vs. from a zip archive.
+
+See runner.py for running it.
+"""
+
+import os
+import sys
+import shutil
+import zipfile
+import tempfile
+
+from figura import read_config
+from figura.tools.figura_gen import generate_config_tree
+
+
+################################################################################
+# Parameters
+
+DIR_PACKAGE_NAME = 'figura_bench_zip_dir'
+ZIP_PACKAGE_NAME = 'figura_bench_zip_zip'
+GEN_PARAMS = dict(num_files=100, seed=0)
+
+
+################################################################################
+
+_tempdir = None
+_archive = None
+
+
+def setup():
+    global _tempdir, _archive
+    _tempdir = tempfile.mkdtemp(prefix='figura_bench_')
+    generate_config_tree(_tempdir, DIR_PACKAGE_NAME, **GEN_PARAMS)
+    # the same package, zipped (under a different name):
+    info = generate_config_tree(_tempdir, ZIP_PACKAGE_NAME, **GEN_PARAMS)
+    _archive = os.path.join(_tempdir, 'configs.zip')
+    with zipfile.ZipFile(_archive, 'w') as zf:
+        for dirpath, _, filenames in os.walk(info.package_dir):
+            for filename in filenames:
+                filename = os.path.join(dirpath, filename)
+                zf.write(filename, os.path.relpath(filename, _tempdir))
+    shutil.rmtree(info.package_dir)
+    sys.path[:0] = [_tempdir, _archive]
+
+
+def teardown():
+    for path in [_tempdir, _archive]:
+        sys.path.remove(path)
+        sys.path_importer_cache.pop(path, None)
+    shutil.rmtree(_tempdir)
+
+
+################################################################################
+# Benchmarks
+
+def time_read_package_dir():
+    read_config(DIR_PACKAGE_NAME)
+
+
+def time_read_package_zip():
+    read_config(ZIP_PACKAGE_NAME)
+
+
+################################################################################
@@ -0,0 +1,127 @@
+#! /usr/bin/env python3
+"""
+Check the time it takes to ``import figura``, using ``python -X importtime``.
+
+The import is run several times (in fresh interpreters), and the fastest cumulative
+import time of the ``figura`` package is taken.  The check fails (exit status 1) if:
+
+- it is slower than the baseline (see ``--save`` and ``--baseline``) by more than the
+  threshold, or slower than ``--max-ms``
+- any of the modules which are expected to be imported lazily (e.g. ``json``,
+  ``argparse``) is imported by ``import figura``
+
+Usage::
+
+    % python benchmarks/check_importtime.py --save importtime.json
+    # ... make changes ...
+    % python benchmarks/check_importtime.py --baseline importtime.json
+"""
+
+import os
+import re
+import sys
+import json
+import argparse
+import subprocess
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_REPEAT = 20
+DEFAULT_THRESHOLD = 0.1  # 10%
+
+# modules which ``import figura`` should not import:
+LAZY_MODULES = ['json', 'argparse', 'inspect', 'figura.utils', 'figura.parser']
+
+_IMPORTTIME_LINE_RE = re.compile(r'import time:\s*(\d+) \|\s*(\d+) \|( *)(\S+)')
+
+
+################################################################################
+
+def measure_import(module='figura'):
+    """
+    Import ``module`` in a fresh interpreter.
+
+    :return: a dict mapping names of the modules imported (by it) to their cumulative
+        import time, in microseconds
+    """
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        [ROOT_DIR] + [p for p in [os.environ.get('PYTHONPATH')] if p])
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import %s' % module],
+        env=env, cwd=ROOT_DIR, stderr=subprocess.PIPE, universal_newlines=True, check=True)
+    times = {}
+    collecting = False
+    # the modules imported by ``module`` are listed right before it, indented:
+    for line in proc.stderr.splitlines():
+        m = _IMPORTTIME_LINE_RE.match(line)
+        if m is None:
+            continue
+        cumulative, indent, name = int(m.group(2)), len(m.group(3)), m.group(4)
+        if indent == 1 and name != module:
+            # a top-level import, before ours
+            times.clear()
+            collecting = False
+            continue
+        collecting = True
+        times[name] = cumulative
+    if not collecting or module not in times:
+        raise RuntimeError('Failed parsing the output of -X importtime:\n%s' % proc.stderr)
+    return times
+
+
+def main():
+    args = getopt()
+
+    runs = [measure_import() for _ in range(args.repeat)]
+    best = min(run['figura'] for run in runs) / 1000.
+    print('import figura: %.2f ms (best of %d)' % (best, args.repeat))
+
+    failures = []
+    imported = set().union(*runs)
+    for module in LAZY_MODULES:
+        if module in imported:
+            failures.append('%s is imported by "import figura"' % module)
+
+    if args.max_ms is not None and best > args.max_ms:
+        failures.append('%.2f ms is over the limit of %.2f ms' % (best, args.max_ms))
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['import_figura_ms']
+        ratio = best / baseline
+        print('baseline: %.2f ms (x%.2f)' % (baseline, ratio))
+        if ratio > 1 + args.threshold:
+            failures.append('%.2f ms is slower than the baseline (%.2f ms) by more than %d%%' % (
+                best, baseline, args.threshold * 100))
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(dict(import_figura_ms=best), f)
+
+    for failure in failures:
+        print('FAILED: %s' % failure)
+    return 1 if failures else 0
+
+
+################################################################################
+
+def getopt():
+    parser = argparse.ArgumentParser(description='Check the time it takes to import figura')
+    parser.add_argument('-r', '--repeat', type=int, default=DEFAULT_REPEAT,
+                        help='''number of times to import, in fresh interpreters''')
+    parser.add_argument('--baseline', metavar='FILE',
+                        help='''compare to a baseline recorded using --save''')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='''relative slowdown (compared to the baseline) considered a
+                        regression. Defaults to %s''' % DEFAULT_THRESHOLD)
+    parser.add_argument('--max-ms', type=float,
+                        help='''fail if importing takes longer than this''')
+    parser.add_argument('--save', metavar='FILE', help='''record the result to FILE''')
+    return parser.parse_args()
+
+
+################################################################################
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,137 @@
+#! /usr/bin/env python3
+"""
+Measure the private memory (USS) of forked workers reading configs loaded by their master
+process, with and without ``figura.memory.preload_for_fork``.
+
+Generates a config package (using ``figura.tools.figura_gen``).  For each mode, a master
+process reads it (``plain``: using ``read_config``, ``preload``: using ``preload_for_fork``),
+and forks workers.  Each worker reads all the values of the config, runs a full garbage
+collection (as workers eventually do), reads all the values again, and reports its USS
+(private memory, from ``/proc/self/smaps_rollup``) and how much it grew since the fork.
+
+Linux only.
+
+Usage::
+
+    % python benchmarks/fork_uss.py --num-files 200 --num-workers 4
+"""
+
+import gc
+import os
+import sys
+import shutil
+import argparse
+import tempfile
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from figura import read_config  # noqa: E402
+from figura.container import iter_dotted_items  # noqa: E402
+from figura.memory import preload_for_fork  # noqa: E402
+from figura.tools.figura_gen import generate_config_tree  # noqa: E402
+
+PACKAGE_NAME = 'figura_fork_uss'
+
+MODES = ['plain', 'preload']
+
+
+################################################################################
+
+def main():
+    args = getopt()
+    tempdir = tempfile.mkdtemp(prefix='figura_fork_')
+    sys.path.insert(0, tempdir)
+    try:
+        generate_config_tree(tempdir, PACKAGE_NAME, num_files=args.num_files, seed=args.seed)
+        print('%10s %18s %18s' % ('mode', 'worker USS (KiB)', 'growth (KiB)'))
+        for mode in MODES:
+            results = run_master(mode, args.num_workers)
+            uss = sum(r[0] for r in results) / len(results)
+            growth = sum(r[1] for r in results) / len(results)
+            print('%10s %18.0f %18.0f' % (mode, uss, growth))
+    finally:
+        sys.path.remove(tempdir)
+        shutil.rmtree(tempdir)
+
+
+def run_master(mode, num_workers):
+    """
+    Load the config in a new (master) process, and fork workers from it.
+
+    :return: a list of 2-tuples, one per worker: (USS, USS growth since the fork), in KiB
+    """
+    r, w = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(r)
+        try:
+            if mode == 'preload':
+                config, = preload_for_fork([PACKAGE_NAME])
+            else:
+                config = read_config(PACKAGE_NAME)
+            results = [run_worker(config) for _ in range(num_workers)]
+            os.write(w, repr(results).encode())
+        finally:
+            os._exit(0)
+    os.close(w)
+    with os.fdopen(r) as f:
+        results = eval(f.read())
+    os.waitpid(pid, 0)
+    return results
+
+
+def run_worker(config):
+    r, w = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(r)
+        try:
+            uss_at_fork = get_uss()
+            read_all(config)
+            gc.collect()
+            read_all(config)
+            uss = get_uss()
+            os.write(w, repr((uss, uss - uss_at_fork)).encode())
+        finally:
+            os._exit(0)
+    os.close(w)
+    with os.fdopen(r) as f:
+        result = eval(f.read())
+    os.waitpid(pid, 0)
+    return result
+
+
+def read_all(config):
+    values = [value for _, value in iter_dotted_items(config)]
+    del values
+
+
+def get_uss():
+    """
+    :return: the private memory of the current process, in KiB
+    """
+    uss = 0
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            if line.startswith(('Private_Clean:', 'Private_Dirty:')):
+                uss += int(line.split()[1])
+    return uss
+
+
+###############################################################################
+
+def getopt():
+    parser = argparse.ArgumentParser(
+        description='Measure the private memory of forked workers reading configs')
+    parser.add_argument('--num-files', type=int, default=200,
+                        help='''the size of the package to generate''')
+    parser.add_argument('--num-workers', type=int, default=4)
+    parser.add_argument('--seed', type=int, default=0)
+    return parser.parse_args()
+
+
+###############################################################################
+
+if __name__ == '__main__':
+    main()
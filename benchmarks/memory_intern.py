@@ -0,0 +1,88 @@
+#! /usr/bin/env python3
+"""
+Measure the memory saved by deduplicating the strings of configs (``figura.memory``).
+
+Generates config packages (using ``figura.tools.figura_gen``), reads each one with and
+without the ``INTERN_STRINGS`` setting, and reports the memory retained by the read config
+(measured using ``tracemalloc``).
+
+Usage::
+
+    % python benchmarks/memory_intern.py --num-files 50 200
+"""
+
+import gc
+import os
+import sys
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from figura import read_config  # noqa: E402
+from figura.settings import set_setting  # noqa: E402
+from figura.tools.figura_gen import generate_config_tree  # noqa: E402
+
+PACKAGE_NAME = 'figura_memory_intern'
+
+
+################################################################################
+
+def main():
+    args = getopt()
+    tempdir = tempfile.mkdtemp(prefix='figura_memory_')
+    sys.path.insert(0, tempdir)
+    try:
+        print('%10s %14s %14s %10s' % ('files', 'plain (KiB)', 'interned (KiB)', 'saved'))
+        for num_files in args.num_files:
+            package = '%s_%d' % (PACKAGE_NAME, num_files)
+            generate_config_tree(tempdir, package, num_files=num_files, seed=args.seed)
+            plain = measure(package, intern_strings=False)
+            interned = measure(package, intern_strings=True)
+            print('%10d %14.1f %14.1f %9.1f%%' % (
+                num_files, plain / 1024, interned / 1024, 100. * (plain - interned) / plain))
+    finally:
+        sys.path.remove(tempdir)
+        shutil.rmtree(tempdir)
+
+
+def measure(package, intern_strings):
+    """
+    :return: the number of bytes retained by the config read
+    """
+    orig = set_setting('INTERN_STRINGS', intern_strings)
+    try:
+        read_config(package)  # warm-up, so only the config itself is measured
+        gc.collect()
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            config = read_config(package)
+            gc.collect()
+            after = tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+    finally:
+        set_setting('INTERN_STRINGS', orig)
+    del config
+    return after - before
+
+
+###############################################################################
+
+def getopt():
+    parser = argparse.ArgumentParser(
+        description='Measure the memory saved by deduplicating the strings of configs')
+    parser.add_argument('--num-files', type=int, nargs='+', default=[50, 200],
+                        help='''the sizes of the packages to generate''')
+    parser.add_argument('--seed', type=int, default=0)
+    return parser.parse_args()
+
+
+###############################################################################
+
+if __name__ == '__main__':
+    main()
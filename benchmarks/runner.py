@@ -0,0 +1,296 @@
+#! /usr/bin/env python3
+"""
+A minimal (asv-style) benchmark runner.
+
+Benchmarks are defined in ``benchmarks/bench_*.py`` modules.  Each module
+defines ``time_*`` functions (the benchmarks), and optional ``setup()`` and
+``teardown()`` functions, which are called once per module, before and after
+running its benchmarks.
+
+Usage::
+
+    # run all benchmarks, and record the results:
+    % python benchmarks/runner.py run -o before.json
+    # run only some of the benchmarks (of the matching modules, and matching benchmarks):
+    % python benchmarks/runner.py run -k overlay -k serialize.time_to_json
+    # compare two recorded runs (exits with an error status if there are regressions):
+    % python benchmarks/runner.py compare before.json after.json
+"""
+
+import os
+import sys
+import json
+import time
+import timeit
+import fnmatch
+import argparse
+import platform
+import statistics
+import subprocess
+import importlib
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCHMARKS_DIR)
+
+# make figura (from this source tree), and the bench modules, importable:
+for _dir in (BENCHMARKS_DIR, ROOT_DIR):
+    if _dir not in sys.path:
+        sys.path.insert(0, _dir)
+
+DEFAULT_REPEAT = 5
+DEFAULT_MIN_SAMPLE_TIME = 0.05  # seconds
+DEFAULT_THRESHOLD = 0.1  # 10%
+
+
+################################################################################
+# Discovering benchmarks
+
+def discover_modules():
+    """
+    :return: a sorted list of names of the benchmark modules.
+    """
+    return sorted(
+        filename[:-len('.py')]
+        for filename in os.listdir(BENCHMARKS_DIR)
+        if fnmatch.fnmatch(filename, 'bench_*.py')
+    )
+
+
+def get_benchmarks(module):
+    """
+    :return: a sorted list of (name, func) of the benchmarks defined in the module.
+    """
+    return sorted(
+        (name, func)
+        for name, func in vars(module).items()
+        if name.startswith('time_') and callable(func)
+    )
+
+
+def _is_selected(module_name, patterns, name=None):
+    """
+    Patterns are matched against the names of the modules and of their files, so modules are
+    selected before importing them.  A pattern with a dot (e.g. ``read.time_split``) is also
+    matched against the full names of the benchmarks (``module.time_func``).
+
+    :param name: the name of a benchmark of the module.  If None, checks whether any of the
+        benchmarks of the module may be selected.
+    """
+    if not patterns:
+        return True
+    filename = module_name + '.py'
+    full_name = '%s.%s' % (module_name, name)
+    for pattern in patterns:
+        if pattern in filename:
+            return True
+        if '.' in pattern:
+            if name is None:
+                if module_name.endswith(pattern.partition('.')[0]):
+                    return True
+            elif pattern in full_name:
+                return True
+    return False
+
+
+################################################################################
+# Running benchmarks
+
+def time_benchmark(func, repeat=DEFAULT_REPEAT, min_sample_time=DEFAULT_MIN_SAMPLE_TIME):
+    """
+    Time a single benchmark.  The number of calls per sample is chosen so that each
+    sample takes at least ``min_sample_time`` seconds.
+
+    :return: a dict of timing stats, in seconds per call.
+    """
+    timer = timeit.Timer(func)
+    number = 1
+    while True:
+        t = timer.timeit(number)
+        if t >= min_sample_time or number >= 10 ** 6:
+            break
+        number *= 10 if t < min_sample_time / 10 else 2
+    samples = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    return dict(
+        min=min(samples),
+        median=statistics.median(samples),
+        mean=statistics.mean(samples),
+        stdev=statistics.stdev(samples) if len(samples) > 1 else 0.,
+        number=number,
+        repeat=repeat,
+    )
+
+
+def run_benchmarks(patterns=(), repeat=DEFAULT_REPEAT, min_sample_time=DEFAULT_MIN_SAMPLE_TIME,
+                   out=sys.stdout):
+    """
+    Run all (selected) benchmarks.
+
+    :param patterns: run only the benchmarks of modules whose name (or file name) contains
+        any of these substrings, and benchmarks whose full name (``module.time_func``)
+        contains any of the patterns which include a dot.
+    :return: a dict mapping full benchmark names to their timing stats.  Modules which fail
+        to import are reported as skipped, and are not included.
+    """
+    results = {}
+    for module_name in discover_modules():
+        if not _is_selected(module_name, patterns):
+            continue
+        try:
+            module = importlib.import_module(module_name)
+        except Exception as e:
+            # e.g. a missing optional dependency
+            print('%-60s skipped (%s: %s)' % (module_name, type(e).__name__, e), file=out)
+            continue
+        benchmarks = [
+            (name, func) for name, func in get_benchmarks(module)
+            if _is_selected(module_name, patterns, name)
+        ]
+        if not benchmarks:
+            continue
+        setup = getattr(module, 'setup', None)
+        teardown = getattr(module, 'teardown', None)
+        if setup is not None:
+            setup()
+        try:
+            for name, func in benchmarks:
+                full_name = '%s.%s' % (module_name, name)
+                stats = time_benchmark(func, repeat=repeat, min_sample_time=min_sample_time)
+                results[full_name] = stats
+                print('%-60s %s' % (full_name, _format_time(stats['min'])), file=out)
+        finally:
+            if teardown is not None:
+                teardown()
+    return results
+
+
+def get_run_metadata():
+    from figura.version import __version_string__
+    return dict(
+        timestamp=time.strftime('%Y-%m-%dT%H:%M:%S'),
+        figura_version=__version_string__,
+        git_commit=_get_git_commit(),
+        python_version=platform.python_version(),
+        python_implementation=platform.python_implementation(),
+        platform=platform.platform(),
+        machine=platform.machine(),
+    )
+
+
+def _get_git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'], cwd=ROOT_DIR, stderr=subprocess.DEVNULL,
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+################################################################################
+# Recording and comparing results
+
+def save_results(filename, results):
+    data = dict(metadata=get_run_metadata(), results=results)
+    with open(filename, 'w') as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+
+
+def load_results(filename):
+    with open(filename) as f:
+        return json.load(f)
+
+
+def compare_results(base, new, threshold=DEFAULT_THRESHOLD, stat='min', out=sys.stdout):
+    """
+    Compare two recorded runs, and print a comparison table.
+
+    :param base: the results dict of the baseline run (as returned by ``load_results``)
+    :param new: the results dict of the new run
+    :param threshold: a benchmark is considered a regression (improvement) if it is slower
+        (faster) by more than this fraction
+    :return: a list of names of benchmarks which regressed.
+    """
+    base_results = base['results']
+    new_results = new['results']
+    regressions = []
+    print('%-60s %12s %12s %8s' % ('benchmark', 'before', 'after', 'ratio'), file=out)
+    for name in sorted(set(base_results) | set(new_results)):
+        if name not in base_results or name not in new_results:
+            before = _format_time(base_results[name][stat]) if name in base_results else '-'
+            after = _format_time(new_results[name][stat]) if name in new_results else '-'
+            print('%-60s %12s %12s %8s' % (name, before, after, 'n/a'), file=out)
+            continue
+        before = base_results[name][stat]
+        after = new_results[name][stat]
+        ratio = after / before if before else float('inf')
+        if ratio > 1 + threshold:
+            mark = '  REGRESSION'
+            regressions.append(name)
+        elif ratio < 1 - threshold:
+            mark = '  improved'
+        else:
+            mark = ''
+        print('%-60s %12s %12s %8.2f%s' % (
+            name, _format_time(before), _format_time(after), ratio, mark), file=out)
+    return regressions
+
+
+def _format_time(t):
+    for unit, scale in (('s', 1), ('ms', 1e-3), ('us', 1e-6)):
+        if t >= scale:
+            return '%.3f %s' % (t / scale, unit)
+    return '%.3f ns' % (t / 1e-9)
+
+
+################################################################################
+# MAIN
+
+def main():
+    args = getopt()
+
+    if args.command == 'run':
+        results = run_benchmarks(
+            patterns=args.select, repeat=args.repeat, min_sample_time=args.min_sample_time)
+        if args.output:
+            save_results(args.output, results)
+
+    elif args.command == 'compare':
+        regressions = compare_results(
+            load_results(args.base), load_results(args.new),
+            threshold=args.threshold, stat=args.stat)
+        if regressions:
+            print('\n%d regression(s) found' % len(regressions))
+            sys.exit(1)
+
+
+def getopt():
+    parser = argparse.ArgumentParser(description='Run and compare figura benchmarks')
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.required = True
+
+    run_parser = subparsers.add_parser('run', help='run the benchmarks')
+    run_parser.add_argument('-o', '--output', help='a json file to record the results to')
+    run_parser.add_argument('-k', '--select', action='append', default=[],
+                            help='only run benchmarks of modules whose name contains this '
+                            'string, or (if it includes a dot) benchmarks whose full name '
+                            'contains it (can be used multiple times)')
+    run_parser.add_argument('-r', '--repeat', type=int, default=DEFAULT_REPEAT,
+                            help='number of samples per benchmark')
+    run_parser.add_argument('--min-sample-time', type=float, default=DEFAULT_MIN_SAMPLE_TIME,
+                            help='the minimal duration (in seconds) of each sample')
+
+    compare_parser = subparsers.add_parser('compare', help='compare two recorded runs')
+    compare_parser.add_argument('base', help='the results of the baseline run')
+    compare_parser.add_argument('new', help='the results of the new run')
+    compare_parser.add_argument('-t', '--threshold', type=float, default=DEFAULT_THRESHOLD,
+                                help='the relative slowdown considered a regression')
+    compare_parser.add_argument('-s', '--stat', default='min',
+                                choices=('min', 'median', 'mean'),
+                                help='the timing stat to compare')
+
+    return parser.parse_args()
+
+
+################################################################################
+
+if __name__ == '__main__':
+    main()
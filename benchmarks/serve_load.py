@@ -0,0 +1,130 @@
+#! /usr/bin/env python3
+"""
+A local load-test of the render server (``figura_print --serve``).
+
+Generates a config package (using ``figura.tools.figura_gen``), starts a server in a
+subprocess, and sends render requests from several concurrent clients.  Reports the
+throughput and the latency percentiles, for first (cold) requests and for repeated (warm)
+requests.
+
+Usage::
+
+    % python benchmarks/serve_load.py --clients 8 --requests 200
+"""
+
+import os
+import sys
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import threading
+import subprocess
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from figura.tools.client import RenderClient  # noqa: E402
+from figura.tools.figura_gen import generate_config_tree  # noqa: E402
+
+PACKAGE_NAME = 'figura_serve_load'
+GEN_PARAMS = dict(num_files=20, num_override_files=20, overrides_per_file=20, seed=0)
+
+
+################################################################################
+
+def main():
+    args = getopt()
+    tempdir = tempfile.mkdtemp(prefix='figura_serve_load_')
+    server = None
+    try:
+        info = generate_config_tree(tempdir, PACKAGE_NAME, **GEN_PARAMS)
+        jobs = [(target, ov_path) for ov_path, (target, _) in sorted(info.override_sets.items())]
+        socket_path = os.path.join(tempdir, 'figura.sock')
+        server = start_server(socket_path, tempdir)
+
+        cold = run_clients(socket_path, jobs, args.clients, len(jobs), args.seed)
+        report('cold (first render of each job)', cold)
+        warm = run_clients(socket_path, jobs, args.clients, args.requests, args.seed)
+        report('warm (client etags, server caches)', warm)
+        with RenderClient(socket_path) as client:
+            print('server stats: %s' % client.stats())
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+        shutil.rmtree(tempdir)
+
+
+def start_server(socket_path, python_path):
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join([python_path, ROOT_DIR, env.get('PYTHONPATH', '')])
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'figura.tools.figura_print', '--serve', socket_path], env=env)
+    deadline = time.time() + 10
+    while not os.path.exists(socket_path):
+        if time.time() > deadline or server.poll() is not None:
+            server.kill()
+            raise RuntimeError('Failed starting the render server')
+        time.sleep(0.01)
+    return server
+
+
+def run_clients(socket_path, jobs, num_clients, requests_per_client, seed):
+    """
+    :return: a 2-tuple: (total duration, list of request latencies)
+    """
+    latencies = []
+    lock = threading.Lock()
+
+    def client_main(client_index):
+        rand = random.Random(seed + client_index)
+        my_latencies = []
+        with RenderClient(socket_path) as client:
+            for i in range(requests_per_client):
+                job = jobs[i % len(jobs)] if i < len(jobs) else rand.choice(jobs)
+                t0 = time.perf_counter()
+                client.render(job, overrides=dict(client_id=client_index))
+                my_latencies.append(time.perf_counter() - t0)
+        with lock:
+            latencies.extend(my_latencies)
+
+    threads = [threading.Thread(target=client_main, args=(i, )) for i in range(num_clients)]
+    t0 = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - t0, latencies
+
+
+def report(title, result):
+    duration, latencies = result
+    latencies = sorted(latencies)
+
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p / 100))] * 1000
+
+    print('%s: %d requests in %.2f s (%.0f req/s), latency p50=%.2f ms p90=%.2f ms '
+          'p99=%.2f ms max=%.2f ms' % (
+              title, len(latencies), duration, len(latencies) / duration,
+              percentile(50), percentile(90), percentile(99), latencies[-1] * 1000))
+
+
+################################################################################
+
+def getopt():
+    parser = argparse.ArgumentParser(description='Load-test the figura render server')
+    parser.add_argument('-c', '--clients', type=int, default=4,
+                        help='''number of concurrent clients''')
+    parser.add_argument('-n', '--requests', type=int, default=200,
+                        help='''number of warm requests per client''')
+    parser.add_argument('--seed', type=int, default=0)
+    return parser.parse_args()
+
+
+################################################################################
+
+if __name__ == '__main__':
+    main()
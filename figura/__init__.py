@@ -14,15 +14,51 @@ and combining configurations and overrides into single ConfigContainer.
 
 """
 
+import sys as _sys
+
 from . import version
 
-from .container import ConfigContainer
-from .override import ConfigOverrideSet
-from .errors import ConfigError, ConfigParsingError, ConfigValueError
 
-from .utils import read_config, build_config
+# The public names are imported lazily (on first access), to keep ``import figura`` fast,
+# e.g. for short-lived CLI tools.
+_LAZY_ATTRS = {
+    'ConfigContainer': 'container',
+    'ConfigOverrideSet': 'override',
+    'ConfigError': 'errors',
+    'ConfigParsingError': 'errors',
+    'ConfigValueError': 'errors',
+    'ConfigValidationError': 'errors',
+    'read_config': 'utils',
+    'build_config': 'utils',
+}
+
+# submodules which used to be imported eagerly, and are still accessible as attributes
+_LAZY_SUBMODULES = frozenset([
+    'container', 'override', 'errors', 'utils', 'parser', 'path', 'importutils', 'importer',
+    'misc', 'settings', 'tracing',
+])
+
+__all__ = ['version'] + list(_LAZY_ATTRS)
+
+
+def __getattr__(name):
+    import importlib
+    if name in _LAZY_SUBMODULES:
+        return importlib.import_module('.' + name, __name__)
+    try:
+        module_name = _LAZY_ATTRS[name]
+    except KeyError:
+        raise AttributeError('module %r has no attribute %r' % (__name__, name)) from None
+    value = getattr(importlib.import_module('.' + module_name, __name__), name)
+    globals()[name] = value  # subsequent lookups don't reach __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRS) | _LAZY_SUBMODULES)
 
 
-version, ConfigContainer, ConfigOverrideSet  # pyflakes
-ConfigError, ConfigParsingError, ConfigValueError  # pyflakes
-read_config, build_config  # pyflakes
+if _sys.version_info < (3, 7):
+    # module-level __getattr__ is not supported (PEP 562)
+    for _name in _LAZY_ATTRS:
+        __getattr__(_name)
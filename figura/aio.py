@@ -0,0 +1,122 @@
+"""
+An asyncio API for reading and building configs.
+
+`read_config <#figura.utils.read_config>`_ and `build_config <#figura.utils.build_config>`_
+block (on file I/O, on executing config files, and on the global figura import lock), so
+they should not be called from a running event loop.  The coroutines here offload the work
+to an executor::
+
+    config = await aread_config('myconf.web', timeout=5)
+    config = await abuild_config('myconf.web', 'myconf.env.prod')
+
+Concurrent requests (in the same event loop) for reading the same path are coalesced into
+a single read.  Each caller gets its own copy of the config containers (leaf values are
+shared), so they can be modified independently.
+
+Cancelling a caller (or timing out) does not affect other callers waiting for the same read.
+The read itself runs to completion in the executor (threads can't be interrupted), and its
+result is discarded if no one is waiting for it.
+
+:note: reading configs is serialized by the figura import lock, so with the default
+    (thread-pool) executor, reads of different paths don't run in parallel, but they don't
+    block the event loop either.  Pass a ``concurrent.futures.ProcessPoolExecutor`` as
+    ``executor`` for reading in parallel.
+
+:note: requires python 3.7 or later.
+"""
+
+import asyncio
+import functools
+import weakref
+
+from .container import ConfigContainer, copy_config_tree
+from .utils import read_config, build_config
+from .importutils import normalize_extensions
+
+
+################################################################################
+
+# event loop -> {read key: future of the read}
+_in_flight_reads = weakref.WeakKeyDictionary()
+
+
+async def aread_config(path, timeout=None, executor=None, **kwargs):
+    """
+    The async version of `read_config <#figura.utils.read_config>`_.
+
+    :param timeout: if set, raise ``asyncio.TimeoutError`` if the config is not read within
+        this many seconds.
+    :param executor: the executor to read the config in. Defaults to the default executor of
+        the event loop.
+    :param kwargs: passed to ``read_config``
+    """
+    loop = asyncio.get_running_loop()
+    future = _get_read_future(loop, path, executor, kwargs)
+    # shielded, so cancelling this caller doesn't cancel the (shared) read:
+    config = await asyncio.wait_for(asyncio.shield(future), timeout)
+    return copy_config_tree(config)
+
+
+def _get_read_future(loop, path, executor, kwargs):
+    in_flight = _in_flight_reads.setdefault(loop, {})
+    if kwargs.get('extensions') is not None:
+        # e.g. a list, which is unhashable
+        kwargs = dict(kwargs, extensions=normalize_extensions(kwargs['extensions']))
+    key = (str(path), tuple(sorted(kwargs.items())))
+    future = in_flight.get(key)
+    if future is None:
+        future = loop.run_in_executor(
+            executor, functools.partial(read_config, path, **kwargs))
+        in_flight[key] = future
+        future.add_done_callback(functools.partial(_on_read_done, in_flight, key))
+    return future
+
+
+def _on_read_done(in_flight, key, future):
+    if in_flight.get(key) is future:
+        del in_flight[key]
+    if not future.cancelled():
+        # mark the exception as retrieved, even if all callers gave up waiting:
+        future.exception()
+
+
+async def abuild_config(*paths, timeout=None, executor=None, **kwargs):
+    """
+    The async version of `build_config <#figura.utils.build_config>`_.
+
+    The paths are read concurrently (see ``aread_config``), and then combined.
+
+    :param timeout: if set, raise ``asyncio.TimeoutError`` if the config is not built within
+        this many seconds.
+    :param executor: the executor to read (and combine) the configs in.
+    :param kwargs: passed to ``build_config``
+    """
+    return await asyncio.wait_for(_abuild_config(paths, executor, kwargs), timeout)
+
+
+# the kwargs of build_config which are passed to read_config
+_READ_KWARGS = ('bundle', 'extensions')
+
+
+async def _abuild_config(paths, executor, kwargs):
+    default_config = kwargs.pop('default_config', None)
+    read_kwargs = {k: kwargs.pop(k) for k in _READ_KWARGS if k in kwargs}
+    paths = list(paths)
+    if default_config is not None:
+        paths.append(default_config)
+    configs = await asyncio.gather(
+        *[_ato_config(path, executor, read_kwargs) for path in paths])
+    if default_config is not None:
+        kwargs['default_config'] = configs.pop()
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        executor, functools.partial(build_config, *configs, **kwargs))
+
+
+async def _ato_config(x, executor, read_kwargs):
+    if isinstance(x, ConfigContainer):
+        return x
+    return await aread_config(x, executor=executor, **read_kwargs)
+
+
+################################################################################
@@ -0,0 +1,119 @@
+"""
+Compact storage of large numeric sequences.
+
+By default, sequences in configs are stored as they are defined (lists and tuples of python
+objects).  Optionally, large homogeneous sequences of floats or ints (e.g. lookup tables)
+can be stored compactly, as ``array.array`` objects, or as numpy arrays.  Enable this by
+setting the ``COMPACT_SEQUENCES`` setting (or the ``FIGURA_COMPACT_SEQUENCES`` env var) to:
+
+- ``array``: store them as ``array.array`` (typecode ``d`` for floats, ``q`` for ints)
+- ``numpy``: store them as numpy arrays (``float64`` or ``int64``), if numpy is installed
+  (otherwise, as ``array.array``)
+
+Only sequences of at least ``COMPACT_SEQUENCE_MIN_LENGTH`` items are stored compactly.
+Compact sequences are serialized as lists (e.g. by ``to_json``).
+"""
+
+import sys
+import array
+
+from .settings import get_setting
+
+
+################################################################################
+
+COMPACT_SEQUENCE_MIN_LENGTH = 1000
+
+COMPACT_STORAGE_ARRAY = 'array'
+COMPACT_STORAGE_NUMPY = 'numpy'
+
+_ARRAY_TYPECODES = {float: 'd', int: 'q'}
+_TYPECODE_ITEM_TYPES = {'d': float, 'q': int}
+
+
+def get_compact_storage():
+    """
+    :return: the storage to use for large numeric sequences: ``array``, ``numpy``, or None
+        (not stored compactly), according to the ``COMPACT_SEQUENCES`` setting
+    """
+    storage = get_setting('COMPACT_SEQUENCES')
+    if storage == COMPACT_STORAGE_NUMPY and _get_numpy() is None:
+        return COMPACT_STORAGE_ARRAY
+    return storage or None
+
+
+def to_compact_sequence(seq, storage, item_types=None):
+    """
+    :param seq: a sequence
+    :param storage: ``array`` or ``numpy``
+    :param item_types: the set of types of the items of ``seq``, if already known
+    :return: a compact sequence with the items of ``seq``, or None if ``seq`` is not a
+        homogeneous sequence of floats or ints, or the ints don't fit in 64 bits
+    """
+    if item_types is None:
+        item_types = set(map(type, seq))
+    if len(item_types) != 1:
+        return None
+    typecode = _ARRAY_TYPECODES.get(next(iter(item_types)))
+    if typecode is None:
+        return None
+    try:
+        if storage == COMPACT_STORAGE_NUMPY:
+            numpy = _get_numpy()
+            return numpy.array(seq, dtype='float64' if typecode == 'd' else 'int64')
+        return array.array(typecode, seq)
+    except OverflowError:
+        return None
+
+
+def is_compact_sequence(x):
+    return isinstance(x, array.array) or _is_numpy_array(x)
+
+
+def get_compact_item_type(x):
+    """
+    :return: the (python) type of the items of a compact sequence: float or int
+    """
+    if isinstance(x, array.array):
+        return _TYPECODE_ITEM_TYPES.get(x.typecode, int)
+    return float if x.dtype.kind == 'f' else int
+
+
+def get_compact_sequence_factory(x):
+    """
+    :return: a function, making a compact sequence of the same kind as ``x`` from an iterable
+    """
+    if isinstance(x, array.array):
+        typecode = x.typecode
+        return lambda items: array.array(typecode, items)
+    dtype = x.dtype
+    numpy = _get_numpy()
+    return lambda items: numpy.array(list(items), dtype=dtype)
+
+
+def json_default(x):
+    """
+    A ``default`` function for ``json.dumps``, serializing compact sequences as lists.
+    """
+    if is_compact_sequence(x):
+        return x.tolist()
+    raise TypeError('Object of type %s is not JSON serializable' % type(x).__name__)
+
+
+################################################################################
+
+def _is_numpy_array(x):
+    # not importing numpy just for checking
+    numpy = sys.modules.get('numpy')
+    return numpy is not None and isinstance(x, numpy.ndarray)
+
+
+def _get_numpy():
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+################################################################################
@@ -0,0 +1,295 @@
+"""
+Config bundles: a config package, pre-rendered into a single file.
+
+Reading configs from a bundle requires no searching of ``sys.path``, no importing and no
+executing of figura files -- just reading (and unpickling) one file, once per process.
+
+Create a bundle using the ``figura_bundle`` tool (or `build_bundle
+<#figura.bundle.build_bundle>`_)::
+
+    % figura_bundle myconf -o myconf.figbundle
+
+and read configs from it, by passing it to ``read_config``/``build_config``, or by setting
+the ``FIGURA_BUNDLE_FILE`` environment variable (or the ``BUNDLE_FILE`` setting)::
+
+    config = read_config('myconf.web.server', bundle='myconf.figbundle')
+
+:note: a bundle contains the configs as they were when the bundle was built. Modules which
+    are not visible when reading the package (e.g. private modules, named with a leading
+    underscore) are not included.
+
+:note: bundles are pickled. Only read bundles you trust.
+"""
+
+import os
+import sys
+
+from . import tracing
+from .version import __version_string__
+from .container import ConfigContainer, copy_config_tree
+from .errors import ConfigError, ConfigParsingError, ConfigValueError
+
+################################################################################
+
+BUNDLE_MAGIC = b'FIGURA-BUNDLE\n'
+BUNDLE_FORMAT_VERSION = 1
+
+
+class ConfigBundle:
+    """
+    A loaded bundle.
+
+    The configs of each figura file are unpickled only when first read.
+
+    :ivar package: the python-import path of the bundled package
+    :ivar header: a dict of bundle metadata
+    """
+
+    def __init__(self, header, data):
+        self.package = header['package']
+        self.header = header
+        # python-import path of a figura file (module or package) -> (offset, size) in data
+        self._units = header['units']
+        self._data = memoryview(data)
+        self._loaded_units = {}
+
+    def __contains__(self, path):
+        return self._get(str(path)) is not _MISSING
+
+    def get(self, path):
+        """
+        Get the config at ``path`` (a python-import path, with an optional attr-path, as
+        passed to ``read_config``).
+
+        :return: a copy of the config (or the value, if ``path`` points to one)
+        :raise ConfigParsingError: if ``path`` is not in the bundled package
+        :raise ConfigValueError: if ``path`` is missing from the bundled package
+        """
+        path = str(path)
+        value = self._get(path)
+        if value is _MISSING:
+            if path != self.package and not _is_under(path, self.package):
+                raise ConfigParsingError('Path %r is not in the bundled package %r' % (
+                    path, self.package))
+            raise ConfigValueError('Path %r is missing from the bundle of %r' % (
+                path, self.package))
+        return copy_config_tree(value)
+
+    def _get(self, path):
+        # the longest prefix of the path which is a figura file, followed by an attr-path:
+        parts = path.split('.')
+        for i in range(len(parts), 0, -1):
+            unit_name = '.'.join(parts[:i])
+            if unit_name in self._units:
+                break
+        else:
+            return _MISSING
+        value = self._get_unit(unit_name)
+        for key in parts[i:]:
+            if not isinstance(value, ConfigContainer):
+                return _MISSING
+            value = value.get(key, _MISSING)
+            if value is _MISSING:
+                return _MISSING
+        return value
+
+    def _get_unit(self, unit_name):
+        config = self._loaded_units.get(unit_name)
+        if config is None:
+            import pickle
+            offset, size = self._units[unit_name]
+            nodes = pickle.loads(self._data[offset:offset + size])
+            config = self._loaded_units[unit_name] = _unflatten_config(nodes, self._get_unit)
+        return config
+
+
+_MISSING = object()
+
+
+def _is_under(path, package):
+    return path.startswith(package + '.')
+
+
+################################################################################
+# writing
+
+def build_bundle(package, filename):
+    """
+    Read a config package (including its sub-packages), and write it to a bundle file.
+
+    :param package: the python-import path of the package
+    :return: the bundle (a ``ConfigBundle``)
+    """
+    from .utils import read_config
+    config = read_config(package, enable_path_spliting=False, bundle=False)
+    if not isinstance(config, ConfigContainer):
+        raise ConfigError('Not a config package: %r' % (package, ))
+    header = dict(
+        format=BUNDLE_FORMAT_VERSION,
+        package=package,
+        figura_version=__version_string__,
+        python_version='%d.%d' % sys.version_info[:2],
+    )
+    write_bundle(filename, header, config)
+    return load_bundle(filename)
+
+
+def write_bundle(filename, header, config):
+    import pickle
+    # each figura file is pickled separately, so it can be unpickled on its own:
+    chunks = []
+    units = {}
+    offset = 0
+    for unit_name, nodes in _flatten_units(config, header['package']):
+        chunk = pickle.dumps(nodes, protocol=pickle.HIGHEST_PROTOCOL)
+        units[unit_name] = (offset, len(chunk))
+        offset += len(chunk)
+        chunks.append(chunk)
+    header = dict(header, units=units)
+    # write to a temp file, and rename, so readers never see a partial bundle:
+    tmp_filename = '%s.tmp%d' % (filename, os.getpid())
+    try:
+        with open(tmp_filename, 'wb') as f:
+            f.write(BUNDLE_MAGIC)
+            pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+            f.writelines(chunks)
+        os.replace(tmp_filename, filename)
+    finally:
+        if os.path.exists(tmp_filename):
+            os.unlink(tmp_filename)
+
+
+# The configs of each figura file are pickled as a flat list of nodes (as opposed to
+# pickling the containers directly, which is recursive), to support any nesting depth.
+# Each node is a tuple: (class, metadata, items), where nested containers, dicts, lists and
+# tuples are replaced by a _NodeRef to their node, and the configs of nested figura files
+# (the modules of a package) by a _UnitRef to them.  Nested nodes always come after the
+# node containing them.  Only non-default metadata is stored.
+
+class _NodeRef(int):
+    __slots__ = ()
+
+
+class _UnitRef(str):
+    __slots__ = ()
+
+
+_SEQUENCE_TYPES = (list, tuple)
+_NESTED_TYPES = (dict, ) + _SEQUENCE_TYPES
+
+
+def _flatten_units(config, unit_name):
+    """
+    :return: a list of 2-tuples: (python-import path of a figura file, flattened nodes)
+    """
+    units = []
+    pending = [(config, unit_name)]
+    while pending:
+        config, unit_name = pending.pop()
+        units.append((unit_name, _flatten_config(config, unit_name, pending)))
+    return units
+
+
+def _flatten_config(config, unit_name, sub_units):
+    default_metadata = ConfigContainer.DEFAULT_METADATA
+    nodes = [None]
+    stack = [(config, 0)]
+    while stack:
+        x, index = stack.pop()
+        is_sequence = type(x) in _SEQUENCE_TYPES
+        items = []
+        for item in (x if is_sequence else x.items()):
+            v = item if is_sequence else item[1]
+            if index == 0 and isinstance(v, ConfigContainer) and \
+                    v.get_metadata().name == '%s.%s' % (unit_name, item[0]):
+                sub_units.append((v, v.get_metadata().name))
+                v = _UnitRef(v.get_metadata().name)
+            elif isinstance(v, ConfigContainer) or type(v) in _NESTED_TYPES:
+                child_index = len(nodes)
+                nodes.append(None)
+                stack.append((v, child_index))
+                v = _NodeRef(child_index)
+            items.append(v if is_sequence else (item[0], v))
+        metadata = None
+        if isinstance(x, ConfigContainer):
+            metadata = {
+                k: v for k, v in x.get_metadata().items() if default_metadata.get(k) != v
+            } or None
+        nodes[index] = (type(x), metadata, items)
+    return nodes
+
+
+def _unflatten_config(nodes, get_unit):
+    built = [None] * len(nodes)
+    # building in reverse order, so nested nodes are built before the nodes containing them
+    for index in reversed(range(len(nodes))):
+        cls, metadata, items = nodes[index]
+        if cls in _SEQUENCE_TYPES:
+            x = cls([built[v] if type(v) is _NodeRef else v for v in items])
+        else:
+            x = cls(metadata=metadata) if cls is not dict else cls()
+            for k, v in items:
+                if type(v) is _NodeRef:
+                    v = built[v]
+                elif type(v) is _UnitRef:
+                    v = get_unit(v)
+                x[k] = v
+        built[index] = x
+    return built[0]
+
+
+################################################################################
+# reading
+
+# filename -> (stat key, ConfigBundle)
+_loaded_bundles = {}
+
+
+def load_bundle(filename):
+    """
+    Load a bundle file. Loaded bundles are cached, and reloaded if the file changes.
+
+    :return: a ``ConfigBundle``
+    :raise ConfigError: if the file is not a bundle, or its format is not supported
+    """
+    st = os.stat(filename)
+    stat_key = (st.st_mtime_ns, st.st_size, st.st_ino)
+    cached = _loaded_bundles.get(filename)
+    if cached is not None and cached[0] == stat_key:
+        return cached[1]
+    bundle = _load_bundle(filename)
+    _loaded_bundles[filename] = (stat_key, bundle)
+    return bundle
+
+
+def _load_bundle(filename):
+    import pickle
+    with open(filename, 'rb') as f:
+        if f.readline() != BUNDLE_MAGIC:
+            raise ConfigError('Not a figura bundle: %r' % (filename, ))
+        try:
+            header = pickle.load(f)
+        except Exception:
+            raise ConfigError('Corrupt figura bundle: %r' % (filename, )) from None
+        bundle_format = header.get('format') if isinstance(header, dict) else None
+        if bundle_format != BUNDLE_FORMAT_VERSION:
+            raise ConfigError(
+                'Unsupported figura bundle format %r (expected %r) in %r. '
+                'Rebuild the bundle' % (bundle_format, BUNDLE_FORMAT_VERSION, filename))
+        data = f.read()
+    return ConfigBundle(header, data)
+
+
+def read_config_from_bundle(path, bundle):
+    """
+    Read a config from a bundle.
+
+    :param bundle: a ``ConfigBundle``, or the name of a bundle file
+    """
+    with tracing.span(tracing.PHASE_READ_CONFIG, str(path)):
+        if not isinstance(bundle, ConfigBundle):
+            bundle = load_bundle(bundle)
+        return bundle.get(path)
+
+
+################################################################################
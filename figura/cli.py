@@ -41,9 +41,13 @@ Another example, leveraging `build_config <#figura.cli.build_config_from_cli>`__
 
 """
 
-import argparse
+import re
+import functools
 
 from .container import ConfigContainer
+from .arrays import is_compact_sequence, get_compact_item_type, get_compact_sequence_factory
+from .errors import ConfigValueError
+from .override import normalize_override_key
 from .utils import build_config
 
 
@@ -88,7 +92,7 @@ def add_override_argument(parser, *names, **kwargs):
         dest=dest,
         default=ov_container,
         required=required,
-        action=_add_to_override_set,
+        action=_get_add_to_override_set_action(),
         type=_dict_from_string,
         help=help
     )
@@ -97,16 +101,27 @@ def add_override_argument(parser, *names, **kwargs):
 def _dict_from_string(overrides_string):
     dct = {}
     for part in split_list_value(overrides_string):
-        if '=' not in part:
+        k, sep, v = part.partition('=')
+        if not sep:
             raise ValueError(part)
-        k, _, v = part.partition('=')
         dct[k] = v
     return dct
 
 
-class _add_to_override_set(argparse.Action):
-    def __call__(self, parser, namespace, values, option_string):
-        getattr(namespace, self.dest).update(values)
+_add_to_override_set = None
+
+
+def _get_add_to_override_set_action():
+    # argparse is only imported when needed, to keep importing this module fast
+    global _add_to_override_set
+    if _add_to_override_set is None:
+        import argparse
+
+        class _add_to_override_set(argparse.Action):
+            def __call__(self, parser, namespace, values, option_string):
+                getattr(namespace, self.dest).update(values)
+
+    return _add_to_override_set
 
 
 def build_config_from_cli(
@@ -114,18 +129,35 @@ def build_config_from_cli(
         default_config=None,
         config_arg_name='config',
         override_arg_name='override',
+        coerce_overrides=False,
         **kwargs):
     """
     A convenience function for combining configs and overrides from CLI.
+
+    :param coerce_overrides: if set, override values from CLI (which are strings) are
+        converted to the types of the values they override in the config.
+        See `compile_override_coercer <#figura.cli.compile_override_coercer>`_.
+        Can also be a coercer returned by ``compile_override_coercer``, for reusing it.
     """
     configs = getattr(parsed_args, config_arg_name)
     overrides = getattr(parsed_args, override_arg_name)
-    return build_config(
-        *configs,
-        extra_overrides=overrides,
-        default_config=default_config,
-        **kwargs
-    )
+    if not coerce_overrides:
+        return build_config(
+            *configs,
+            extra_overrides=overrides,
+            default_config=default_config,
+            **kwargs
+        )
+
+    config = build_config(*configs, default_config=default_config, **kwargs)
+    if overrides:
+        if callable(coerce_overrides):
+            coercer = coerce_overrides
+        else:
+            coercer = compile_override_coercer(config)
+        config.apply_overrides(
+            coercer(overrides), enforce_override_set=kwargs.get('enforce_override_set', True))
+    return config
 
 
 ################################################################################
@@ -175,25 +207,43 @@ def split_list_value(value, delim=','):
     """
     if not value:
         return []
-    is_escaped = False
-    tokens = ['']
-    i = 0
-    while i < len(value):
-        c = value[i]
-        if c == OPTION_VALUE_ESCAPE_CHAR and i < len(value) - 1:
-            is_escaped = True
-            i += 1
-            c = value[i]
-        else:
-            is_escaped = False
-        if c == delim and not is_escaped:
-            tokens.append('')
+    if OPTION_VALUE_ESCAPE_CHAR not in value:
+        # nothing is escaped (the common case)
+        return value.split(delim)
+    # find the escape sequences and the delimiters in one pass, and copy the text between
+    # them in slices (as opposed to char by char), which keeps this linear in len(value):
+    tokens = []
+    parts = []
+    pos = 0
+    for m in _get_list_value_token_re(delim).finditer(value):
+        start = m.start()
+        if start > pos:
+            parts.append(value[pos:start])
+        escaped = m.group(1)
+        if escaped is not None:
+            parts.append(escaped)
         else:
-            tokens[-1] += c
-        i += 1
+            tokens.append(''.join(parts))
+            parts = []
+        pos = m.end()
+    # an escape char at the end of the value is kept as is
+    parts.append(value[pos:])
+    tokens.append(''.join(parts))
     return tokens
 
 
+_LIST_VALUE_TOKEN_RES = {}
+
+
+def _get_list_value_token_re(delim):
+    try:
+        return _LIST_VALUE_TOKEN_RES[delim]
+    except KeyError:
+        regex = _LIST_VALUE_TOKEN_RES[delim] = re.compile(
+            '%s(.)|%s' % (re.escape(OPTION_VALUE_ESCAPE_CHAR), re.escape(delim)), re.DOTALL)
+        return regex
+
+
 ################################################################################
 # Convenience functions for converting string values (from CLI) to other types
 ################################################################################
@@ -256,4 +306,112 @@ def boolify(x):
         raise ValueError('Can\'t boolify value: %r' % x) from None
 
 
+################################################################################
+# Typed coercion of overrides from CLI
+################################################################################
+
+def compile_override_coercer(config):
+    """
+    Compile a coercer of override values from CLI (which are strings), to the types of the
+    values they override in ``config``.
+
+    The coercions are compiled once (by walking ``config``), so applying the coercer to
+    many overrides is cheap.
+
+    Supported types: bool (see boolify_), int, float and str, and lists, tuples and compact
+    sequences (see `figura.arrays <#module-figura.arrays>`_) of those (the items are split
+    using ``split_list_value``, so commas inside a CLI override value must be escaped, e.g.
+    ``-O hosts=a@,b``). Values overriding other types (or keys missing
+    from ``config``) are left as strings.
+
+    .. testsetup::
+
+       from figura import ConfigContainer
+       from figura.cli import compile_override_coercer
+
+    >>> config = ConfigContainer.from_dict(dict(a=dict(n=1, flag=False), hosts=['h1']))
+    >>> coerce = compile_override_coercer(config)
+    >>> overrides = {'a.n': '5', 'a__flag': 'yes', 'hosts': 'h2,h3', 'x': '7'}
+    >>> sorted(coerce(ConfigContainer(overrides)).items())
+    [('a.n', 5), ('a__flag', True), ('hosts', ['h2', 'h3']), ('x', '7')]
+
+    :return: a callable taking an override-set (a ConfigContainer), and returning a
+        copy of it, with the values coerced.
+    :raise ConfigValueError: (when calling the coercer) if a value can't be converted
+    """
+    converters = {}
+    stack = [(config, '')]
+    while stack:
+        container, prefix = stack.pop()
+        for k, v in container.items():
+            key = prefix + k
+            if isinstance(v, ConfigContainer):
+                stack.append((v, key + '.'))
+                continue
+            converter = _get_value_converter(v)
+            if converter is not None:
+                converters[key] = converter
+    return functools.partial(_coerce_overrides, converters)
+
+
+def _coerce_overrides(converters, overrides):
+    result = type(overrides)(overrides, metadata=overrides.get_metadata())
+    stack = [(result, '')]
+    while stack:
+        container, prefix = stack.pop()
+        for k, v in container.items():
+            key = prefix + normalize_override_key(k)
+            if isinstance(v, ConfigContainer):
+                # a nested override-set
+                v = container[k] = type(v)(v, metadata=v.get_metadata())
+                stack.append((v, key + '.'))
+                continue
+            if not isinstance(v, str):
+                continue
+            converter = converters.get(key)
+            if converter is None:
+                continue
+            try:
+                # replacing the value of an existing key is safe while iterating
+                container[k] = converter(v)
+            except ValueError as e:
+                raise ConfigValueError('Invalid value for override %r: %s' % (key, e)) from None
+    return result
+
+
+def _get_value_converter(value):
+    t = type(value)
+    if t in (list, tuple):
+        item_types = set(map(type, value))
+        if not item_types:
+            # an empty sequence: assume strings
+            item_converter = None
+        elif len(item_types) == 1 and next(iter(item_types)) in _ATOMIC_CONVERTERS:
+            item_converter = _ATOMIC_CONVERTERS[next(iter(item_types))]
+        else:
+            # can't tell the type of new items
+            return None
+        return functools.partial(_convert_sequence, t, item_converter)
+    if is_compact_sequence(value):
+        return functools.partial(
+            _convert_sequence, get_compact_sequence_factory(value),
+            _ATOMIC_CONVERTERS[get_compact_item_type(value)])
+    return _ATOMIC_CONVERTERS.get(t)
+
+
+def _convert_sequence(seq_type, item_converter, v):
+    items = split_list_value(v)
+    if item_converter is not None:
+        items = map(item_converter, items)
+    return seq_type(items)
+
+
+_ATOMIC_CONVERTERS = {
+    bool: boolify,
+    int: int,
+    float: float,
+    str: None,
+}
+
+
 ################################################################################
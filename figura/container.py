@@ -2,9 +2,12 @@
 Definition of the config-container type.
 """
 
-import json
+import itertools
+from types import MappingProxyType
 
 from .misc import Struct, merge_dicts, deep_getattr, deep_setattr
+from .arrays import is_compact_sequence, json_default
+from .errors import ConfigValueError
 
 
 ################################################################################
@@ -46,11 +49,78 @@ class ConfigContainerMixin:
         A convenience method, simply calling apply_overrides_to_config_.
 
         :note: this method modifies the config container in-place.
+        :return: with ``audit=True``, the log of the changes made
 
         .. _apply_overrides_to_config: #figura.override.apply_overrides_to_config
         """
         from figura.override import apply_overrides_to_config  # avoid circular import
-        apply_overrides_to_config(self, overrides, **kwargs)
+        return apply_overrides_to_config(self, overrides, **kwargs)
+
+    def memory_report(self, **kwargs):
+        """
+        A convenience method, simply calling memory_report_.
+
+        .. _memory_report: #figura.memory.memory_report
+        """
+        from figura.memory import memory_report  # avoid circular import
+        return memory_report(self, **kwargs)
+
+    def query(self, pattern):
+        """
+        A convenience method, simply calling query_.
+
+        .. _query: #figura.query.query
+        """
+        from figura.query import query  # avoid circular import
+        return query(self, pattern)
+
+    # ============================================================================================
+    # flat views
+    # ============================================================================================
+
+    def flatten(self):
+        """
+        Flat conversion of self to a dict, mapping dotted keys (e.g. ``'a.b.c'``) to the
+        leaf values (including empty sections, which have no leaves to stand for them).
+        See also flat_view_.
+        """
+        return {
+            path: value
+            for path, value in iter_dotted_items(self)
+            if not isinstance(value, ConfigContainer) or not value
+        }
+
+    @classmethod
+    def unflatten(cls, flat):
+        """
+        The reverse of flatten_: create a ConfigContainer from a dict mapping dotted keys
+        to values.
+
+        :raise ConfigValueError: if a key is both a section (i.e. other keys are nested
+            under it) and a value
+
+        .. _flatten:
+        """
+        return unflatten_config(flat, cls=cls)
+
+    def flat_view(self):
+        """
+        A read-only mapping of the dotted keys of all the values in self (sections included)
+        to the values, for looking values up by dotted key using a single dict lookup.
+
+        The view is cached, and rebuilt after the config is modified (see
+        get_config_tree_version_).
+
+        .. _flat_view:
+        .. _get_config_tree_version: #figura.container.get_config_tree_version
+        """
+        version, view = self.__dict__.get('_flat_view', (None, None))
+        tree_version = self.__dict__.get('_tree_version')
+        if tree_version is None or version != tree_version.value:
+            version = get_config_tree_version(self).value
+            view = MappingProxyType(dict(iter_dotted_items(self)))
+            self.__dict__['_flat_view'] = (version, view)
+        return view
 
     # ============================================================================================
     # serialization
@@ -75,7 +145,8 @@ class ConfigContainerMixin:
         :param args+kwargs: extra args to pass to ``json.dumps``.
         :return: the json string representation of self.
         """
-        kw = dict(self.DEFAULT_JSON_DUMP_KWARGS)
+        import json  # imported lazily, to keep ``import figura`` fast
+        kw = dict(self.DEFAULT_JSON_DUMP_KWARGS, default=json_default)
         kw.update(kwargs)
         return json.dumps(self, **kw)
 
@@ -84,12 +155,14 @@ class ConfigContainerMixin:
         """
         Create a ConfigContainer from a json string.
         """
+        import json
         return cls.from_dict(json.loads(json_str))
 
     def to_dict(self):
         """
         deep-conversion of self to a dict.
         """
+        import json
         return json.loads(self.to_json())
 
     @classmethod
@@ -107,17 +180,28 @@ class ConfigContainerMixin:
         return '\n'.join(lines)
 
     def _to_python_lines(self, x, indent_level=0):
-        indent = ' ' * (self.INDENT_LEN * indent_level)
+        # using an explicit stack of (items-iterator, indent_level), as opposed to recursion,
+        # to support any nesting depth
         lines = []
-        for k, v in x.items():
-            if isinstance(v, ConfigContainer):
-                lines.append('%sclass %s:' % (indent, k))
-                if len(v) > 0:
-                    lines.extend(self._to_python_lines(v, indent_level + 1))
+        stack = [(iter(x.items()), indent_level)]
+        while stack:
+            items, indent_level = stack[-1]
+            indent = ' ' * (self.INDENT_LEN * indent_level)
+            for k, v in items:
+                if isinstance(v, ConfigContainer):
+                    lines.append('%sclass %s:' % (indent, k))
+                    if len(v) > 0:
+                        # step into v. the rest of the items are processed after it
+                        stack.append((iter(v.items()), indent_level + 1))
+                        break
+                    else:
+                        lines.append('%s%spass' % (indent, ' ' * self.INDENT_LEN))
                 else:
-                    lines.append('%s%spass' % (indent, ' ' * self.INDENT_LEN))
+                    if is_compact_sequence(v):
+                        v = v.tolist()
+                    lines.append('%s%s = %r' % (indent, k, v))
             else:
-                lines.append('%s%s = %r' % (indent, k, v))
+                stack.pop()
         return lines
 
 
@@ -153,6 +237,61 @@ class ConfigContainer(Struct, ConfigContainerMixin):
     def copy(self):
         return type(self)(self)
 
+    def __getstate__(self):
+        # caches derived from the contents (e.g. the path index) are not pickled
+        return {'_metadata': self._metadata}
+
+    # ============================================================================================
+    # mutation tracking
+    # ============================================================================================
+
+    # Caches derived from the contents of a config (e.g. its path index), which includes nested
+    # containers, which don't know their parents, use a ConfigTreeVersion (see
+    # get_config_tree_version), which is registered in all the containers of the config (in
+    # _tree_versions).  A mutation of a container bumps the versions registered in it.  A
+    # container which is not part of a cached config has none, and mutating it costs a single
+    # (empty) check.
+
+    _tree_versions = ()
+
+    def _mutated(self):
+        for tree_version in self._tree_versions:
+            tree_version.value = next(_mutation_versions)
+
+    def __setitem__(self, k, v):
+        super().__setitem__(k, v)
+        if self._tree_versions:
+            self._mutated()
+
+    def __delitem__(self, k):
+        super().__delitem__(k)
+        if self._tree_versions:
+            self._mutated()
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self._mutated()
+
+    def setdefault(self, k, default=None):
+        self._mutated()
+        return super().setdefault(k, default)
+
+    def pop(self, *args):
+        self._mutated()
+        return super().pop(*args)
+
+    def popitem(self):
+        self._mutated()
+        return super().popitem()
+
+    def clear(self):
+        self._mutated()
+        super().clear()
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
     @property
     def __doc__(self):
         return self._metadata.doc
@@ -185,22 +324,171 @@ class ConfigContainer(Struct, ConfigContainerMixin):
                 pass
 
 
+_mutation_versions = itertools.count(1)
+
+
+class ConfigTreeVersion:
+    """
+    The mutation version of a config tree (a config, and the containers nested in it).
+    Create using `get_config_tree_version <#figura.container.get_config_tree_version>`_.
+
+    :ivar value: a number which changes whenever a container in the tree is modified (using
+        its methods, e.g. ``__setitem__``, ``deep_setattr`` or ``apply_overrides``)
+    """
+
+    __slots__ = ('value', )
+
+    def __init__(self):
+        self.value = next(_mutation_versions)
+
+
+def get_config_tree_version(config):
+    """
+    Get the version of the tree of ``config``, for invalidating caches derived from its
+    contents (a cache is valid as long as ``version.value`` is the value it was built at).
+
+    Modifying containers which are not in the tree (e.g. other configs) doesn't change it.
+    The version of a config is registered in all the containers nested in it by walking the
+    tree, so this should be called when (re)building the cache.  Containers added to the tree
+    afterwards are registered by the next call.
+
+    :return: the `ConfigTreeVersion <#figura.container.ConfigTreeVersion>`_ of ``config``
+    """
+    tree_version = config.__dict__.get('_tree_version')
+    if tree_version is None:
+        tree_version = config.__dict__['_tree_version'] = ConfigTreeVersion()
+    stack = [config]
+    while stack:
+        container = stack.pop()
+        tree_versions = container._tree_versions
+        if tree_version not in tree_versions:
+            # not using a set, as a container is rarely part of more than one cached tree
+            container.__dict__['_tree_versions'] = tree_versions + (tree_version, )
+        stack.extend(v for v in container.values() if isinstance(v, ConfigContainer))
+    return tree_version
+
+
 ################################################################################
 
+def iter_dotted_items(config):
+    """
+    Iterate over all the values in a config (sections included), in pre-order.
+
+    :return: an iterator of 2-tuples: (dotted key, value)
+    """
+    # using an explicit stack of (items-iterator, key-prefix), as opposed to recursion, to
+    # support any nesting depth
+    stack = [(iter(config.items()), '')]
+    while stack:
+        items, prefix = stack[-1]
+        for k, v in items:
+            path = prefix + k
+            yield path, v
+            if isinstance(v, ConfigContainer):
+                # step into v. the rest of the items are processed after it
+                stack.append((iter(v.items()), path + '.'))
+                break
+        else:
+            stack.pop()
+
+
+def iter_containers(config):
+    """
+    Iterate over the containers of a config (the config itself included), in pre-order.
+    The values of a config which are not containers are its leaves.
+
+    :return: an iterator of 2-tuples: (keys, container), where keys is the tuple of keys
+        leading to the container (empty for the config itself)
+    """
+    # an explicit stack, as opposed to recursion, to support any nesting depth. Containers
+    # are pushed in reverse order, to be visited in order
+    stack = [((), config)]
+    while stack:
+        keys, container = stack.pop()
+        yield keys, container
+        stack.extend(
+            (keys + (k, ), v) for k, v in reversed(list(container.items()))
+            if isinstance(v, ConfigContainer))
+
+
+def unflatten_config(flat, cls=ConfigContainer):
+    """
+    Create a ConfigContainer from a dict mapping dotted keys to values.
+    See `ConfigContainer.unflatten <#figura.container.ConfigContainerMixin.unflatten>`_.
+    """
+    # the containers are new, so their items are set using dict.__setitem__, which skips
+    # mutation tracking
+    setitem = dict.__setitem__
+    root = cls()
+    # the sections created so far, by dotted key. Keys sharing a parent are typically adjacent,
+    # so most keys only need a single lookup here
+    sections = {'': root}
+    for path, value in flat.items():
+        parent_path, _, key = path.rpartition('.')
+        container = sections.get(parent_path)
+        if container is None:
+            container = root
+            prefix = ''
+            for k in parent_path.split('.'):
+                prefix += k
+                sub = container.get(k)
+                if sub is None:
+                    sub = cls()
+                    setitem(container, k, sub)
+                elif not isinstance(sub, ConfigContainer):
+                    raise ConfigValueError(
+                        'Cannot unflatten %r: %r is not a section' % (path, prefix))
+                container = sections[prefix] = sub
+                prefix += '.'
+        if path in sections:
+            raise ConfigValueError('Cannot unflatten %r: it is a section' % (path, ))
+        setitem(container, key, value)
+    return root
+
+
 def get_config_container_from_dict(x, cls=ConfigContainer):
     """
     Deep-conversion of a dict to a ConfigContainer.
     """
-    if isinstance(x, dict):
-        # convert recursively, and preserve dict type
-        y = type(x)(
-            (k, get_config_container_from_dict(v, cls=cls))
-            for k, v in x.items()
-        )
-        return cls(y)
-    else:
+    if not isinstance(x, dict):
         # assume an atomic value
         return x
+    # convert top-down, replacing nested dicts in-place, using an explicit stack (as opposed
+    # to recursion) to support any nesting depth. The containers are new, so dict.__setitem__
+    # is used, skipping mutation tracking
+    root = cls(x)
+    stack = [root]
+    while stack:
+        container = stack.pop()
+        for k, v in container.items():
+            if isinstance(v, dict):
+                # replacing the value of an existing key is safe while iterating
+                v = cls(v)
+                dict.__setitem__(container, k, v)
+                stack.append(v)
+    return root
+
+
+def copy_config_tree(config):
+    """
+    Copy the containers of a config (including their metadata), sharing the leaf values.
+
+    This is cheaper than ``copy.deepcopy``, and suffices for applying overrides to the
+    copy without affecting the original.
+    """
+    if not isinstance(config, ConfigContainer):
+        return config
+    root = type(config)(config, metadata=config.get_metadata())
+    stack = [root]
+    while stack:
+        container = stack.pop()
+        for k, v in container.items():
+            if isinstance(v, ConfigContainer):
+                # the copies are new, so skipping mutation tracking
+                v = type(v)(v, metadata=v.get_metadata())
+                dict.__setitem__(container, k, v)
+                stack.append(v)
+    return root
 
 
 ################################################################################
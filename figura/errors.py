@@ -26,4 +26,19 @@ class ConfigValueError(ConfigError):
     """
     pass
 
+
+class ConfigValidationError(ConfigValueError):
+    """
+    Exception raised when a configuration does not match its schema.
+
+    :ivar errors: a list of (key, message) tuples, one per error found
+    """
+
+    def __init__(self, errors):
+        self.errors = list(errors)
+        super().__init__('Config validation failed with %d error(s):\n%s' % (
+            len(self.errors),
+            '\n'.join('  %s: %s' % (key, message) for key, message in self.errors)))
+
+
 ################################################################################
@@ -3,14 +3,153 @@ Low-level import-related tools.
 
 This module includes tools for enabling and disabling imoprting files with custom suffixes
 (e.g. ".fig") in python's import mechanism.
+
+Files with custom suffixes are also importable from zip archives on ``sys.path`` (e.g.
+zipapps), under python 3.10 and later.
 """
 
+import os
 import sys
+import zipimport
 import importlib
+import importlib.util
 import importlib.machinery
-from threading import RLock
+from threading import RLock, local
+from time import perf_counter
 
-SourceFileLoader = importlib.machinery.SourceFileLoader
+from . import tracing
+
+
+################################################################################
+
+class SourceFileLoader(importlib.machinery.SourceFileLoader):
+    """
+    The loader used for loading figura config files (a standard ``SourceFileLoader``,
+    with tracing support).
+    """
+
+    def exec_module(self, module):
+        _record_import(self.path)
+        with tracing.span(tracing.PHASE_IMPORT, self.name):
+            return super().exec_module(module)
+
+    def source_to_code(self, data, path, **kwargs):
+        with tracing.span(tracing.PHASE_COMPILE, self.name):
+            return super().source_to_code(data, path, **kwargs)
+
+
+class ZipSourceLoader:
+    """
+    The loader used for loading figura config files from zip archives.
+    """
+
+    def __init__(self, name, path, zip_importer):
+        self.name = name
+        self.path = path
+        self.zip_importer = zip_importer
+
+    def create_module(self, spec):
+        return None  # the default module creation
+
+    def exec_module(self, module):
+        _record_import(self.zip_importer.archive)
+        with tracing.span(tracing.PHASE_IMPORT, self.name):
+            exec(self.get_code(module.__name__), module.__dict__)
+
+    def get_code(self, fullname):
+        data = self.get_data(self.path)
+        with tracing.span(tracing.PHASE_COMPILE, self.name):
+            return compile(data, self.path, 'exec', dont_inherit=True)
+
+    def get_source(self, fullname):
+        return importlib.util.decode_source(self.get_data(self.path))
+
+    def get_data(self, path):
+        return self.zip_importer.get_data(path)
+
+    def get_filename(self, fullname):
+        return self.path
+
+    def is_package(self, fullname):
+        return os.path.basename(self.path).startswith('__init__.')
+
+    def list_dir(self, path):
+        """
+        List a directory inside the archive.
+
+        :return: a list of 2-tuples: (filename, is-directory)
+        """
+        archive = self.zip_importer.archive
+        rel_path = path[len(archive) + 1:]
+        return sorted(_get_zip_listing(self.zip_importer).dirs.get(rel_path, {}).items())
+
+
+class _FiguraZipImporter(zipimport.zipimporter):
+    """
+    A ``zipimporter`` which also finds files with the suffixes of the installed figura
+    importers.
+    """
+
+    def find_spec(self, fullname, target=None):
+        if _INSTALLED_LOADERS:
+            spec = self._find_figura_spec(fullname)
+            if spec is not None:
+                return spec
+        return super().find_spec(fullname, target)
+
+    def _find_figura_spec(self, fullname):
+        files = _get_zip_listing(self).files
+        base_name = self.prefix + fullname.rpartition('.')[2]
+        # like FileFinder, packages take precedence over modules:
+        for name, is_pkg in [
+                ('%s%s__init__%s' % (base_name, os.sep, suffix), True)
+                for suffix, _ in _INSTALLED_LOADERS
+        ] + [
+                ('%s%s' % (base_name, suffix), False) for suffix, _ in _INSTALLED_LOADERS
+        ]:
+            if name in files:
+                path = os.path.join(self.archive, name)
+                return importlib.util.spec_from_file_location(
+                    fullname, path, loader=ZipSourceLoader(fullname, path, self),
+                    submodule_search_locations=[] if is_pkg else None)
+        return None
+
+
+class _ZipListing:
+    """
+    The listing of a zip archive: the files in it, and the contents of each directory.
+    Paths are relative to the archive, using ``os.sep``.
+    """
+
+    def __init__(self, toc):
+        self.toc = toc
+        self.files = frozenset(toc)
+        # directory -> {filename -> is-directory}, including directories with no entries of
+        # their own:
+        self.dirs = {'': {}}
+        for name in toc:
+            # directory entries end with a separator
+            parts = name.rstrip(os.sep).split(os.sep)
+            for i in range(len(parts)):
+                is_dir = i < len(parts) - 1 or name.endswith(os.sep)
+                self.dirs.setdefault(os.sep.join(parts[:i]), {})[parts[i]] = is_dir
+                if is_dir:
+                    self.dirs.setdefault(os.sep.join(parts[:i + 1]), {})
+
+
+# archive filename -> _ZipListing
+_zip_listings = {}
+
+
+def _get_zip_listing(zip_importer):
+    # the listing is derived from the table-of-contents zipimport reads (and caches) for the
+    # archive, and is rebuilt when zipimport re-reads it (e.g. on importlib.invalidate_caches)
+    get_files = getattr(zip_importer, '_get_files', None)  # python>=3.13
+    toc = get_files() if get_files is not None else zip_importer._files
+    listing = _zip_listings.get(zip_importer.archive)
+    if listing is None or listing.toc is not toc:
+        listing = _zip_listings[zip_importer.archive] = _ZipListing(toc)
+    return listing
 
 
 ################################################################################
@@ -19,6 +158,48 @@ _HOOKS_PATCHED = False
 _INSTALLED_LOADERS = []
 
 
+################################################################################
+
+class ImportRecorder:
+    """
+    A context manager recording the files of the figura config files imported by the
+    current thread inside its block (imports done by other threads are not recorded)::
+
+        with ImportRecorder() as recorder:
+            read_config('myconf.web')
+        recorder.filenames  # includes the files imported by myconf.web
+
+    For files imported from zip archives, the archive is recorded.
+    """
+
+    def __init__(self):
+        self.filenames = set()
+
+    def __enter__(self):
+        _get_import_recorders().append(self)
+        return self
+
+    def __exit__(self, *a, **kw):
+        _get_import_recorders().remove(self)
+
+
+# per thread: the active ImportRecorders
+_local_recorders = local()
+
+
+def _get_import_recorders():
+    try:
+        return _local_recorders.recorders
+    except AttributeError:
+        recorders = _local_recorders.recorders = []
+        return recorders
+
+
+def _record_import(filename):
+    for recorder in getattr(_local_recorders, 'recorders', ()):
+        recorder.filenames.add(filename)
+
+
 ################################################################################
 # lock
 
@@ -34,7 +215,13 @@ class _ImpLockedContext:
         _figura_implock.release()
 
     def __enter__(self):
-        _figura_implock.__enter__()
+        if not tracing.is_enabled():
+            _figura_implock.acquire()
+        elif not _figura_implock.acquire(blocking=False):
+            # the lock is held by another thread
+            start = perf_counter()
+            _figura_implock.acquire()
+            tracing.emit(tracing.PHASE_LOCK_WAIT, None, start, perf_counter() - start)
 
     def __exit__(self, *a, **kw):
         _figura_implock.__exit__(*a, **kw)
@@ -75,6 +262,14 @@ def is_installed_figura_importer(suffix):
         return any(suffix == sfx for (sfx, loader) in _INSTALLED_LOADERS)
 
 
+def get_installed_figura_suffixes():
+    """
+    :return: a tuple of the suffixes currently made visible to python ``import``
+    """
+    with _ImpLockedContext():
+        return tuple(sfx for (sfx, loader) in _INSTALLED_LOADERS)
+
+
 ################################################################################
 # privates
 
@@ -121,9 +316,19 @@ def _patch_hooks():
     else:
         assert 0, 'no FileFinder found in sys.path_hooks'
 
+    # replace the zipimporter hook (supported only where zipimporter has find_spec):
+    if hasattr(zipimport.zipimporter, 'find_spec'):
+        for i, hook in enumerate(sys.path_hooks):
+            if hook is zipimport.zipimporter:
+                sys.path_hooks[i] = _FiguraZipImporter
+                break
+
     # patch finders already created and cached:
-    for key, finder in sys.path_importer_cache.items():
-        _patch_finder(finder)
+    for key, finder in list(sys.path_importer_cache.items()):
+        if type(finder) is zipimport.zipimporter and _FiguraZipImporter in sys.path_hooks:
+            sys.path_importer_cache[key] = _FiguraZipImporter(key)
+        else:
+            _patch_finder(finder)
 
     _HOOKS_PATCHED = True
 
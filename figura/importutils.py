@@ -3,17 +3,21 @@ Module-importing related tools, used for loading figura config files,
 and inspecting packages containing them.
 """
 
+import os
 import sys
-import copy
+import time
 import functools
+import threading
 import importlib
+import importlib.machinery
 from importlib.util import find_spec as _find_spec
 
 from .importer import (
     install_figura_importer, uninstall_figura_importer, is_installed_figura_importer,
-    _ImpLockedContext)
+    get_installed_figura_suffixes, _ImpLockedContext)
+from .misc import Struct
 from .settings import get_setting
-from .errors import ConfigParsingError
+from .errors import ConfigError, ConfigParsingError
 
 
 ################################################################################
@@ -35,7 +39,7 @@ class _SysModuleRestoringContext(_ImpLockedContext):
         super().__exit__(*a, **kw)
 
     def _backup(self):
-        self._sys_modules = copy.copy(sys.modules)
+        self._sys_modules = sys.modules.copy()
 
     def _restore(self):
         sys.modules.clear()
@@ -52,16 +56,25 @@ class FiguraImportContext(_SysModuleRestoringContext):
 
     - acquires the figura-importer lock, for (partial) concurrency protection (releases on exit)
       (implemented in baseclass)
-    - enables custom figura importer, for loading figura config files with the custom extension
-      (disable on exit)
+    - enables custom figura importer, for loading figura config files with the custom
+      extensions (disable on exit)
     - modules imported (directly and indirectly) are not added to ``sys.modules``
       (implemented in baseclass)
     - cache files (``*.pyc``) are not created
 
     Nesting a ``FiguraImportContext`` inside another is supported, but will incur unnecessary
     runtime overhead.
+
+    :param extensions: the extensions of the figura files to load (see
+        `get_config_file_extensions <#figura.importutils.get_config_file_extensions>`_): an
+        extension, a comma-separated string of extensions, or a sequence of extensions.
+        Defaults to the ``CONFIG_FILE_EXT`` setting.
     """
 
+    def __init__(self, extensions=None):
+        super().__init__()
+        self.extensions = None if extensions is None else normalize_extensions(extensions)
+
     def __enter__(self):
         super().__enter__()
 
@@ -81,17 +94,20 @@ class FiguraImportContext(_SysModuleRestoringContext):
         super().__exit__(*a, **kw)
 
     def _enable_figura_importer(self):
-        self.should_uninstall = False
-        fig_ext = get_setting('CONFIG_FILE_EXT')
-        fig_suffix = '.%s' % fig_ext
-        if not is_installed_figura_importer(fig_suffix):
-            install_figura_importer(fig_suffix)
-            self.should_uninstall = True
-            self.fig_ext = fig_ext
+        extensions = self.extensions
+        if extensions is None:
+            extensions = normalize_extensions(get_setting('CONFIG_FILE_EXT'))
+        self.installed_suffixes = []
+        for fig_ext in extensions:
+            fig_suffix = '.%s' % fig_ext
+            if not is_installed_figura_importer(fig_suffix):
+                install_figura_importer(fig_suffix)
+                self.installed_suffixes.append(fig_suffix)
+        _get_active_extensions().append(extensions)
 
     def _disable_figura_importer(self):
-        if self.should_uninstall:
-            fig_suffix = '.%s' % self.fig_ext
+        _get_active_extensions().pop()
+        for fig_suffix in self.installed_suffixes:
             uninstall_figura_importer(fig_suffix)
 
     def _disable_write_bytecode(self):
@@ -102,6 +118,62 @@ class FiguraImportContext(_SysModuleRestoringContext):
         sys.dont_write_bytecode = self.prev_dont_write_bytecode
 
 
+# per thread: the extensions of the active FiguraImportContexts, innermost last
+_local = threading.local()
+
+
+def _get_active_extensions():
+    try:
+        return _local.active_extensions
+    except AttributeError:
+        active_extensions = _local.active_extensions = []
+        return active_extensions
+
+
+def get_config_file_extensions():
+    """
+    :return: a tuple of the extensions of the figura files being loaded: those of the
+        innermost active `FiguraImportContext <#figura.importutils.FiguraImportContext>`_,
+        if any, else those of the ``CONFIG_FILE_EXT`` setting
+    """
+    active_extensions = _get_active_extensions()
+    if active_extensions:
+        return active_extensions[-1]
+    return normalize_extensions(get_setting('CONFIG_FILE_EXT'))
+
+
+@functools.lru_cache(maxsize=64)
+def _normalize_extensions(extensions):
+    if isinstance(extensions, str):
+        extensions = extensions.split(',')
+    normalized = []
+    for ext in extensions:
+        ext = ext.strip().lstrip('.')
+        if ext and ext not in normalized:
+            normalized.append(ext)
+    if not normalized:
+        raise ConfigError('No config file extensions given: %r' % (extensions, ))
+    return tuple(normalized)
+
+
+def normalize_extensions(extensions):
+    """
+    .. testsetup::
+
+        from figura.importutils import normalize_extensions
+
+    >>> normalize_extensions('fig')
+    ('fig',)
+    >>> normalize_extensions('fig, .customfig')
+    ('fig', 'customfig')
+    >>> normalize_extensions(['fig', 'customfig'])
+    ('fig', 'customfig')
+    """
+    if not isinstance(extensions, str):
+        extensions = tuple(extensions)
+    return _normalize_extensions(extensions)
+
+
 def figura_importing(func):
     """
     A function-decorator for running the function inside a ``FiguraImportContext``.
@@ -139,8 +211,43 @@ def is_importable_path(path, with_ext=None):
 
     Should be called from inside a ``FiguraImportContext``.
 
+    Most calls are failed probes (e.g. when looking for the file-path part of a path), and
+    the same ones are repeated by each ``read_config``.  Failures are cached (see the
+    ``IMPORT_PROBE_CACHE`` setting), until ``sys.path`` or the installed suffixes change, or
+    any of the directories which were searched, or of the files of the module which could
+    not be imported (e.g. a failing ``__init__.fig``), is modified (according to its mtime).
+
     :param path: a python import path
+    :param with_ext: if set, ``path`` must point to a file with this extension (or one of
+        these extensions, if a tuple)
     """
+    if not get_setting('IMPORT_PROBE_CACHE'):
+        return _is_importable_path(path, with_ext)
+
+    key = (path, with_ext)
+    scope = (tuple(sys.path), get_installed_figura_suffixes())
+    entry = _failed_probes.get(key)
+    if entry is not None:
+        entry_scope, stamped_paths, mtimes = entry
+        if (entry_scope == scope and _get_mtimes(stamped_paths) == mtimes
+                and path not in sys.modules):
+            _probe_cache_stats.hits += 1
+            return False
+        _probe_cache_stats.invalidations += 1
+        del _failed_probes[key]
+    _probe_cache_stats.misses += 1
+
+    if _is_importable_path(path, with_ext):
+        return True
+    stamped_paths = _get_stamped_paths(path)
+    mtimes = _get_mtimes(stamped_paths)
+    racy_since = int(time.time() * 1e9) - _RACY_WINDOW_NS
+    if all(mtime is None or mtime < racy_since for mtime in mtimes):
+        _failed_probes[key] = (scope, stamped_paths, mtimes)
+    return False
+
+
+def _is_importable_path(path, with_ext):
     try:
         module_spec = _find_spec(path)
     except (ImportError, AttributeError):
@@ -148,10 +255,94 @@ def is_importable_path(path, with_ext=None):
     if module_spec is None:
         return False
     if with_ext is not None:
+        if isinstance(with_ext, str):
+            with_ext = (with_ext, )
         filepath = module_spec.origin
-        if not filepath.endswith('.' + with_ext):
+        if not filepath.endswith(tuple('.' + ext for ext in with_ext)):
             return False
     return True
 
 
+def get_import_probe_cache_stats():
+    """
+    :return: a Struct with the statistics of the cache of failed import probes (see
+        `is_importable_path <#figura.importutils.is_importable_path>`_): hits, misses,
+        invalidations (of stale entries), size (number of entries) and hit_rate
+    """
+    stats = Struct(_probe_cache_stats, size=len(_failed_probes))
+    total = stats.hits + stats.misses
+    stats.hit_rate = stats.hits / total if total else 0.
+    return stats
+
+
+def clear_import_probe_cache():
+    """
+    Clear the cache of failed import probes, and reset its statistics.
+    """
+    _failed_probes.clear()
+    _probe_cache_stats.update(hits=0, misses=0, invalidations=0)
+
+
+# (path, with_ext) -> (scope, stamped paths (see _get_stamped_paths), their mtimes)
+_failed_probes = {}
+
+# Failures are not cached if a searched directory was modified very recently: the timestamps
+# of the filesystem are coarse, so another modification in the same tick would not change
+# its mtime (similar to "racy" entries in git's index)
+_RACY_WINDOW_NS = 20 * 1000 * 1000
+_probe_cache_stats = Struct(hits=0, misses=0, invalidations=0)
+
+
+def _get_stamped_paths(path):
+    """
+    :return: the paths whose mtimes determine whether ``path`` can be imported:
+
+        - the directories (and zip files) searched: the entries of sys.path, and the search
+          paths of the packages containing it (which were imported while probing). Adding or
+          removing files modifies them.
+        - the existing files of the first module in ``path`` which is not imported (e.g. a
+          package whose ``__init__.fig`` failed importing), searched for in the directories
+          it would be found in. Modifying a file in-place doesn't modify its directory.
+    """
+    dirs = [d or os.curdir for d in sys.path if isinstance(d, str)]
+    parent_dirs = dirs
+    parts = path.split('.')
+    for i in range(1, len(parts) + 1):
+        module = sys.modules.get('.'.join(parts[:i]))
+        if module is None:
+            files = _find_module_files(parts[i - 1], parent_dirs)
+            return tuple(dirs) + files
+        pkg_path = getattr(module, '__path__', None)
+        if pkg_path is None:
+            break
+        parent_dirs = list(pkg_path)
+        dirs.extend(parent_dirs)
+    return tuple(dirs)
+
+
+def _find_module_files(name, dirs):
+    """
+    :return: the existing files which could define module ``name``, in ``dirs``
+    """
+    suffixes = get_installed_figura_suffixes() + tuple(importlib.machinery.all_suffixes())
+    files = []
+    for d in dirs:
+        base = os.path.join(d or os.curdir, name)
+        candidates = [base + sfx for sfx in suffixes]
+        if os.path.isdir(base):
+            candidates.extend(os.path.join(base, '__init__' + sfx) for sfx in suffixes)
+        files.extend(f for f in candidates if os.path.isfile(f))
+    return tuple(files)
+
+
+def _get_mtimes(paths):
+    mtimes = []
+    for p in paths:
+        try:
+            mtimes.append(os.stat(p).st_mtime_ns)
+        except OSError:
+            mtimes.append(None)
+    return mtimes
+
+
 ################################################################################
@@ -0,0 +1,312 @@
+"""
+Tools for inspecting and reducing the memory used by configs.
+
+`memory_report <#figura.memory.memory_report>`_ reports which parts of a config use the
+most memory (also available as ``ConfigContainer.memory_report()``, and as
+``figura_print --stats``).
+
+Large config packages repeat the same keys and the same (short) string values across many
+containers, each parsed into a string object of its own.  `intern_config
+<#figura.memory.intern_config>`_ deduplicates them.  It can be applied automatically when
+reading a package, by enabling the ``INTERN_STRINGS`` setting (``FIGURA_INTERN_STRINGS=1``).
+
+`preload_for_fork <#figura.memory.preload_for_fork>`_ prepares configs loaded by a pre-fork
+server's master process, for sharing their memory with the forked workers.
+"""
+
+import gc
+import sys
+import heapq
+
+from .misc import Struct
+from .container import ConfigContainer, copy_config_tree, iter_containers
+
+
+################################################################################
+# memory report
+
+DEFAULT_NUM_LARGEST = 5
+
+
+def memory_report(config, num_largest=DEFAULT_NUM_LARGEST):
+    """
+    Measure the (deep) memory used by a config, and describe its shape.
+
+    Sizes are measured using ``sys.getsizeof``, and include the containers, their metadata,
+    keys and values.  An object referenced from several places (e.g. a string shared by
+    many containers) is only counted once, in the first place it is found.
+
+    The containers are walked using ``iter_containers`` (as in ``count_nodes``), which is
+    non-recursive, so any nesting depth is supported.
+
+    :param num_largest: the number of largest values to report
+    :return: a Struct with:
+
+        - total_bytes: the deep size of the config
+        - sections: a list of (key, bytes) of the top-level items, largest first
+        - num_containers, num_leaves, max_depth: as in ``count_nodes``
+        - widest: a 2-tuple (path, number of items) of the container with the most items
+        - largest_values: a list of (path, bytes) of the largest leaf values, largest first
+
+        Paths are dotted attr-paths.  The path of the config itself is ``''``.
+    """
+    seen = set()
+    if not isinstance(config, ConfigContainer):
+        return Struct(
+            total_bytes=_deep_sizeof(config, seen), sections=[], num_containers=0,
+            num_leaves=1, max_depth=0, widest=('', 0), largest_values=[])
+
+    section_bytes = {}
+    total_bytes = 0
+    num_containers = num_leaves = max_depth = 0
+    widest = ('', -1)
+    largest_values = []  # a min-heap of (bytes, path)
+    for keys, container in iter_containers(config):
+        path = '.'.join(keys)
+        section = keys[0] if keys else None
+        num_containers += 1
+        max_depth = max(max_depth, len(keys) + 1)
+        if len(container) > widest[1]:
+            widest = (path, len(container))
+        size = _sizeof(container, seen) + _deep_sizeof(container.get_metadata(), seen)
+        prefix = path + '.' if path else ''
+        for k, v in container.items():
+            key_size = _deep_sizeof(k, seen)
+            if isinstance(v, ConfigContainer):
+                # counted when visited
+                size += key_size
+                continue
+            num_leaves += 1
+            value_size = _deep_sizeof(v, seen)
+            item = (value_size, prefix + k)
+            if len(largest_values) < num_largest:
+                heapq.heappush(largest_values, item)
+            elif num_largest > 0 and item > largest_values[0]:
+                heapq.heapreplace(largest_values, item)
+            if section is None:
+                # a top-level leaf is a section of its own
+                section_bytes[k] = key_size + value_size
+                total_bytes += key_size + value_size
+            else:
+                size += key_size + value_size
+        total_bytes += size
+        if section is not None:
+            section_bytes[section] = section_bytes.get(section, 0) + size
+
+    return Struct(
+        total_bytes=total_bytes,
+        sections=sorted(section_bytes.items(), key=lambda item: (-item[1], item[0])),
+        num_containers=num_containers,
+        num_leaves=num_leaves,
+        max_depth=max_depth,
+        widest=widest,
+        largest_values=[(path, size) for size, path in sorted(largest_values, reverse=True)],
+    )
+
+
+def format_memory_report(report):
+    """
+    :param report: as returned by ``memory_report``
+    :return: a human-readable report (a string)
+    """
+    lines = [
+        'memory: %s' % _format_bytes(report.total_bytes),
+        'nodes: %d containers, %d leaves, max depth %d' % (
+            report.num_containers, report.num_leaves, report.max_depth),
+        'widest container: %s (%d items)' % (report.widest[0] or '<root>', report.widest[1]),
+    ]
+    if report.sections:
+        lines.append('sections (deep size):')
+        lines.extend('  %10s  %s' % (_format_bytes(size), key) for key, size in report.sections)
+    if report.largest_values:
+        lines.append('largest values:')
+        lines.extend(
+            '  %10s  %s' % (_format_bytes(size), path) for path, size in report.largest_values)
+    return '\n'.join(lines)
+
+
+def _format_bytes(n):
+    for unit in ['B', 'KiB', 'MiB']:
+        if n < 1024 or unit == 'MiB':
+            break
+        n /= 1024.
+    return ('%d %s' if unit == 'B' else '%.1f %s') % (n, unit)
+
+
+def _sizeof(x, seen):
+    if id(x) in seen:
+        return 0
+    seen.add(id(x))
+    return sys.getsizeof(x)
+
+
+def _deep_sizeof(x, seen):
+    # the objects of the config are alive during the walk, so their ids are unique
+    size = 0
+    stack = [x]
+    while stack:
+        x = stack.pop()
+        if id(x) in seen:
+            continue
+        seen.add(id(x))
+        size += sys.getsizeof(x)
+        if isinstance(x, dict):
+            stack.extend(x.keys())
+            stack.extend(x.values())
+        elif isinstance(x, (list, tuple, set, frozenset)):
+            stack.extend(x)
+    return size
+
+
+################################################################################
+# interning
+
+DEFAULT_MAX_INTERNED_LENGTH = 64
+"""
+String values longer than this are not deduplicated (long values rarely repeat)
+"""
+
+
+def intern_config(config, max_length=DEFAULT_MAX_INTERNED_LENGTH, table=None):
+    """
+    Deduplicate the strings in a config, in place: keys, and string values of up to
+    ``max_length`` characters (including in containers' metadata, and in nested dicts,
+    lists and tuples).  Equal strings are replaced by a single shared string object.
+
+    Keys are interned using ``sys.intern`` (like attribute names in python code are).
+
+    The walk is non-recursive, so it supports any nesting depth.
+
+    :param table: a dict mapping strings to their shared instance, for sharing string
+        values across calls.  By default, a new one is used.
+    :return: the number of strings replaced
+    """
+    if table is None:
+        table = {}
+    intern = sys.intern
+    setdefault = table.setdefault
+    nested_types = _NESTED_TYPES
+    num_replaced = 0
+
+    # Each item on the stack is a value to process, and where it is stored: (x, out, key).
+    # Tuples are rebuilt after their elements are processed, using a pending-build item:
+    # (_BUILD_TUPLE, (elems, out), key).
+    stack = [(config, None, None)]
+    pop = stack.pop
+    push = stack.append
+    while stack:
+        x, out, key = pop()
+        if x is _BUILD_TUPLE:
+            # all elements are processed by now
+            elems, out = out
+            if out is not None:
+                out[key] = tuple(elems)
+            continue
+
+        if isinstance(x, dict):
+            replaced_values = []
+            keys_changed = False
+            for k, v in x.items():
+                if type(k) is str and intern(k) is not k:
+                    keys_changed = True
+                if type(v) is str:
+                    if len(v) <= max_length:
+                        shared = setdefault(v, v)
+                        if shared is not v:
+                            replaced_values.append((k, shared))
+                elif type(v) in nested_types or isinstance(v, dict):
+                    push((v, x, k))
+            for k, v in replaced_values:
+                x[k] = v
+            num_replaced += len(replaced_values)
+            if keys_changed:
+                # re-inserting all items, to preserve their order
+                items = [(intern(k) if type(k) is str else k, v) for k, v in x.items()]
+                num_replaced += sum(1 for (k, _), k2 in zip(items, x) if k is not k2)
+                dict.clear(x)
+                dict.update(x, items)
+            if isinstance(x, ConfigContainer):
+                metadata = x.get_metadata()
+                for k, v in metadata.items():
+                    if type(v) is str and len(v) <= max_length:
+                        shared = setdefault(v, v)
+                        if shared is not v:
+                            metadata[k] = shared
+                            num_replaced += 1
+            continue
+
+        elems = x if type(x) is list else list(x)
+        if elems is not x:
+            push((_BUILD_TUPLE, (elems, out), key))
+        for i, v in enumerate(elems):
+            if type(v) is str:
+                if len(v) <= max_length:
+                    shared = setdefault(v, v)
+                    if shared is not v:
+                        elems[i] = shared
+                        num_replaced += 1
+            elif type(v) in nested_types or isinstance(v, dict):
+                push((v, elems, i))
+    return num_replaced
+
+
+_NESTED_TYPES = (list, tuple)
+
+# a marker for pending construction of tuples
+_BUILD_TUPLE = object()
+
+
+################################################################################
+# preloading for fork
+
+def preload_for_fork(configs, freeze_gc=True):
+    """
+    Build configs in the master process of a pre-fork server, before forking the workers, in
+    a way which lets the workers share the memory of the configs with the master (and with
+    each other) for longer.
+
+    After a fork, the workers share the master's memory pages until they write to them
+    (copy-on-write).  Merely reading a config writes to it: the garbage collector of each
+    worker writes to every object it tracks (every container, list, dict, etc. in the configs)
+    on full collections, and reference counting writes to every object read.  This:
+
+    - builds the configs, and deduplicates their strings (see intern_config_, using a single
+      table for all configs)
+    - copies their containers, after a garbage collection, so they are allocated together
+      rather than scattered among the objects discarded while parsing, and reading them
+      touches fewer pages
+    - moves all the objects (of the configs and of everything else loaded so far) out of the
+      garbage collector's reach, using ``gc.freeze()``, so collections in the workers don't
+      touch them
+
+    :note: reference counting still writes to the objects read by the workers (and to their
+        pages), so the workers' private memory still grows with the parts of the configs
+        they read.  Call ``gc.unfreeze()`` to undo the freezing, if needed.
+
+    :param configs: a list of configs to build: each is a ConfigContainer, a config path,
+        or a tuple of arguments to pass to `build_config <#figura.utils.build_config>`_
+    :param freeze_gc: whether to call ``gc.freeze()`` (python 3.7+)
+    :return: a list of the built configs
+
+    .. _intern_config: #figura.memory.intern_config
+    """
+    from .utils import build_config  # avoid circular import
+    built = []
+    for spec in configs:
+        if not isinstance(spec, tuple):
+            spec = (spec, )
+        built.append(build_config(*spec))
+    table = {}
+    for config in built:
+        intern_config(config, table=table)
+    del table
+    gc.collect()
+    preloaded = [copy_config_tree(config) for config in built]
+    del built
+    gc.collect()
+    if freeze_gc and hasattr(gc, 'freeze'):
+        gc.freeze()
+    return preloaded
+
+
+################################################################################
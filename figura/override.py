@@ -2,9 +2,11 @@
 Definitions and tools of override-set-related and config-overriding-related operations.
 """
 
+import collections
+
+from . import tracing
 from .container import ConfigContainer
 from .errors import ConfigError
-from .misc import deep_getattr, deep_setattr
 
 
 ################################################################################
@@ -20,10 +22,61 @@ class ConfigOverrideSet(ConfigContainer):
         self.get_metadata().is_override_set = True
 
 
+################################################################################
+# Override auditing
+
+# the value reported as the old value of a param which was not previously set
+MISSING_VALUE = '<<undef>>'
+
+OverrideChange = collections.namedtuple('OverrideChange', ['key', 'old_value', 'new_value'])
+OverrideChange.__doc__ = """
+A change made by applying an override: the (dotted) key of the param, and its old and new
+values.
+"""
+
+
+class OverrideAuditLog:
+    """
+    A log of the changes made by applying overrides, returned by
+    ``apply_overrides_to_config(..., audit=True)``.
+
+    Iterating over it yields `OverrideChange <#figura.override.OverrideChange>`_'s, in the order
+    the overrides were applied. The log stores the key prefix of each nested override-set
+    once, and only joins it with the keys when iterated over.
+    """
+
+    def __init__(self, missing_value=MISSING_VALUE):
+        self.missing_value = missing_value
+        self._entries = []  # (key_prefix, key, old_value, new_value)
+
+    def add(self, key_prefix, key, old_value, new_value):
+        self._entries.append((key_prefix, key, old_value, new_value))
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __iter__(self):
+        for key_prefix, key, old_value, new_value in self._entries:
+            yield OverrideChange(key_prefix + key, old_value, new_value)
+
+    def format_lines(self):
+        """
+        :return: an iterator of lines describing the changes, for logging
+        """
+        for key, old_value, new_value in self:
+            if old_value is self.missing_value:
+                yield '%s: %r (new)' % (key, new_value)
+            else:
+                yield '%s: %r -> %r' % (key, old_value, new_value)
+
+    def __repr__(self):
+        return '<%s: %d changes>' % (type(self).__name__, len(self))
+
+
 ################################################################################
 
 def apply_overrides_to_config(container, overrides, callback_key_prefix='',
-                              enforce_override_set=True, **kwargs):
+                              enforce_override_set=True, audit=False, **kwargs):
     """
     Apply overrides from an override-set to a container (in-place).
 
@@ -32,54 +85,84 @@ def apply_overrides_to_config(container, overrides, callback_key_prefix='',
     :param enforce_override_set: if ``enforce_override_set`` is set, raises an
         exception if ``overrides`` is not an override set (according to its
         ``is_override_set`` metadata attribute)
+    :param audit: if set, record the changes made, and return them
     :param kwargs: extra kwargs to pass on to `apply_override
         <#figura.override.apply_override>`_.
+    :return: if ``audit`` is set, an `OverrideAuditLog <#figura.override.OverrideAuditLog>`_
+        of the changes made, else None
     :raise ConfigError: if ``enforce_override_set`` and ``overrides`` isn't an
         override set.
     """
 
-    if enforce_override_set and not overrides.get_metadata().is_override_set:
-        raise ConfigError('Attempting to apply overrides while is_override_set=False')
-
-    for key, value in overrides.items():
-        applied = False
-
-        # check if overlaying -- i.e. if value is a nested container, which isn't
-        # marked as opaque.
-        old_value = container.get(key)
-        if (
-                isinstance(old_value, ConfigContainer) and
-                isinstance(value, ConfigContainer) and
-                not value.get_metadata().is_opaque_override
-        ):
-
-            # old_value and value are both containers -- a nested override, apply recursively
-            nested_container = container[key]
-            cur_key_prefix = '%s.' % (key, )
-            if callback_key_prefix:
-                cur_key_prefix = '%s.%s' % (callback_key_prefix, cur_key_prefix)
-            apply_overrides_to_config(
-                nested_container, value,
-                callback_key_prefix=cur_key_prefix,
-                enforce_override_set=enforce_override_set,
-                **kwargs
-            )
-            applied = True
+    _check_is_override_set(overrides, enforce_override_set)
+    audit_log = None
+    if audit:
+        audit_log = OverrideAuditLog(
+            missing_value=kwargs.get('callback_missing_value', MISSING_VALUE))
+    with tracing.span(
+            tracing.PHASE_APPLY_OVERRIDES, getattr(overrides, '__name__', None)) as trace:
+        trace.add(_apply_overrides_to_config(
+            container, overrides, callback_key_prefix, enforce_override_set, audit_log,
+            **kwargs))
+    return audit_log
+
+
+def _apply_overrides_to_config(container, overrides, callback_key_prefix, enforce_override_set,
+                               audit_log, **kwargs):
+    """
+    :return: the number of overrides applied
+    """
+    num_applied = 0
+    # Using an explicit stack of (container, overrides-items-iterator, callback_key_prefix),
+    # as opposed to recursion, to support any nesting depth.  Overrides are applied in
+    # the same (depth-first) order as they appear in the override-set.
+    stack = [(container, iter(overrides.items()), callback_key_prefix)]
+    while stack:
+        container, override_items, callback_key_prefix = stack[-1]
+        for key, value in override_items:
+
+            # check if overlaying -- i.e. if value is a nested container, which isn't
+            # marked as opaque.
+            old_value = container.get(key)
+            if (
+                    isinstance(old_value, ConfigContainer) and
+                    isinstance(value, ConfigContainer) and
+                    not value.get_metadata().is_opaque_override
+            ):
+                # old_value and value are both containers -- a nested override, step into it.
+                # the rest of override_items are applied after it.
+                _check_is_override_set(value, enforce_override_set)
+                nested_container = container[key]
+                cur_key_prefix = '%s.' % (key, )
+                if callback_key_prefix:
+                    delim = '' if callback_key_prefix.endswith('.') else '.'
+                    cur_key_prefix = '%s%s%s' % (callback_key_prefix, delim, cur_key_prefix)
+                stack.append((nested_container, iter(value.items()), cur_key_prefix))
+                break
 
-        if not applied:
             # flat or plain override
-            apply_override(
+            old_value = apply_override(
                 container, key, value,
                 callback_key_prefix=callback_key_prefix,
                 **kwargs
             )
-            applied = True
+            if audit_log is not None:
+                audit_log.add(callback_key_prefix, key, old_value, value)
+            num_applied += 1
+        else:
+            stack.pop()
+    return num_applied
+
+
+def _check_is_override_set(overrides, enforce_override_set):
+    if enforce_override_set and not overrides.get_metadata().is_override_set:
+        raise ConfigError('Attempting to apply overrides while is_override_set=False')
 
 
 def apply_override(
         container, key, value,
         callback=None,
-        callback_missing_value='<<undef>>',
+        callback_missing_value=MISSING_VALUE,
         callback_key_prefix='',
         ):
     """
@@ -95,20 +178,38 @@ def apply_override(
         old_value.
     :param callback_missing_value: the value to pass as old_value, in case the param
         was not previously set.
+    :return: the value overridden, or ``callback_missing_value`` if the param was not
+        previously set
 
     """
+    # a single walk of the key path, both for getting the old value and for setting the new one
+    parent, attr = _get_override_parent(container, key)
+    old_value = parent.get(attr, callback_missing_value) \
+        if isinstance(parent, dict) else callback_missing_value
     if callback is not None:
-        old_value = deep_getattr(
-            container, key, callback_missing_value,
-            key_normalizer=normalize_override_key,
-        )
-        callback_key = callback_key_prefix + key
-        callback(callback_key, value, old_value)
-    deep_setattr(
-        container, key, value,
-        auto_constructor=type(container),
-        key_normalizer=normalize_override_key,
-    )
+        callback(callback_key_prefix + key, value, old_value)
+    setattr(parent, attr, value)
+    return old_value
+
+
+def _get_override_parent(container, key):
+    """
+    Like deep_setattr (with auto-construction of missing containers, and normalization of
+    override keys), but only walking to the parent of the attribute to set.
+
+    :return: 2-tuple: (parent, attr)
+    """
+    auto_constructor = type(container)
+    attr, delim, rest = key.partition('.')
+    while delim:
+        attr = normalize_override_key(attr)
+        try:
+            container = getattr(container, attr)
+        except AttributeError:
+            setattr(container, attr, auto_constructor())
+            container = getattr(container, attr)
+        attr, delim, rest = rest.partition('.')
+    return container, normalize_override_key(attr)
 
 
 def normalize_override_key(key):
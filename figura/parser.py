@@ -2,11 +2,14 @@
 Parsing Figura config files.
 """
 
-import inspect
+from time import perf_counter
+from types import ModuleType
 
+from . import tracing
 from .misc import merge_dicts
 from .errors import ConfigParsingError
 from .container import ConfigContainer
+from .arrays import COMPACT_SEQUENCE_MIN_LENGTH, get_compact_storage, to_compact_sequence
 from .override import ConfigOverrideSet, normalize_override_key
 from .importutils import import_figura_file
 
@@ -55,6 +58,9 @@ class ConfigParser:
     to their metadata attribute (e.g., is_opaque)
     """
 
+    def __init__(self):
+        self._reset_caches()
+
     # ============================================================================================
     # main parsing methods
     # ============================================================================================
@@ -71,7 +77,12 @@ class ConfigParser:
         # load it using python's import mechanism:
         module = self.get_module(path)
         # post-import processing:
-        conf = self._python_to_conf(module)
+        try:
+            with tracing.span(tracing.PHASE_CONVERT, path):
+                conf = self._python_to_conf(module)
+        finally:
+            # the caches are only valid for the duration of a single parse
+            self._reset_caches()
         # post-parsing:
         self._finalize_config_container(conf, module)
         return conf
@@ -96,71 +107,158 @@ class ConfigParser:
     def _python_to_conf(self, x, name='', nesting_context=None, **metadata):
         """
         convert the intermediate config representation into a ConfigContainer.
+
+        The conversion is done using an explicit stack (as opposed to recursion),
+        so there is no limit on the nesting depth of the config.
         """
+        result = [None]
+        # Each item on the stack is a value to convert, and where to store the result of the
+        # conversion: (x, name, nesting_context, metadata, out, key) --> out[key] = converted x.
+        # Dicts and lists are created before their values are converted, and the converted
+        # values replace the raw values in-place.
+        # Tuples can only be created after their elements are converted.  This is done using a
+        # pending-build item: (_BUILD_TUPLE, elems, out, key).  Containers are built the same
+        # way, from a dict of their converted values, so building them doesn't go through
+        # ConfigContainer.__setitem__ (which tracks mutations): (_BUILD_CONTAINER, ...).
+        # The ids of the values being converted (the current value and the ones it is nested
+        # in) are kept in on_path, for detecting reference cycles.  A value is removed from it
+        # by a leave item, (_LEAVE_VALUE, id), which is pushed before the value's elements.
+        stack = [(x, name, nesting_context, metadata, result, 0)]
+        on_path = set()
+        pop = stack.pop
+        push = stack.append
+        atomic_types = self.VALID_ATOMIC_VALUE_TYPES
+        sequence_types = self.VALID_SEQUENCE_VALUE_TYPES
+        compact_storage = get_compact_storage()
+        # overlay resolution is interleaved with the conversion, so it is traced by
+        # accumulating its durations
+        trace_overlays = tracing.is_enabled()
+        if trace_overlays:
+            overlay_start = perf_counter()
+            overlay_name = getattr(x, '__name__', None)
+        overlay_duration = 0.
+        overlay_count = 0
+        while stack:
+            x, name, nesting_context, metadata, out, key = pop()
+
+            # If this is an atomic type, no parsing is required
+            if type(x) in atomic_types:
+                out[key] = x
+                continue
+            elif x is _BUILD_TUPLE:
+                # all elements are converted by now
+                elems = name
+                out[key] = tuple(elems)
+                continue
+            elif x is _BUILD_CONTAINER:
+                # all values are converted by now
+                container_cls, values, metadata_to_apply = name
+                container = out[key] = container_cls(values)
+                # set metadata attributes on the container
+                container.get_metadata().update(metadata_to_apply)
+                continue
+            elif x is _LEAVE_VALUE:
+                on_path.discard(name)
+                continue
 
-        # If this is an atomic type, no parsing is required
-        if type(x) in self.VALID_ATOMIC_VALUE_TYPES:
-            return x
-        elif type(x) in self.VALID_SEQUENCE_VALUE_TYPES:
-            # a sequence. apply to elements recursively
-            if hasattr(x, 'items'):
-                return type(x)((k, self._python_to_conf(v)) for k, v in x.items())
+            value_id = id(x)
+            if value_id in on_path:
+                raise ConfigParsingError(
+                    'Config construct contains itself (a reference cycle): %r' % (name or x, ))
+            on_path.add(value_id)
+            push((_LEAVE_VALUE, value_id, None, None, None, None))
+
+            if type(x) in sequence_types:
+                # a sequence. apply to elements
+                if hasattr(x, 'items'):
+                    elems = out[key] = type(x)(x)
+                    items = elems.items()
+                else:
+                    item_types = set(map(type, x))
+                    if item_types <= atomic_types:
+                        # the fast path: no element requires conversion
+                        out[key] = self._convert_atomic_sequence(x, item_types, compact_storage)
+                        continue
+                    elems = list(x)
+                    items = enumerate(elems)
+                    if type(x) is list:
+                        out[key] = elems
+                    else:
+                        push((_BUILD_TUPLE, elems, None, None, out, key))
+                # (pushed in reverse order, to be converted in order)
+                for k, v in reversed(list(items)):
+                    if type(v) not in atomic_types:
+                        push((v, '', None, {}, elems, k))
+                continue
+
+            if type(x) == ModuleType:
+
+                # the top-level module object --> a ConfigContainer
+                raw_attrs = self._get_dunder_dict(x)
+
+                # handle the __entry_point___ directive:
+                new_x = self._find_entry_point(raw_attrs)
+                if new_x is not None:
+                    # convert the new entry point instead
+                    push((new_x, '', None, {}, out, key))
+                    continue
+
+            elif _is_raw_container(x):
+                # a class --> a ConfigContainer
+                raw_attrs = self._get_dunder_dict(x)
+
+                # handle auto-overlay magic
+                if trace_overlays:
+                    t0 = perf_counter()
+                nesting_context = _make_nesting_context(name, x, nesting_context)
+                for overlayee in self._gen_overlayees(nesting_context):
+                    for k, v in self._get_dunder_dict(overlayee).items():
+                        if k not in raw_attrs:
+                            raw_attrs[k] = v
+                if trace_overlays:
+                    overlay_duration += perf_counter() - t0
+                    overlay_count += 1
             else:
-                return type(x)(self._python_to_conf(elem) for elem in x)
-
-        if type(x) == type(inspect):
-
-            # the top-level module object --> a ConfigContainer
-            raw_attrs = self._get_dunder_dict(x)
-
-            # handle the __entry_point___ directive:
-            new_x = self._find_entry_point(raw_attrs)
-            if new_x is not None:
-                # return the result of the recursive call on the new entry point
-                return self._python_to_conf(new_x)
-
-        elif _is_raw_container(x):
-            # a class --> a ConfigContainer
-            raw_attrs = self._get_dunder_dict(x)
-
-            # handle auto-overlay magic
-            if nesting_context is None:
-                nesting_context = []
-            nesting_context = nesting_context + [(name, x)]  # don't use append
-            for overlayee in self._gen_overlayees(nesting_context):
-                for k, v in self._get_dunder_dict(overlayee).items():
-                    if k not in raw_attrs:
-                        raw_attrs[k] = v
-        else:
-            # type misunderstood
-            raise ConfigParsingError('Config construct of unsupported type %r: %s' % (type(x), x))
-
-        # Separate raw_attrs to their types. See _prepare_attrs for more details.
-        real_attrs, meta_attrs = self._prepare_attrs(raw_attrs)
-
-        # if this is an overridet-set, all nested containers are also override sets automatically.
-        # we propagate this metadata attribute using the metadata dict:
-        if meta_attrs.get('is_override_set', False):
-            metadata['is_override_set'] = meta_attrs['is_override_set']
-
-        # convert real attr recursively
-        attrs = {
-            k: self._python_to_conf(v, name=k, nesting_context=nesting_context, **metadata)
-            for k, v in real_attrs.items()
-        }
-
-        # create the container
-        metadata_to_apply = merge_dicts(metadata, meta_attrs)
-        if metadata_to_apply.get('is_override_set', False):
-            container_cls = ConfigOverrideSet
-        else:
-            container_cls = ConfigContainer
-        container = container_cls(attrs)
+                # type misunderstood
+                raise ConfigParsingError(
+                    'Config construct of unsupported type %r: %s' % (type(x), x))
+
+            # Separate raw_attrs to their types. See _prepare_attrs for more details.
+            real_attrs, meta_attrs = self._prepare_attrs(raw_attrs)
+
+            # if this is an overridet-set, all nested containers are also override sets
+            # automatically. we propagate this metadata attribute using the metadata dict:
+            if meta_attrs.get('is_override_set', False):
+                metadata = merge_dicts(metadata, is_override_set=meta_attrs['is_override_set'])
+
+            # create the container
+            metadata_to_apply = merge_dicts(metadata, meta_attrs)
+            if metadata_to_apply.get('is_override_set', False):
+                container_cls = ConfigOverrideSet
+            else:
+                container_cls = ConfigContainer
+            push((_BUILD_CONTAINER, (container_cls, real_attrs, metadata_to_apply), None, None,
+                  out, key))
+
+            # convert real attrs (they replace the raw attrs in real_attrs)
+            for k, v in reversed(list(real_attrs.items())):
+                if type(v) not in atomic_types:
+                    push((v, k, nesting_context, metadata, real_attrs, k))
 
-        # set metadata attributes on the container
-        container.get_metadata().update(metadata_to_apply)
+        if trace_overlays:
+            tracing.emit(tracing.PHASE_OVERLAY, overlay_name, overlay_start, overlay_duration,
+                         overlay_count)
+        return result[0]
 
-        return container
+    def _convert_atomic_sequence(self, x, item_types, compact_storage):
+        """
+        Convert a list or a tuple of atomic values.
+        """
+        if compact_storage is not None and len(x) >= COMPACT_SEQUENCE_MIN_LENGTH:
+            compact = to_compact_sequence(x, compact_storage, item_types)
+            if compact is not None:
+                return compact
+        return list(x) if type(x) is list else x
 
     def _get_dunder_dict(self, x, deep=True):
         if x == object:
@@ -168,14 +266,19 @@ class ConfigParser:
             return {}
         if not deep:
             return dict(x.__dict__)
-        objs = [x]
         try:
-            objs.extend(inspect.getmro(x)[1:])
-        except AttributeError:
-            pass
-        dicts = [self._get_dunder_dict(obj, deep=False) for obj in objs]
-        d = merge_dicts(*reversed(dicts))
-        return d
+            d = self._dunder_dict_cache[x]
+        except KeyError:
+            objs = [x]
+            try:
+                objs.extend(x.__mro__[1:])
+            except AttributeError:
+                pass
+            dicts = [self._get_dunder_dict(obj, deep=False) for obj in objs]
+            d = merge_dicts(*reversed(dicts))
+            self._dunder_dict_cache[x] = d
+        # callers are allowed to modify the dict they get, so return a copy
+        return d.copy()
 
     def _prepare_attrs(self, raw_attrs):
         """
@@ -208,54 +311,82 @@ class ConfigParser:
     def _finalize_config_container(self, conf, module):
         conf._add_module_metadata(module)
 
+    def _reset_caches(self):
+        # maps a raw container to its (deep) dunder dict
+        self._dunder_dict_cache = {}
+        # maps (raw container, rel_path) to (overlayee, opaque), or None if missing
+        self._overlayee_cache = {}
+
     # ============================================================================================
     # overlay support
     # ============================================================================================
 
     def _gen_overlayees(self, nesting_context):
-        nesting_path = [x[0] for x in nesting_context]
-        nesting_containers = [x[1] for x in nesting_context]
-        rel_path = []
-        while nesting_containers:
-            nester = nesting_containers[-1]
-            # discontinue overlay chain if __opaque__ is set in nester
-            if _is_marked_opaque(nester):
+        rel_names = []  # reversed
+        while nesting_context is not None:
+            name, nester, outer_context, may_overlay = nesting_context
+            # discontinue overlay chain if __opaque__ is set in nester, or if there's nothing
+            # to overlay from here outwards
+            if not may_overlay:
                 break
-            if rel_path:
-                for nester_base in inspect.getmro(nester)[1:]:
-                    try:
-                        attr_path = '.'.join(rel_path)
-                        overlayee, opaque = \
-                            self._deep_getattr_with_opaqueness_check(nester_base, attr_path)
-                        # make sure the overlayee is a raw container, because it should
-                        # be possible to override any (primitive) value with a container,
-                        # in which case, no overlaying takes place.
-                        if _is_raw_container(overlayee):
-                            yield overlayee
-                        # discontinue overlay chain if __opaque__ is set somehere
-                        # in nester_base's path
-                        if opaque:
-                            break
-                    except AttributeError:
-                        pass
-            rel_path = nesting_path[-1:] + rel_path
-            nesting_path = nesting_path[:-1]
-            nesting_containers = nesting_containers[:-1]
-
-    def _deep_getattr_with_opaqueness_check(self, x, attr_path, *args):
-        opaque = _is_marked_opaque(x)
-        while True:
-            attr, delim, rest = attr_path.partition('.')
-            if delim:
-                # go one level deeper:
-                x = getattr(x, attr)
-                attr_path = rest
-                opaque = opaque or _is_marked_opaque(x)
-            else:
-                # deepest level
-                x = getattr(x, attr_path, *args)
-                opaque = opaque or _is_marked_opaque(x)
-                return x, opaque
+            nester_bases = nester.__mro__[1:]
+            if rel_names and nester_bases != (object, ):
+                rel_path = tuple(reversed(rel_names))
+                for nester_base in nester_bases:
+                    found = self._lookup_overlayee(nester_base, rel_path)
+                    if found is None:
+                        continue
+                    overlayee, opaque = found
+                    # make sure the overlayee is a raw container, because it should
+                    # be possible to override any (primitive) value with a container,
+                    # in which case, no overlaying takes place.
+                    if _is_raw_container(overlayee):
+                        yield overlayee
+                    # discontinue overlay chain if __opaque__ is set somehere
+                    # in nester_base's path
+                    if opaque:
+                        break
+            rel_names.append(name)
+            nesting_context = outer_context
+
+    def _lookup_overlayee(self, x, rel_path):
+        """
+        The equivalent of a deep-getattr of ``rel_path`` (a tuple of attribute names) in ``x``,
+        which also checks if ``__opaque__`` is set anywhere along the way.
+
+        Results are memoized, and a lookup reuses the result of the lookup of its
+        longest resolved prefix, so resolving the overlayees of nested containers
+        only costs a single ``getattr`` per lookup.
+
+        :return: a 2-tuple (overlayee, opaque), or None if the attribute is missing.
+        """
+        cache = self._overlayee_cache
+        try:
+            return cache[(x, rel_path)]
+        except KeyError:
+            pass
+
+        # find the longest prefix which is already resolved:
+        start = len(rel_path) - 1
+        while start > 0 and (x, rel_path[:start]) not in cache:
+            start -= 1
+        if start > 0:
+            found = cache[(x, rel_path[:start])]
+        else:
+            found = (x, _is_marked_opaque(x))
+
+        # resolve the rest, one level at a time:
+        for idx in range(start, len(rel_path)):
+            if found is not None:
+                obj, opaque = found
+                try:
+                    obj = getattr(obj, rel_path[idx])
+                except AttributeError:
+                    found = None
+                else:
+                    found = (obj, opaque or _is_marked_opaque(obj))
+            cache[(x, rel_path[:idx + 1])] = found
+        return found
 
     # ============================================================================================
     # __entry_point___ support
@@ -277,12 +408,41 @@ class ConfigParser:
         return entry_point
 
 
+################################################################################
+
+# markers used by ConfigParser._python_to_conf for pending construction of tuples and of
+# containers, and for leaving a value (after converting its elements)
+_BUILD_TUPLE = object()
+_BUILD_CONTAINER = object()
+_LEAVE_VALUE = object()
+
+
+def _make_nesting_context(name, raw_container, outer_context):
+    """
+    The nesting context of a raw container is a linked list (of 4-tuples) of all the raw
+    containers it is nested in, starting from itself:
+    ``(name, raw_container, outer_context, may_overlay)``.
+
+    ``may_overlay`` is false if overlaying is known to be impossible from this level outwards,
+    i.e. if the chain is discontinued by an ``__opaque__`` directive before reaching any
+    container which has a base other than ``object``.
+    This spares walking all the levels of deeply nested containers for nothing.
+    """
+    if _is_marked_opaque(raw_container):
+        may_overlay = False
+    elif raw_container.__mro__[1:] != (object, ):
+        may_overlay = True
+    else:
+        may_overlay = outer_context is not None and outer_context[3]
+    return (name, raw_container, outer_context, may_overlay)
+
+
 ################################################################################
 
 def _is_raw_container(x):
     # a raw container is the 'class x: ...' container as appears in the figura file, before
     # converting it to a ConfigContainer
-    return inspect.isclass(x)
+    return isinstance(x, type)
 
 
 def _is_marked_opaque(x):
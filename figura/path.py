@@ -2,8 +2,7 @@
 Definition of `FiguraPath <#figura.path.FiguraPath>`_.
 """
 
-from .settings import get_setting
-from .importutils import is_importable_path
+from .importutils import is_importable_path, get_config_file_extensions
 
 
 ################################################################################
@@ -82,8 +81,7 @@ class FiguraPath:
         return self.DELIM.join(tokens[:idx]), self.DELIM.join(tokens[idx:])
 
     def _is_figura_file_path(self, path):
-        fig_ext = get_setting('CONFIG_FILE_EXT')
-        return is_importable_path(path, fig_ext)
+        return is_importable_path(path, get_config_file_extensions())
 
     # ============================================================================================
     # operators for FiguraPath manipulation
@@ -0,0 +1,308 @@
+"""
+Querying configs by path patterns.
+
+A pattern is a dot-separated list of segments, each matching one level of nesting:
+
+- ``name``: the key ``name``
+- ``*``: any key
+- ``**``: any number of keys (including none)
+
+A segment may be followed by predicates in brackets, filtering the values it matches
+(which must be sections):
+
+- ``[key]``: the section has ``key``
+- ``[key OP literal]``: the value of ``key`` (which may be a dotted path) compares to a
+  python literal, where OP is one of ``==``, ``!=``, ``<``, ``<=``, ``>``, ``>=``
+
+``**[...]`` is short for ``**.*[...]``, i.e. sections at any depth.
+
+.. testsetup::
+
+   from figura import ConfigContainer
+
+>>> config = ConfigContainer.from_dict(dict(
+...     web=dict(db=dict(host='h1', port=5432), enabled=True),
+...     jobs=dict(db=dict(host='h2', port=3306), enabled=False)))
+>>> config.query('*.db.host')
+[('web.db.host', 'h1'), ('jobs.db.host', 'h2')]
+>>> [path for path, _ in config.query('**[enabled == True]')]
+['web']
+>>> [path for path, _ in config.query('**.db[port > 4000]')]
+['web.db']
+
+Queries are answered using a path index of the config, which is built on first use, reused
+by subsequent queries, and rebuilt after the config is modified.
+"""
+
+import re
+import ast
+import operator
+import functools
+
+from .errors import ConfigError
+from .container import ConfigContainer, get_config_tree_version
+
+
+################################################################################
+# The path index
+
+# used for joining keys into path strings matched by regexes (a key is unlikely to contain it)
+_SEP = '\x1f'
+
+
+class PathIndex:
+    """
+    An index of all the values in a config (excluding the config itself), by path.
+
+    :ivar paths: the paths of the values (tuples of keys), in pre-order
+    :ivar values: the values, matching ``paths``
+    :ivar version: the version of the config tree (see ``get_config_tree_version``) the
+        index was built at
+    """
+
+    def __init__(self, config):
+        self._tree_version = get_config_tree_version(config)
+        self.version = self._tree_version.value
+        self.paths = paths = []
+        self.values = values = []
+        # non-recursive pre-order walk. Items are pushed in reverse order, to be visited in order
+        stack = [((k, ), v) for k, v in reversed(list(config.items()))]
+        while stack:
+            path, value = stack.pop()
+            paths.append(path)
+            values.append(value)
+            if isinstance(value, ConfigContainer):
+                stack.extend((path + (k, ), v) for k, v in reversed(list(value.items())))
+        self._joined_paths = None
+        self._by_last_key = None
+        self._by_path = None
+
+    def is_valid(self):
+        return self.version == self._tree_version.value
+
+    @property
+    def joined_paths(self):
+        if self._joined_paths is None:
+            # each key is preceded by the separator, e.g. 'a.b' becomes '<SEP>a<SEP>b'
+            self._joined_paths = [_SEP + _SEP.join(path) for path in self.paths]
+        return self._joined_paths
+
+    @property
+    def by_last_key(self):
+        """
+        A dict mapping a key to the (ordered) positions of the values stored under it.
+        """
+        if self._by_last_key is None:
+            by_last_key = {}
+            for i, path in enumerate(self.paths):
+                by_last_key.setdefault(path[-1], []).append(i)
+            self._by_last_key = by_last_key
+        return self._by_last_key
+
+    @property
+    def by_path(self):
+        """
+        A dict mapping a path to the position of its value.
+        """
+        if self._by_path is None:
+            self._by_path = {path: i for i, path in enumerate(self.paths)}
+        return self._by_path
+
+
+def get_path_index(config):
+    """
+    :return: the (cached) `PathIndex <#figura.query.PathIndex>`_ of ``config``
+    """
+    index = config.__dict__.get('_path_index')
+    if index is None or not index.is_valid():
+        index = config.__dict__['_path_index'] = PathIndex(config)
+    return index
+
+
+################################################################################
+# Queries
+
+class Query:
+    """
+    A compiled query pattern. Use ``compile_query`` for creating one.
+    """
+
+    def __init__(self, pattern):
+        self.pattern = pattern
+        self.segments = _parse_pattern(pattern)
+        self._regex = re.compile(
+            ''.join(_segment_regex(name) for name, _ in self.segments) + r'\Z', re.DOTALL)
+        self._has_predicates = any(predicates for _, predicates in self.segments)
+        last_name = self.segments[-1][0]
+        self._last_key = last_name if last_name not in ('*', '**') else None
+
+    def run(self, config):
+        """
+        :return: a list of 2-tuples: (dotted path, value) of the values matching the pattern,
+            in the order they appear in the config
+        """
+        if not isinstance(config, ConfigContainer):
+            return []
+        index = get_path_index(config)
+        joined_paths = index.joined_paths
+        if self._last_key is not None:
+            candidates = index.by_last_key.get(self._last_key, ())
+        else:
+            candidates = range(len(joined_paths))
+        match = self._regex.match
+        results = []
+        for i in candidates:
+            if match(joined_paths[i]) is None:
+                continue
+            if self._has_predicates and not self._match_predicates(index.paths[i], index):
+                continue
+            results.append(('.'.join(index.paths[i]), index.values[i]))
+        return results
+
+    def _match_predicates(self, path, index):
+        # the regex only tells that the path matches, ignoring the predicates. Find an
+        # assignment of the path's keys to the segments which satisfies the predicates, by
+        # going over the possible (segment, position) states
+        segments = self.segments
+        states = {(0, 0)}
+        while states:
+            next_states = set()
+            for seg_idx, pos in states:
+                if seg_idx == len(segments):
+                    if pos == len(path):
+                        return True
+                    continue
+                name, predicates = segments[seg_idx]
+                if name == '**':
+                    # match no key, or one more key (staying in the same segment)
+                    next_states.add((seg_idx + 1, pos))
+                    if pos < len(path):
+                        next_states.add((seg_idx, pos + 1))
+                    continue
+                if pos == len(path) or (name != '*' and name != path[pos]):
+                    continue
+                if predicates:
+                    value = index.values[index.by_path[path[:pos + 1]]]
+                    if not all(predicate(value) for predicate in predicates):
+                        continue
+                next_states.add((seg_idx + 1, pos + 1))
+            states = next_states
+        return False
+
+    def __repr__(self):
+        return 'Query(%r)' % (self.pattern, )
+
+
+@functools.lru_cache(maxsize=256)
+def compile_query(pattern):
+    """
+    Compile a query pattern (see the module docs). Compiled queries are cached.
+
+    :return: a `Query <#figura.query.Query>`_
+    :raise ConfigError: if the pattern is invalid
+    """
+    return Query(pattern)
+
+
+def query(config, pattern):
+    """
+    Find the values in ``config`` matching ``pattern`` (see the module docs).
+
+    :return: a list of 2-tuples: (dotted path, value), in the order they appear in the config
+    """
+    return compile_query(pattern).run(config)
+
+
+################################################################################
+# Pattern parsing
+
+_SEGMENT_RE = re.compile(r'([^.\[\]\s]+)((?:\[[^\]]*\])*)(?:\.|\Z)')
+_PREDICATE_RE = re.compile(
+    r'\[\s*([\w.]+)\s*(?:(==|!=|<=|>=|<|>)\s*(.*?))?\s*\]')
+
+_OPERATORS = {
+    '==': operator.eq, '!=': operator.ne,
+    '<': operator.lt, '<=': operator.le,
+    '>': operator.gt, '>=': operator.ge,
+}
+
+
+def _parse_pattern(pattern):
+    """
+    :return: a list of 2-tuples: (name, list of predicates)
+    """
+    segments = []
+    pos = 0
+    while pos < len(pattern):
+        m = _SEGMENT_RE.match(pattern, pos)
+        if m is None or m.end() == pos:
+            raise ConfigError('Invalid query pattern: %r' % (pattern, ))
+        name, predicates_str = m.groups()
+        predicates = []
+        for pm in re.finditer(r'\[[^\]]*\]', predicates_str):
+            predicates.append(_parse_predicate(pm.group(), pattern))
+        if name == '**' and predicates:
+            # '**[...]' is short for '**.*[...]'
+            segments.append(('**', []))
+            name = '*'
+        segments.append((name, predicates))
+        pos = m.end()
+        if pos == len(pattern) and pattern.endswith('.'):
+            raise ConfigError('Invalid query pattern: %r' % (pattern, ))
+    if not segments:
+        raise ConfigError('Invalid query pattern: %r' % (pattern, ))
+    return segments
+
+
+def _parse_predicate(s, pattern):
+    m = _PREDICATE_RE.fullmatch(s)
+    if m is None:
+        raise ConfigError('Invalid predicate %r in query pattern: %r' % (s, pattern))
+    key, op, literal = m.groups()
+    if op is None:
+        return functools.partial(_has_key, key)
+    try:
+        literal = ast.literal_eval(literal)
+    except (ValueError, SyntaxError):
+        raise ConfigError('Invalid literal %r in query pattern: %r' % (literal, pattern)) \
+            from None
+    return functools.partial(_compare, key, _OPERATORS[op], literal)
+
+
+def _segment_regex(name):
+    # matching the joined paths of the index, in which every key is preceded by the separator
+    if name == '**':
+        return '(?:%s[^%s]+)*' % (_SEP, _SEP)
+    if name == '*':
+        return '%s[^%s]+' % (_SEP, _SEP)
+    return _SEP + re.escape(name)
+
+
+################################################################################
+# Predicates
+
+_MISSING = object()
+
+
+def _get_key(value, key):
+    if not isinstance(value, ConfigContainer):
+        return _MISSING
+    return value.deep_getattr(key, _MISSING)
+
+
+def _has_key(key, value):
+    return _get_key(value, key) is not _MISSING
+
+
+def _compare(key, op, literal, value):
+    v = _get_key(value, key)
+    if v is _MISSING:
+        return False
+    try:
+        return op(v, literal)
+    except TypeError:
+        # e.g. comparing a str to an int
+        return False
+
+
+################################################################################
@@ -0,0 +1,375 @@
+"""
+Declarative schemas for validating configs.
+
+A schema mirrors the structure of the configs it validates: a (nested) ConfigContainer or
+dict, whose sections correspond to sections of the config, and whose leaves are field
+specs.  A field spec is either a `Field <#figura.schema.Field>`_, or a string in a compact
+syntax (which can also be used in figura files)::
+
+    TYPE[ITEM_TYPE](MIN..MAX){CHOICE,...}?
+
+All parts but ``TYPE`` are optional:
+
+- ``TYPE``: one of ``int``, ``float`` (ints are accepted too), ``number``, ``str``,
+  ``bool``, ``list``, ``tuple``, ``seq`` (a list or a tuple), ``section`` (any
+  ConfigContainer), ``any``
+- ``[ITEM_TYPE]``: for sequences, the type of the items. E.g. ``list[str]``
+- ``(MIN..MAX)``: inclusive bounds of the value (for numbers), or of its length (for
+  strings and sequences). Either bound can be omitted. E.g. ``int(1..65535)``, ``str(1..)``
+- ``{CHOICE,...}``: the allowed values. E.g. ``str{debug,info,warning}``
+- ``?``: the key is optional (it may be missing, or None)
+
+A schema in a figura file::
+
+    class server:
+        host = 'str(1..)'
+        port = 'int(1..65535)'
+        log_level = 'str{debug,info,warning}?'
+    class workers:
+        count = 'int(1..)'
+        queues = 'list[str]'
+
+Schemas are compiled once into a flat validator, which checks a config in a single pass,
+and reports all the errors found (with their key paths)::
+
+    schema = Schema('myconf.schema')
+    schema.check(config)  # raises ConfigValidationError
+    errors = schema.validate(config)  # a list of (key, message) tuples
+
+"""
+
+import re
+
+from .container import ConfigContainer
+from .arrays import is_compact_sequence, get_compact_item_type
+from .errors import ConfigError, ConfigValidationError
+
+
+################################################################################
+# Fields
+
+_TYPE_NAMES = {
+    'int': (int, ),
+    'float': (float, int),
+    'number': (int, float),
+    'str': (str, ),
+    'bool': (bool, ),
+    'list': (list, ),
+    'tuple': (tuple, ),
+    'seq': (list, tuple),
+    'section': (ConfigContainer, ),
+    'any': None,
+}
+
+_SEQUENCE_TYPE_NAMES = ('list', 'tuple', 'seq')
+_SIZED_TYPE_NAMES = ('str', ) + _SEQUENCE_TYPE_NAMES
+_COMPACT_TYPE_NAMES = ('list', 'seq')
+
+_FIELD_SPEC_RE = re.compile(
+    r'^\s*(?P<type>\w+)'
+    r'(?:\[(?P<item_type>\w+)\])?'
+    r'(?:\((?P<min>[^)]*?)\.\.(?P<max>[^)]*)\))?'
+    r'(?:\{(?P<choices>[^}]*)\})?'
+    r'(?P<optional>\?)?\s*$')
+
+
+class Field:
+    """
+    A field of a schema.
+
+    :param type: a type name (see above)
+    :param required: if not set, the key may be missing (or None)
+    :param min: a lower bound of the value (or of its length, for strings and sequences)
+    :param max: an upper bound of the value (or of its length, for strings and sequences)
+    :param choices: the allowed values
+    :param item_type: for sequences, the type name of the items
+    """
+
+    def __init__(self, type='any', required=True, min=None, max=None, choices=None,
+                 item_type=None):
+        if type not in _TYPE_NAMES:
+            raise ConfigError('Invalid schema field type: %r' % (type, ))
+        if item_type is not None:
+            if type not in _SEQUENCE_TYPE_NAMES:
+                raise ConfigError('Item type specified for non-sequence type %r' % (type, ))
+            if item_type not in _TYPE_NAMES:
+                raise ConfigError('Invalid schema field item type: %r' % (item_type, ))
+        self.type = type
+        self.required = required
+        self.min = min
+        self.max = max
+        self.choices = None if choices is None else frozenset(choices)
+        self.item_type = item_type
+
+    @classmethod
+    def from_string(cls, spec):
+        """
+        Parse a field spec string.
+
+        .. testsetup::
+
+           from figura.schema import Field
+
+        >>> field = Field.from_string('int(1..65535)?')
+        >>> field.type, field.min, field.max, field.required
+        ('int', 1, 65535, False)
+        """
+        m = _FIELD_SPEC_RE.match(spec)
+        if m is None:
+            raise ConfigError('Invalid schema field spec: %r' % (spec, ))
+        type_name = m.group('type')
+        choices = m.group('choices')
+        if choices is not None:
+            if type_name in _SEQUENCE_TYPE_NAMES or type_name == 'section':
+                raise ConfigError(
+                    'Invalid schema field spec: %r (choices of a %s)' % (spec, type_name))
+            choices = [_parse_scalar(type_name, c.strip()) for c in choices.split(',')]
+        bound_type = 'int' if type_name in _SIZED_TYPE_NAMES else type_name
+        return cls(
+            type=type_name,
+            required=not m.group('optional'),
+            min=_parse_scalar(bound_type, m.group('min')),
+            max=_parse_scalar(bound_type, m.group('max')),
+            choices=choices,
+            item_type=m.group('item_type'),
+        )
+
+    def compile(self):
+        """
+        :return: a function, taking a value, and returning an error message, or None if
+            the value is valid.
+        """
+        types = _TYPE_NAMES[self.type]
+        item_types = _TYPE_NAMES[self.item_type] if self.item_type is not None else None
+        exact_types = frozenset(types) if types is not None else None
+        type_name = self.type
+        min_value = self.min
+        max_value = self.max
+        choices = self.choices
+        use_len = type_name in _SIZED_TYPE_NAMES
+        # compact sequences (see figura.arrays) are stored in place of lists
+        allow_compact = type_name in _COMPACT_TYPE_NAMES
+
+        def check_type(value):
+            if type(value) in exact_types:
+                # the common case
+                return None
+            # bool is an int, but a bool value is not a valid int
+            if isinstance(value, bool) or not isinstance(value, types):
+                if allow_compact and is_compact_sequence(value):
+                    return None
+                return 'expected %s, got %s' % (type_name, type(value).__name__)
+            return None
+
+        if min_value is None and max_value is None and choices is None and item_types is None:
+            return check_type if types is not None else _check_nothing
+
+        def check(value):
+            if types is not None:
+                message = check_type(value)
+                if message is not None:
+                    return message
+            if min_value is not None or max_value is not None:
+                size = len(value) if use_len else value
+                if min_value is not None and size < min_value:
+                    return '%s must be >= %s (got %r)' % (
+                        'length' if use_len else 'value', min_value, size)
+                if max_value is not None and size > max_value:
+                    return '%s must be <= %s (got %r)' % (
+                        'length' if use_len else 'value', max_value, size)
+            if choices is not None:
+                try:
+                    is_choice = value in choices
+                except TypeError:
+                    # unhashable, e.g. a list in an 'any' field
+                    is_choice = False
+                if not is_choice:
+                    return 'must be one of %s (got %r)' % (sorted(choices, key=repr), value)
+            if item_types is not None and allow_compact and is_compact_sequence(value):
+                # all the items are of the same type
+                item_type = get_compact_item_type(value)
+                if len(value) and item_type not in item_types:
+                    return 'item 0: expected %s, got %s' % (self.item_type, item_type.__name__)
+            elif item_types is not None:
+                for i, item in enumerate(value):
+                    if (isinstance(item, bool) and bool not in item_types) or \
+                            not isinstance(item, item_types):
+                        return 'item %d: expected %s, got %s' % (
+                            i, self.item_type, type(item).__name__)
+            return None
+
+        return check
+
+    def __repr__(self):
+        return 'Field(%r, required=%r)' % (self.type, self.required)
+
+
+def _check_nothing(value):
+    return None
+
+
+def _parse_scalar(type_name, s):
+    if s is None:
+        return None
+    s = s.strip()
+    if not s:
+        return None
+    try:
+        if type_name == 'int':
+            return int(s)
+        if type_name in ('float', 'number'):
+            return float(s) if '.' in s or 'e' in s.lower() else int(s)
+        if type_name == 'bool':
+            return {'true': True, 'false': False}[s.lower()]
+    except (ValueError, KeyError):
+        raise ConfigError('Invalid %s value in schema: %r' % (type_name, s)) from None
+    return s
+
+
+def to_field(spec):
+    """
+    :param spec: a ``Field``, or a field spec string
+    """
+    if isinstance(spec, Field):
+        return spec
+    if isinstance(spec, str):
+        return Field.from_string(spec)
+    raise ConfigError('Invalid schema field spec: %r' % (spec, ))
+
+
+################################################################################
+# Schema
+
+# kinds of validation instructions
+_FIELD = 0
+_SECTION = 1
+
+_MISSING = object()
+
+
+class Schema:
+    """
+    A compiled schema.
+
+    :param spec: a (nested) ConfigContainer or dict of field specs, or the path of a
+        figura config defining one.
+    :param allow_extra_keys: if not set, keys of the config which are not in the schema
+        are reported as errors.
+    """
+
+    def __init__(self, spec, allow_extra_keys=True):
+        if isinstance(spec, str):
+            from .utils import read_config
+            spec = read_config(spec)
+        if not isinstance(spec, dict):
+            raise ConfigError('A schema must be a container of field specs')
+        self.allow_extra_keys = allow_extra_keys
+        self._compile(spec)
+
+    def _compile(self, spec):
+        # The schema tree is compiled into a flat list of instructions, each reading a key
+        # from a container resolved by an earlier instruction.  Containers are kept in
+        # "slots" (slot 0 is the validated config).
+        instructions = []
+        section_keys = [frozenset(spec)]  # per slot, the keys of the section in the schema
+        slot_paths = ['']
+        compiled_fields = {}
+        stack = [(spec, 0, '')]
+        while stack:
+            section_spec, slot, prefix = stack.pop()
+            sub_sections = []
+            for key, sub_spec in section_spec.items():
+                path = prefix + key
+                if isinstance(sub_spec, dict):
+                    child_slot = len(section_keys)
+                    section_keys.append(frozenset(sub_spec))
+                    slot_paths.append(path)
+                    instructions.append((_SECTION, slot, key, path, child_slot, True))
+                    sub_sections.append((sub_spec, child_slot, path + '.'))
+                else:
+                    try:
+                        check, required = compiled_fields[sub_spec]
+                    except KeyError:
+                        # compiled once per distinct field spec
+                        field = to_field(sub_spec)
+                        check, required = compiled_fields[sub_spec] = (
+                            field.compile(), field.required)
+                    except TypeError:
+                        # unhashable
+                        field = to_field(sub_spec)
+                        check, required = field.compile(), field.required
+                    instructions.append((_FIELD, slot, key, path, check, required))
+            # sections are resolved before their contents, and in order:
+            stack.extend(reversed(sub_sections))
+        self._instructions = instructions
+        self._section_keys = section_keys
+        self._slot_paths = slot_paths
+
+    def validate(self, config):
+        """
+        Validate ``config`` against the schema.
+
+        :return: a list of (key, message) tuples, one per error found. Empty if ``config``
+            is valid.
+        """
+        errors = []
+        slots = [None] * len(self._section_keys)
+        slots[0] = config
+        for kind, slot, key, path, arg, required in self._instructions:
+            container = slots[slot]
+            if container is None:
+                # the containing section is missing or invalid (already reported)
+                continue
+            value = container.get(key, _MISSING)
+            if value is _MISSING or value is None:
+                if required:
+                    errors.append((path, 'missing required key'))
+                continue
+            if kind == _FIELD:
+                message = arg(value)
+                if message is not None:
+                    errors.append((path, message))
+            elif isinstance(value, dict):
+                slots[arg] = value
+            else:
+                errors.append((path, 'expected a section, got %s' % type(value).__name__))
+
+        if not self.allow_extra_keys:
+            for slot, container in enumerate(slots):
+                if container is None:
+                    continue
+                extra_keys = container.keys() - self._section_keys[slot]
+                if extra_keys:
+                    prefix = self._slot_paths[slot] + '.' if slot else ''
+                    errors.extend(
+                        (prefix + key, 'unexpected key') for key in sorted(extra_keys))
+        return errors
+
+    def check(self, config):
+        """
+        Validate ``config`` against the schema.
+
+        :raise ConfigValidationError: if ``config`` is invalid. The errors found are
+            available as its ``errors`` attribute.
+        """
+        errors = self.validate(config)
+        if errors:
+            raise ConfigValidationError(errors)
+        return config
+
+
+def validate_config(config, schema, **kwargs):
+    """
+    A convenience function for validating a config against a schema (which is compiled
+    for the purpose).
+
+    :param schema: a `Schema <#figura.schema.Schema>`_, or a spec to compile one from.
+    :param kwargs: passed to ``Schema`` when compiling
+    :raise ConfigValidationError: if ``config`` is invalid.
+    """
+    if not isinstance(schema, Schema):
+        schema = Schema(schema, **kwargs)
+    return schema.check(config)
+
+
+################################################################################
@@ -14,7 +14,18 @@ DEFAULT_CONFIG_FILE_EXT = 'fig'
 # The SETTINGS
 
 SETTINGS = Struct(
+    # the extension of figura files. Can also be a comma-separated string, or a sequence, of
+    # several extensions (see figura.importutils.get_config_file_extensions)
     CONFIG_FILE_EXT=_ENV.get('FIGURA_CONFIG_FILE_EXT', DEFAULT_CONFIG_FILE_EXT),
+    # if set, configs are read from this bundle file (see figura.bundle)
+    BUNDLE_FILE=_ENV.get('FIGURA_BUNDLE_FILE') or None,
+    # the storage of large numeric sequences: None, 'array' or 'numpy' (see figura.arrays)
+    COMPACT_SEQUENCES=_ENV.get('FIGURA_COMPACT_SEQUENCES') or None,
+    # deduplicate the strings of packages read (see figura.memory). Off by default: it makes
+    # reading slower, and only saves memory for packages repeating many strings
+    INTERN_STRINGS=_ENV.get('FIGURA_INTERN_STRINGS', '0') != '0',
+    # cache failed lookups of modules (see figura.importutils.is_importable_path)
+    IMPORT_PROBE_CACHE=_ENV.get('FIGURA_IMPORT_PROBE_CACHE', '1') != '0',
 )
 
 
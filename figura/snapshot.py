@@ -0,0 +1,182 @@
+"""
+Immutable config snapshots, for sharing a config between threads which read it and a thread
+which replaces it (e.g. a background thread rebuilding the config of a threaded server)::
+
+    holder = ConfigSnapshotHolder(build_config('myconf.web'))
+
+    # request threads, no locking:
+    config = holder.get()
+    connect(config.db.host, config.db.port)
+
+    # the background thread:
+    holder.publish(build_config('myconf.web'))
+
+Readers get the current snapshot by a single attribute read, which is atomic, so they never
+lock and never block.  The writer builds a new snapshot and swaps it in by a single
+attribute assignment (RCU-style: read-copy-update).  A reader keeps using the snapshot it
+got for as long as it holds a reference to it, so a request sees a consistent config even if
+a new one is published in the middle of it.  An old snapshot is reclaimed (by reference
+counting) as soon as the last reader using it drops it.
+
+A snapshot is a `FrozenConfigContainer <#figura.snapshot.FrozenConfigContainer>`_, whose
+sections can't be modified.  Leaf values (e.g. lists) are not copied, so they should be
+treated as read-only too.
+"""
+
+import weakref
+import itertools
+import threading
+
+from .errors import ConfigError
+from .container import ConfigContainer
+
+
+################################################################################
+
+class FrozenConfigContainer(ConfigContainer):
+    """
+    A ConfigContainer which can't be modified. Create using `freeze_config
+    <#figura.snapshot.freeze_config>`_.
+
+    Modifying it (e.g. ``config.x = 1``, ``config.update(...)``) raises a ConfigError.
+    """
+
+    def _frozen(self, *args, **kwargs):
+        raise ConfigError('Attempting to modify a frozen config')
+
+    __setitem__ = __delitem__ = update = setdefault = pop = popitem = clear = __ior__ = _frozen
+
+    def copy(self):
+        """
+        :return: a (shallow, mutable) ConfigContainer copy of self
+        """
+        return ConfigContainer(self, metadata=self.get_metadata())
+
+    def __reduce__(self):
+        # the default (dict) pickling sets the items after creating the object
+        return type(self), (dict(self), ), self.__getstate__()
+
+    def __reduce_ex__(self, protocol):
+        return self.__reduce__()
+
+
+def freeze_config(config):
+    """
+    Create a frozen copy of a config: its containers (including nested ones, with their
+    metadata) are copied into FrozenConfigContainers. Leaf values are shared.
+
+    :return: a `FrozenConfigContainer <#figura.snapshot.FrozenConfigContainer>`_
+    """
+    return _convert_config_tree(config, FrozenConfigContainer)
+
+
+def thaw_config(config):
+    """
+    The reverse of freeze_config: create a mutable copy of a (frozen) config, e.g. for
+    building the next snapshot from the current one. Leaf values are shared.
+    """
+    return _convert_config_tree(config, ConfigContainer)
+
+
+def _convert_config_tree(config, cls):
+    # like copy_config_tree, but converting the containers to cls. The nested containers are
+    # set using dict.__setitem__, which works for frozen containers too
+    root = cls(config, metadata=config.get_metadata())
+    stack = [root]
+    while stack:
+        container = stack.pop()
+        for k, v in container.items():
+            if isinstance(v, ConfigContainer):
+                v = cls(v, metadata=v.get_metadata())
+                dict.__setitem__(container, k, v)
+                stack.append(v)
+    return root
+
+
+################################################################################
+
+class ConfigSnapshotHolder:
+    """
+    Holds the current snapshot of a config. See the module docs.
+
+    :param config: the initial config (optional, can be published later)
+    """
+
+    def __init__(self, config=None):
+        # the (version, snapshot) pair, replaced as a whole, so readers always see a
+        # matching pair
+        self._current = (0, None)
+        self._versions = itertools.count(1)
+        # serializes writers (readers never lock)
+        self._write_lock = threading.Lock()
+        # id -> weakref of the snapshots published and not yet reclaimed (containers are
+        # unhashable, so not using a WeakSet)
+        self._live_snapshots = {}
+        if config is not None:
+            self.publish(config)
+
+    def get(self):
+        """
+        :return: the current snapshot (a FrozenConfigContainer), or None if none was
+            published
+        """
+        return self._current[1]
+
+    def get_with_version(self):
+        """
+        :return: 2-tuple: (version, snapshot). The version is incremented by each publish
+        """
+        return self._current
+
+    @property
+    def version(self):
+        return self._current[0]
+
+    def publish(self, config):
+        """
+        Make a (frozen copy of a) config the current snapshot.
+
+        :param config: a ConfigContainer. It is frozen outside the write lock, and can be
+            modified afterwards without affecting the snapshot
+        :return: the new snapshot
+        """
+        snapshot = config if isinstance(config, FrozenConfigContainer) else freeze_config(config)
+        with self._write_lock:
+            self._publish(snapshot)
+        return snapshot
+
+    def update(self, func):
+        """
+        Build the next snapshot from the current one, and publish it. Calls to update are
+        serialized, so no update is lost.
+
+        :param func: a callable, taking a mutable copy of the current snapshot (or None, if
+            none was published), and returning the new config (possibly the same one,
+            modified)
+        :return: the new snapshot
+        """
+        with self._write_lock:
+            current = self.get()
+            config = func(thaw_config(current) if current is not None else None)
+            snapshot = freeze_config(config)
+            self._publish(snapshot)
+        return snapshot
+
+    def _publish(self, snapshot):
+        self._current = (next(self._versions), snapshot)
+        key = id(snapshot)
+        self._live_snapshots[key] = weakref.ref(
+            snapshot, lambda _, key=key: self._live_snapshots.pop(key, None))
+
+    def num_live_snapshots(self):
+        """
+        :return: the number of snapshots published which were not yet reclaimed, i.e. the
+            current one, and the old ones still referenced (e.g. by readers)
+        """
+        return len(self._live_snapshots)
+
+    def __repr__(self):
+        return '<%s: version %d>' % (type(self).__name__, self.version)
+
+
+################################################################################
@@ -0,0 +1,181 @@
+"""
+Rendering many configs in one process (``figura_print --batch``).
+
+A batch manifest is a JSON Lines file, with one render job per line. E.g.::
+
+    {"id": "web-prod", "configs": ["myconf.web", "myconf.env.prod"], "output": "out/web-prod.json"}
+    {"id": "web-dev", "configs": ["myconf.web", "myconf.env.dev"], "overrides": "log.level=debug"}
+
+Job fields:
+
+- ``configs`` (required): a list of paths (a base config followed by override-sets),
+  as passed to ``figura_print``
+- ``overrides``: extra overrides, either a string (``'a.b=1,c=x'``, as passed to
+  ``figura_print --override``), a list of such strings, or a dict
+- ``format``: ``json`` (the default) or ``python``
+- ``output``: a file to write the rendered config to. If missing, the rendered config is
+  included in the results stream.
+- ``id``: an identifier of the job, included in the results. Defaults to the line number.
+
+The results stream is JSON Lines as well, one line per job, in the order of the manifest.
+Each line contains the ``id`` of the job, and either ``output`` (the rendered config),
+``file`` (the file it was written to) or ``error``.
+
+Configs are read once per process, and shared between jobs. With ``num_workers > 1``, jobs
+are rendered by a pool of processes, and jobs with the same configs are sent to the same
+worker, where possible.
+"""
+
+import os
+import json
+import multiprocessing
+from collections import namedtuple
+
+from figura.tools.render import ConfigCache, render_config, FORMAT_MAP
+
+################################################################################
+
+BatchJob = namedtuple('BatchJob', 'id configs overrides format output')
+BatchResult = namedtuple('BatchResult', 'id output file error')
+
+JOB_FIELDS = frozenset(BatchJob._fields)
+
+
+################################################################################
+# manifest
+
+def load_manifest(path, default_format='json'):
+    """
+    :return: a list of `BatchJob`
+    """
+    with open(path) as f:
+        return list(parse_manifest(f, default_format=default_format))
+
+
+def parse_manifest(lines, default_format='json'):
+    """
+    Parse manifest lines. Empty lines and lines starting with ``#`` are skipped.
+
+    :raise ValueError: on a malformed job
+    """
+    for lineno, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        try:
+            dct = json.loads(line)
+            yield make_job(dct, default_id=str(lineno), default_format=default_format)
+        except ValueError as e:
+            raise ValueError('Invalid batch job on line %d: %s' % (lineno, e)) from None
+
+
+def make_job(dct, default_id=None, default_format='json'):
+    if not isinstance(dct, dict):
+        raise ValueError('a job must be a JSON object')
+    unknown = set(dct) - JOB_FIELDS
+    if unknown:
+        raise ValueError('unknown job fields: %s' % ', '.join(sorted(unknown)))
+    configs = dct.get('configs')
+    if isinstance(configs, str):
+        configs = [configs]
+    if not configs:
+        raise ValueError('no configs specified')
+    fmt = dct.get('format', default_format)
+    if fmt not in FORMAT_MAP:
+        raise ValueError('unsupported format: %r' % (fmt, ))
+    return BatchJob(
+        id=str(dct.get('id', default_id)),
+        configs=tuple(configs),
+        overrides=dct.get('overrides'),
+        format=fmt,
+        output=dct.get('output'),
+    )
+
+
+################################################################################
+# running
+
+_worker_cache = None
+
+
+def _get_worker_cache():
+    global _worker_cache
+    if _worker_cache is None:
+        _worker_cache = ConfigCache()
+    return _worker_cache
+
+
+def render_job(job, cache=None):
+    """
+    Render a single job. Errors are reported in the result, not raised.
+
+    :return: a `BatchResult`
+    """
+    if cache is None:
+        cache = _get_worker_cache()
+    try:
+        _, text = render_config(job.configs, job.overrides, fmt=job.format, cache=cache)
+        if job.output is None:
+            return BatchResult(job.id, text, None, None)
+        dirname = os.path.dirname(job.output)
+        if dirname:
+            os.makedirs(dirname, exist_ok=True)
+        with open(job.output, 'w') as f:
+            f.write(text)
+            f.write('\n')
+        return BatchResult(job.id, None, job.output, None)
+    except Exception as e:
+        return BatchResult(job.id, None, None, '%s: %s' % (type(e).__name__, e))
+
+
+def _render_indexed_job(indexed_job):
+    index, job = indexed_job
+    return index, render_job(job)
+
+
+def run_batch(jobs, num_workers=1):
+    """
+    Render all ``jobs``.
+
+    :param num_workers: if greater than 1, jobs are rendered by a pool of this many processes.
+    :return: a list of `BatchResult`, in the order of ``jobs``
+    """
+    jobs = list(jobs)
+    if num_workers <= 1 or len(jobs) <= 1:
+        cache = ConfigCache()
+        return [render_job(job, cache) for job in jobs]
+
+    # group jobs reading the same configs, so they are likely to be handled by the same
+    # worker, and share its cache:
+    indexed_jobs = sorted(enumerate(jobs), key=lambda ij: ij[1].configs)
+    chunksize = max(1, len(jobs) // (num_workers * 4))
+    results = [None] * len(jobs)
+    with multiprocessing.Pool(num_workers) as pool:
+        for index, result in pool.imap_unordered(
+                _render_indexed_job, indexed_jobs, chunksize=chunksize):
+            results[index] = result
+    return results
+
+
+def write_results(results, out):
+    """
+    Write the results to ``out``, in JSON Lines format.
+
+    :return: number of failed jobs
+    """
+    num_errors = 0
+    for result in results:
+        dct = dict(id=result.id)
+        if result.error is not None:
+            dct['error'] = result.error
+            num_errors += 1
+        elif result.file is not None:
+            dct['file'] = result.file
+        else:
+            dct['output'] = result.output
+        out.write(json.dumps(dct))
+        out.write('\n')
+    return num_errors
+
+
+################################################################################
@@ -0,0 +1,85 @@
+"""
+A client of the render server (``figura_print --serve``).
+
+Example::
+
+    with RenderClient('/tmp/figura.sock') as client:
+        output = client.render(['myconf.web', 'myconf.env.prod'], overrides='a.b=1')
+
+The client remembers the etag and output of each distinct request, so unchanged outputs
+are not sent again by the server.
+"""
+
+import json
+import socket
+
+from figura.errors import ConfigError
+
+
+################################################################################
+
+class RenderClient:
+
+    def __init__(self, socket_path, timeout=None):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._sock = None
+        self._rfile = None
+        self._outputs = {}  # request key -> (etag, output)
+
+    def connect(self):
+        if self._sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+            self._sock = sock
+            self._rfile = sock.makefile('rb')
+        return self
+
+    def close(self):
+        if self._sock is not None:
+            self._rfile.close()
+            self._sock.close()
+            self._sock = self._rfile = None
+
+    def __enter__(self):
+        return self.connect()
+
+    def __exit__(self, *a, **kw):
+        self.close()
+
+    def request(self, request):
+        """
+        Send a raw request (a dict), and return the response (a dict).
+        """
+        self.connect()
+        self._sock.sendall(json.dumps(request).encode('utf-8') + b'\n')
+        line = self._rfile.readline()
+        if not line:
+            self.close()
+            raise ConnectionError('Connection closed by the render server')
+        return json.loads(line.decode('utf-8'))
+
+    def render(self, configs, overrides=None, format='json'):
+        """
+        :return: the rendered config (a string)
+        :raise ConfigError: if rendering failed
+        """
+        request = dict(configs=list(configs), overrides=overrides, format=format)
+        key = json.dumps(request, sort_keys=True)
+        cached = self._outputs.get(key)
+        if cached is not None:
+            request['etag'] = cached[0]
+        response = self.request(request)
+        if 'error' in response:
+            raise ConfigError(response['error'])
+        if response.get('not_modified'):
+            return cached[1]
+        self._outputs[key] = (response['etag'], response['output'])
+        return response['output']
+
+    def stats(self):
+        return self.request(dict(op='stats'))
+
+
+################################################################################
@@ -0,0 +1,55 @@
+#! /usr/bin/env python3
+"""
+Build a config bundle: a config package, pre-rendered into a single file, for reading
+configs without importing figura files (e.g. at production startup).
+
+Usage
+------
+
+::
+
+    % figura_bundle figura.tests.config -o tests.figbundle
+
+Then, e.g.::
+
+    % FIGURA_BUNDLE_FILE=tests.figbundle figura_print figura.tests.config.basic1
+
+See `figura.bundle <../figura.html#module-figura.bundle>`_.
+
+"""
+
+import sys
+import argparse
+
+from figura.bundle import build_bundle
+
+
+###############################################################################
+# MAIN
+
+def main():
+    args = getopt()
+    bundle = build_bundle(args.package, args.output)
+    print('Bundled %s into %s' % (bundle.package, args.output), file=sys.stderr)
+
+
+###############################################################################
+
+def getopt():
+
+    parser = argparse.ArgumentParser(
+        description='Build a bundle file of a figura config package')
+
+    parser.add_argument('package',
+                        help='''the python-import path of the config package''')
+
+    parser.add_argument('-o', '--output', required=True,
+                        help='''the bundle file to write''')
+
+    return parser.parse_args()
+
+
+###############################################################################
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,362 @@
+#! /usr/bin/env python3
+"""
+Generate a synthetic (but realistic) package of Figura config files, for scale-testing and
+benchmarking.
+
+The generated package is fully determined by the parameters and the seed.
+
+Usage
+------
+
+::
+
+    % python -m figura.tools.figura_gen /tmp/configs --package bigconf --num-files 500 --seed 7
+
+Then, e.g.::
+
+    % PYTHONPATH=/tmp/configs figura_print bigconf.conf7
+
+"""
+
+import os
+import ast
+import random
+import shutil
+import argparse
+
+from figura.misc import Struct
+
+
+###############################################################################
+# Parameters
+
+DEFAULT_PARAMS = Struct(
+    num_files=20,            # number of config files (modules), excluding override-set files
+    package_depth=2,         # max nesting depth of sub-packages
+    package_fanout=3,        # number of sub-packages in each package
+    num_sections=10,         # number of top-level sections in each file
+    section_width=8,         # number of leaf values in each section
+    section_depth=3,         # nesting depth of sections
+    section_fanout=2,        # number of sub-sections in each section
+    inherit_density=0.3,     # probability of a section to inherit from a previous section
+    import_density=0.2,      # probability of a section to inherit from a section in another file
+    overlay_density=0.5,     # probability of a derived section to overlay a base's sub-section
+    opaque_density=0.1,      # probability of an overlaid sub-section to be marked __opaque__
+    num_override_files=5,    # number of override-set files
+    overrides_per_file=20,   # number of overrides in each override-set file
+    seed=0,
+)
+
+SECTION_NAMES = [
+    'server', 'database', 'cache', 'queue', 'logging', 'metrics', 'auth', 'storage',
+    'scheduler', 'worker', 'proxy', 'search', 'mailer', 'billing', 'frontend', 'backend',
+]
+
+# key names, and the kind of values they hold
+KEY_KINDS = [
+    ('host', 'str'), ('port', 'int'), ('timeout', 'float'), ('retries', 'int'),
+    ('enabled', 'bool'), ('name', 'str'), ('path', 'str'), ('level', 'str'), ('user', 'str'),
+    ('max_connections', 'int'), ('buffer_size', 'int'), ('ratio', 'float'), ('mode', 'str'),
+    ('region', 'str'), ('tags', 'list'), ('interval', 'float'),
+]
+
+STRING_VALUES = [
+    'localhost', 'db.example.com', 'cache.example.com', 'us-east-1', 'eu-west-1',
+    'debug', 'info', 'warning', 'read-only', 'read-write', '/var/lib/app', '/tmp',
+]
+
+OVERRIDES_SUBPACKAGE = 'overrides'
+
+_KEY_KINDS_DICT = dict(KEY_KINDS)
+
+
+###############################################################################
+# The generator
+
+def generate_config_tree(dest_dir, package_name, overwrite=False, **params):
+    """
+    Generate a package of Figura config files.
+
+    :param dest_dir: the directory to create the package in. For reading the generated
+        configs, it should be in ``sys.path``.
+    :param package_name: the name of the (top-level) package to generate
+    :param overwrite: if the package already exists, delete it first (otherwise, raise
+        ``FileExistsError``)
+    :param params: generation parameters, overriding DEFAULT_PARAMS (see there)
+    :return: a Struct describing what was generated, with: package, package_dir,
+        modules (import paths of the config files, excluding override-sets),
+        override_sets (mapping import paths of override-set files to a 2-tuple of
+        the import path of the config they override, and a dict of the dotted keys and
+        values they set), leaves (mapping import paths of the config files to the dotted keys
+        of the leaves they define), num_sections, num_leaves.
+    """
+    unknown = set(params) - set(DEFAULT_PARAMS)
+    if unknown:
+        raise TypeError('generate_config_tree() got an invalid keyword argument: %s' %
+                        sorted(unknown)[0])
+    params = Struct(DEFAULT_PARAMS, **params)
+    package_dir = os.path.join(dest_dir, package_name)
+    if os.path.exists(package_dir):
+        if not overwrite:
+            raise FileExistsError(package_dir)
+        shutil.rmtree(package_dir)
+    generator = _Generator(package_name, params)
+    files = generator.generate()
+    for rel_filename in sorted(files):
+        filename = os.path.join(package_dir, rel_filename)
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        with open(filename, 'w') as f:
+            f.write(files[rel_filename])
+    return Struct(
+        package=package_name,
+        package_dir=package_dir,
+        modules=generator.modules,
+        override_sets=generator.override_sets,
+        leaves=generator.leaves,
+        num_sections=generator.num_sections,
+        num_leaves=generator.num_leaves,
+    )
+
+
+class _Generator:
+
+    INDENT = '    '
+
+    def __init__(self, package_name, params):
+        self.package_name = package_name
+        self.params = params
+        self.rng = random.Random(params.seed)
+        self.files = {}  # rel_filename -> content
+        self.modules = []
+        self.override_sets = {}
+        self.num_sections = 0
+        self.num_leaves = 0
+        # for each generated module: a list of (section_name, section_structure)
+        self._module_sections = {}
+        # for each generated module: a list of the dotted keys of the leaves it defines
+        self.leaves = {}
+
+    def generate(self):
+        params = self.params
+        self._add_package_dir(())
+        for file_idx in range(params.num_files):
+            subdirs = self._choose_subdirs()
+            self._add_package_dir(subdirs)
+            module_name = 'conf%d' % file_idx
+            import_path = '.'.join((self.package_name, ) + subdirs + (module_name, ))
+            rel_filename = os.path.join(*(subdirs + ('%s.fig' % module_name, )))
+            self.files[rel_filename] = self._gen_config_file(import_path)
+            self.modules.append(import_path)
+        if params.num_override_files:
+            self._add_package_dir((OVERRIDES_SUBPACKAGE, ))
+        for ov_idx in range(params.num_override_files):
+            module_name = 'ov%d' % ov_idx
+            import_path = '.'.join((self.package_name, OVERRIDES_SUBPACKAGE, module_name))
+            rel_filename = os.path.join(OVERRIDES_SUBPACKAGE, '%s.fig' % module_name)
+            self.files[rel_filename] = self._gen_override_file(import_path)
+        return self.files
+
+    # ============================================================================================
+    # packages
+
+    def _choose_subdirs(self):
+        depth = self.rng.randint(0, self.params.package_depth)
+        return tuple('grp%d' % self.rng.randrange(self.params.package_fanout)
+                     for _ in range(depth))
+
+    def _add_package_dir(self, subdirs):
+        for i in range(len(subdirs) + 1):
+            rel_filename = os.path.join(*(subdirs[:i] + ('__init__.fig', )))
+            if rel_filename not in self.files:
+                self.files[rel_filename] = '"""\nGenerated package: %s\n"""\n' % (
+                    '.'.join((self.package_name, ) + subdirs[:i]))
+
+    # ============================================================================================
+    # config files
+
+    def _gen_config_file(self, import_path):
+        params = self.params
+        rng = self.rng
+        lines = ['"""', 'Generated config: %s' % import_path, '"""', '']
+        sections = []
+        leaves = []
+        imports = []
+        for section_idx in range(params.num_sections):
+            name = '%s%d' % (SECTION_NAMES[section_idx % len(SECTION_NAMES)], section_idx)
+            base_name = base = None
+            if sections and rng.random() < params.inherit_density:
+                base_name, base = rng.choice(sections)
+            elif self._module_sections and rng.random() < params.import_density:
+                other_module = rng.choice(sorted(self._module_sections))
+                other_sections = self._module_sections[other_module]
+                if other_sections:
+                    other_name, base = rng.choice(other_sections)
+                    base_name = '_imported_%s' % (other_name, )
+                    imports.append('from %s import %s as %s' % (
+                        other_module, other_name, base_name))
+            structure = self._gen_section(
+                lines, name, base_name, base, params.section_depth, 0, (name, ), leaves)
+            sections.append((name, structure))
+            self.num_sections += 1
+        if imports:
+            lines[4:4] = sorted(set(imports)) + ['']
+        self._module_sections[import_path] = sections
+        self.leaves[import_path] = leaves
+        self.num_leaves += len(leaves)
+        return '\n'.join(lines) + '\n'
+
+    def _gen_section(self, lines, name, base_name, base, depth, indent_level, key_path, leaves,
+                     opaque=False):
+        """
+        Generate a section (a class), and return its structure: a dict of
+        {'keys': [...], 'subs': {name: structure}}.
+        A section derived from a base section (or overlaying one) may override some of
+        the base's keys, and may overlay some of its sub-sections.
+        """
+        params = self.params
+        rng = self.rng
+        indent = self.INDENT * indent_level
+        inner_indent = indent + self.INDENT
+        lines.append('%sclass %s%s:' % (indent, name, '(%s)' % base_name if base_name else ''))
+        if opaque:
+            lines.append('%s__opaque__ = True' % inner_indent)
+            base = None  # nothing is overlaid
+        structure = dict(keys=[], subs={})
+
+        # leaf values:
+        num_keys = params.section_width if base is None else max(1, params.section_width // 2)
+        for key_idx in range(num_keys):
+            if base is not None and base['keys'] and rng.random() < 0.5:
+                key = rng.choice(base['keys'])  # override the base's value
+            else:
+                key = '%s_%d' % (KEY_KINDS[key_idx % len(KEY_KINDS)][0], key_idx)
+            if key in structure['keys']:
+                continue
+            lines.append('%s%s = %s' % (inner_indent, key, self._gen_value(key)))
+            structure['keys'].append(key)
+            leaves.append('.'.join(key_path + (key, )))
+
+        # sub-sections:
+        if depth > 0:
+            if base is None:
+                for sub_idx in range(params.section_fanout):
+                    sub_name = 'sub%d' % sub_idx
+                    structure['subs'][sub_name] = self._gen_section(
+                        lines, sub_name, None, None, depth - 1, indent_level + 1,
+                        key_path + (sub_name, ), leaves)
+            else:
+                for sub_name, sub_base in sorted(base['subs'].items()):
+                    if rng.random() >= params.overlay_density:
+                        continue
+                    sub_opaque = rng.random() < params.opaque_density
+                    structure['subs'][sub_name] = self._gen_section(
+                        lines, sub_name, None, sub_base, depth - 1, indent_level + 1,
+                        key_path + (sub_name, ), leaves, opaque=sub_opaque)
+
+        if base is not None:
+            # inherited keys and sub-sections are also available to sections deriving from
+            # this one
+            structure['keys'] = sorted(set(structure['keys']) | set(base['keys']))
+            structure['subs'] = dict(base['subs'], **structure['subs'])
+        return structure
+
+    def _gen_value(self, key):
+        """
+        :return: the repr of a random value, of the kind matching the key
+        """
+        rng = self.rng
+        if rng.random() < 0.05:
+            return 'None'
+        kind = _KEY_KINDS_DICT[key.rpartition('_')[0]]
+        if kind == 'int':
+            return repr(rng.randrange(100000))
+        elif kind == 'float':
+            return repr(round(rng.uniform(0, 1000), 3))
+        elif kind == 'bool':
+            return repr(rng.random() < 0.5)
+        elif kind == 'list':
+            return repr([rng.randrange(1000) for _ in range(rng.randrange(1, 8))])
+        else:
+            return repr(rng.choice(STRING_VALUES))
+
+    # ============================================================================================
+    # override-set files
+
+    def _gen_override_file(self, import_path):
+        params = self.params
+        rng = self.rng
+        target = rng.choice(self.modules)
+        target_leaves = self.leaves[target]
+        keys = rng.sample(target_leaves, min(params.overrides_per_file, len(target_leaves)))
+        lines = [
+            '"""', 'Generated override-set of %s' % target, '"""', '',
+            '__override__ = True', '',
+        ]
+        overrides = {}
+        nested = {}
+        for key in sorted(keys):
+            value = self._gen_value(key.rpartition('.')[2])
+            overrides[key] = ast.literal_eval(value)
+            if rng.random() < 0.5:
+                # flat override, e.g. a__b__c = 1
+                lines.append('%s = %s' % (key.replace('.', '__'), value))
+            else:
+                # nested override, e.g. class a: class b: c = 1
+                parts = key.split('.')
+                d = nested
+                for part in parts[:-1]:
+                    d = d.setdefault(part, {})
+                d[parts[-1]] = value
+        self._gen_nested_overrides(lines, nested, 0)
+        self.override_sets[import_path] = (target, overrides)
+        return '\n'.join(lines) + '\n'
+
+    def _gen_nested_overrides(self, lines, nested, indent_level):
+        indent = self.INDENT * indent_level
+        for k, v in sorted(nested.items()):
+            if isinstance(v, dict):
+                lines.append('%sclass %s:' % (indent, k))
+                self._gen_nested_overrides(lines, v, indent_level + 1)
+            else:
+                lines.append('%s%s = %s' % (indent, k, v))
+
+
+###############################################################################
+# MAIN
+
+def main():
+    args = getopt()
+    params = {
+        k: getattr(args, k)
+        for k in DEFAULT_PARAMS
+    }
+    info = generate_config_tree(args.dest_dir, args.package, overwrite=args.overwrite, **params)
+    print('Generated package %r in %s: %d config files, %d override-sets, %d sections, '
+          '%d leaves' % (
+              info.package, info.package_dir, len(info.modules), len(info.override_sets),
+              info.num_sections, info.num_leaves))
+
+
+def getopt():
+
+    parser = argparse.ArgumentParser(
+        description='Generate a synthetic package of figura config files')
+
+    parser.add_argument('dest_dir', help='''the directory to generate the package in''')
+    parser.add_argument('-p', '--package', default='figura_generated',
+                        help='''the name of the package to generate''')
+    parser.add_argument('--overwrite', action='store_true',
+                        help='''overwrite the package if it already exists''')
+    for k, v in DEFAULT_PARAMS.items():
+        parser.add_argument('--%s' % k.replace('_', '-'), type=type(v), default=v,
+                            help='''defaults to %r''' % (v, ))
+
+    args = parser.parse_args()
+
+    return args
+
+
+###############################################################################
+
+if __name__ == '__main__':
+    main()
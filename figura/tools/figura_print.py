@@ -11,19 +11,23 @@ By "python-import" path::
 
 By file path: not support currently.
 
+Use ``--profile`` to print a timing report (to stderr) of the phases of loading the config.
+
+Use ``--stats`` to print a report (to stderr) of the memory used by the config, and its shape.
+
+Use ``--batch MANIFEST`` to render many configs in one process. See
+`figura.tools.batch <figura.tools.batch.html>`_ for the manifest format.
+
+Use ``--serve SOCKET`` to run a long-lived render server, listening on a Unix domain
+socket. See `figura.tools.serve <figura.tools.serve.html>`_.
+
 """
 
+import sys
 import argparse
 
-from figura import build_config, ConfigContainer
 from figura.cli import add_override_argument
-
-###############################################################################
-
-FORMAT_MAP = dict(
-    json='to_json',
-    python='to_python_string',
-)
+from figura.tools.render import render_config, FORMAT_MAP
 
 
 ###############################################################################
@@ -31,20 +35,49 @@ FORMAT_MAP = dict(
 
 def main():
     args = getopt()
-    paths = args.configfile + args.overridefile
 
-    config = build_config(*paths, enforce_override_set=False)
+    if args.serve:
+        from figura.tools.serve import serve
+        return serve(args.serve, max_outputs=args.serve_cache_size)
 
-    if args.override:
-        config.apply_overrides(args.override)
+    if args.batch:
+        return main_batch(args)
 
-    if isinstance(config, ConfigContainer):
-        # format the container and print it:
-        formatter_method = FORMAT_MAP[args.format]
-        print(getattr(config, formatter_method)())
+    if args.profile or args.profile_pstats:
+        from figura.tools.profiling import Profiler
+        with Profiler(pstats_file=args.profile_pstats) as profiler:
+            config, output = render(args)
+        profiler.set_config(config)
+        print(output)
+        profiler.report()
     else:
-        # an atomic value. just print it:
-        print(config)
+        config, output = render(args)
+        print(output)
+    if args.stats:
+        from figura.memory import memory_report, format_memory_report
+        print(format_memory_report(memory_report(config)), file=sys.stderr)
+
+
+def render(args):
+    """
+    :return: a 2-tuple: (config, formatted config)
+    """
+    paths = [args.configfile] + args.overridefile
+    return render_config(paths, args.override, fmt=args.format)
+
+
+def main_batch(args):
+    from figura.tools import batch
+    jobs = batch.load_manifest(args.batch, default_format=args.format)
+    results = batch.run_batch(jobs, num_workers=args.jobs)
+    if args.batch_output:
+        with open(args.batch_output, 'w') as f:
+            num_errors = batch.write_results(results, f)
+    else:
+        num_errors = batch.write_results(results, sys.stdout)
+    if num_errors:
+        print('%d of %d jobs failed' % (num_errors, len(results)), file=sys.stderr)
+        return 1
 
 
 ###############################################################################
@@ -54,7 +87,7 @@ def getopt():
     parser = argparse.ArgumentParser(
         description='Read a figura file and print the configuration it defines')
 
-    parser.add_argument('configfile', nargs=1,
+    parser.add_argument('configfile', nargs='?',
                         help='''a figura config file, or its python-import path''')
 
     parser.add_argument('overridefile', nargs='*',
@@ -65,12 +98,48 @@ def getopt():
     parser.add_argument('-f', '--format', default='json', choices=FORMAT_MAP.keys(),
                         help='''The format of the output. defaults to 'json''')
 
+    parser.add_argument('--profile', action='store_true',
+                        help='''Print a timing report of loading the config to stderr''')
+
+    parser.add_argument('--profile-pstats', metavar='FILE',
+                        help='''Also profile using cProfile, and write the stats to FILE.
+                        Implies --profile''')
+
+    parser.add_argument('--stats', action='store_true',
+                        help='''Print a report of the memory used by the config, and its shape,
+                        to stderr''')
+
+    parser.add_argument('--batch', metavar='MANIFEST',
+                        help='''Render all jobs listed in MANIFEST (a JSON Lines file),
+                        in one process''')
+
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='''With --batch, the number of processes to use''')
+
+    parser.add_argument('--batch-output', metavar='FILE',
+                        help='''With --batch, write the results (JSON Lines) to FILE, instead
+                        of to stdout''')
+
+    parser.add_argument('--serve', metavar='SOCKET',
+                        help='''Run a render server, listening on the Unix domain socket
+                        SOCKET''')
+
+    parser.add_argument('--serve-cache-size', type=int, metavar='N',
+                        help='''With --serve, the number of rendered outputs to cache (the
+                        least recently used ones are dropped). defaults to 256''')
+
     args = parser.parse_args()
 
+    if args.batch or args.serve:
+        if args.configfile:
+            parser.error('configfile should not be specified with --batch or --serve')
+    elif not args.configfile:
+        parser.error('the following arguments are required: configfile')
+
     return args
 
 
 ###############################################################################
 
 if __name__ == '__main__':
-    main()
+    sys.exit(main())
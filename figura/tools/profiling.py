@@ -0,0 +1,178 @@
+"""
+Profiling support for figura tools (e.g. ``figura_print --profile``).
+
+Collects `tracing <figura.tracing.html>`_ events while rendering a config, and
+formats a timing report.
+"""
+
+import sys
+import cProfile
+from time import perf_counter
+
+from figura import tracing
+from figura.container import ConfigContainer, iter_containers
+from figura.tools.render import PHASE_SERIALIZE
+
+try:
+    import resource
+except ImportError:  # e.g. on Windows
+    resource = None
+
+
+################################################################################
+
+# (phase, title, count-description), in the order they are reported
+REPORTED_PHASES = [
+    (tracing.PHASE_READ_CONFIG, 'read configs', 'paths'),
+    (tracing.PHASE_LOCK_WAIT, 'lock wait', None),
+    (tracing.PHASE_RESOLVE_PATH, 'resolve paths', 'paths'),
+    (tracing.PHASE_IMPORT, 'import files (incl. compile)', 'files'),
+    (tracing.PHASE_COMPILE, 'compile', 'files'),
+    (tracing.PHASE_CONVERT, 'parse', 'files'),
+    (tracing.PHASE_OVERLAY, 'overlay', 'containers'),
+    (tracing.PHASE_WALK_PACKAGE, 'walk packages', 'files'),
+    (tracing.PHASE_INTERN, 'deduplicate strings', 'strings'),
+    (tracing.PHASE_APPLY_OVERRIDES, 'apply overrides', 'overrides'),
+    (PHASE_SERIALIZE, 'serialize', None),
+]
+
+
+################################################################################
+
+class Profiler:
+    """
+    A context manager for profiling the enclosed block.
+
+    :param pstats_file: if set, the block is also profiled using ``cProfile``, and the stats
+        are written to this file.
+    """
+
+    def __init__(self, pstats_file=None):
+        self.pstats_file = pstats_file
+        self.recorder = tracing.TraceRecorder()
+        self.profile = cProfile.Profile() if pstats_file else None
+        self.duration = None
+        self.config = None
+
+    def __enter__(self):
+        tracing.add_listener(self.recorder)
+        self._start = perf_counter()
+        if self.profile is not None:
+            self.profile.enable()
+        return self
+
+    def __exit__(self, *a, **kw):
+        if self.profile is not None:
+            self.profile.disable()
+        self.duration = perf_counter() - self._start
+        tracing.remove_listener(self.recorder)
+        if self.profile is not None:
+            self.profile.dump_stats(self.pstats_file)
+
+    def set_config(self, config):
+        """
+        Set the resulting config, for reporting node counts.
+        """
+        self.config = config
+
+    def report(self, out=None):
+        """
+        Write the timing report.
+        """
+        if out is None:
+            out = sys.stderr
+        lines = ['figura profile', '=' * 60]
+        lines.append(_format_line('total', self.duration))
+        summary = self.recorder.summary()
+        for phase, title, count_desc in REPORTED_PHASES:
+            stats = summary.get(phase)
+            if stats is None:
+                continue
+            count_str = '(%d %s)' % (stats['count'], count_desc) if count_desc else ''
+            lines.append(_format_line('  %s' % title, stats['duration'], count_str))
+
+        file_stats = self.get_file_stats()
+        if file_stats:
+            lines.append('')
+            lines.append('files loaded (total, self, #loads, import path):')
+            for name, stats in file_stats:
+                lines.append('  %10s %10s %6d  %s' % (
+                    _format_ms(stats['total']), _format_ms(stats['self']), stats['loads'], name))
+
+        if self.config is not None:
+            lines.append('')
+            lines.append(
+                'nodes: %d containers, %d leaves, max depth %d' % count_nodes(self.config))
+        peak = get_peak_memory()
+        if peak is not None:
+            lines.append('peak memory (RSS): %.1f MB' % (peak / 2 ** 20))
+        if self.pstats_file:
+            lines.append('pstats written to: %s' % self.pstats_file)
+
+        out.write('\n'.join(lines) + '\n')
+
+    def get_file_stats(self):
+        """
+        Per-file import durations. The total duration of a file includes the duration of
+        files it imports, and the self duration excludes them.
+
+        :return: a list of (import_path, stats) tuples, sorted by total duration (descending).
+            stats is a dict with: total, self, loads.
+        """
+        imports = sorted(
+            (e for e in self.recorder.events if e.phase == tracing.PHASE_IMPORT),
+            key=lambda e: (e.start, -e.duration))
+        stats = {}
+        stack = []  # enclosing imports: [(end, name)]
+        for event in imports:
+            end = event.start + event.duration
+            while stack and stack[-1][0] < end:
+                stack.pop()
+            s = stats.setdefault(event.name, dict(total=0., self=0., loads=0))
+            s['total'] += event.duration
+            s['self'] += event.duration
+            s['loads'] += 1
+            if stack:
+                # exclude from the enclosing import's self duration
+                stats[stack[-1][1]]['self'] -= event.duration
+            stack.append((end, event.name))
+        return sorted(stats.items(), key=lambda item: (-item[1]['total'], item[0]))
+
+
+def _format_ms(t):
+    return '%.2f ms' % (t * 1000)
+
+
+def _format_line(title, duration, extra=''):
+    return ('%-36s %12s  %s' % (title, _format_ms(duration), extra)).rstrip()
+
+
+################################################################################
+
+def count_nodes(config):
+    """
+    :return: a 3-tuple: (number of containers, number of leaves, max depth)
+    """
+    if not isinstance(config, ConfigContainer):
+        return 0, 1, 0
+    num_containers = num_leaves = max_depth = 0
+    for keys, container in iter_containers(config):
+        num_containers += 1
+        max_depth = max(max_depth, len(keys) + 1)
+        num_leaves += sum(1 for v in container.values() if not isinstance(v, ConfigContainer))
+    return num_containers, num_leaves, max_depth
+
+
+def get_peak_memory():
+    """
+    :return: the peak RSS of the process, in bytes, or None if not supported on this platform
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        return peak  # bytes
+    return peak * 1024  # KB
+
+
+################################################################################
@@ -0,0 +1,200 @@
+"""
+Building and formatting configs, for tools rendering many configs in one process
+(e.g. ``figura_print --batch`` and ``figura_print --serve``).
+
+Configs are read once per process, and cached. Each render works on a copy of the cached
+configs, so overrides applied by one render don't leak into others.
+"""
+
+import os
+
+from figura import tracing
+from figura.container import ConfigContainer, copy_config_tree
+from figura.cli import _dict_from_string
+from figura.importer import ImportRecorder
+from figura.utils import build_config, read_config
+
+################################################################################
+
+FORMAT_MAP = dict(
+    json='to_json',
+    python='to_python_string',
+)
+
+PHASE_SERIALIZE = 'serialize'
+
+
+################################################################################
+
+class ConfigCache:
+    """
+    A cache of configs read by path.
+
+    Cached configs are never modified. ``get`` returns a copy of the containers
+    (leaf values are shared).
+
+    Not thread-safe.
+
+    :param track_changes: if set, the config files loaded when reading a config (including
+        imported configs) are recorded, along with their modification times. A cached config
+        is re-read if any of them (or the directories containing them) changed since.
+    """
+
+    def __init__(self, track_changes=False):
+        self.track_changes = track_changes
+        self._configs = {}
+        self._stamps = {}  # path -> {file or dir name: mtime}
+        self._versions = {}  # path -> number of times read
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, path, copy=True):
+        """
+        :param copy: if not set, the cached config itself is returned, and must not be modified
+        """
+        key = str(path)
+        try:
+            config = self._configs[key]
+        except KeyError:
+            config = self._read(path, key)
+            self.misses += 1
+        else:
+            if self.track_changes and not _are_stamps_fresh(self._stamps[key]):
+                config = self._read(path, key)
+                self.invalidations += 1
+            else:
+                self.hits += 1
+        return copy_config_tree(config) if copy else config
+
+    def version(self, path):
+        """
+        :return: the number of times ``path`` was read (and not served from the cache)
+        """
+        return self._versions.get(str(path), 0)
+
+    def dependencies(self, path):
+        """
+        :return: names of the files and directories ``path`` depends on, if tracking changes
+        """
+        return sorted(self._stamps.get(str(path), ()))
+
+    def _read(self, path, key):
+        if self.track_changes:
+            # only records the imports of this thread, so concurrent reads (of other threads)
+            # are not recorded as dependencies
+            with ImportRecorder() as recorder:
+                config = read_config(path)
+            self._stamps[key] = _get_stamps(recorder.filenames)
+        else:
+            config = read_config(path)
+        self._configs[key] = config
+        self._versions[key] = self._versions.get(key, 0) + 1
+        return config
+
+    def invalidate(self, path=None):
+        """
+        Drop ``path`` from the cache, or all cached configs if ``path`` is None.
+        """
+        if path is None:
+            self._configs.clear()
+            self._stamps.clear()
+        else:
+            self._configs.pop(str(path), None)
+            self._stamps.pop(str(path), None)
+
+    def __len__(self):
+        return len(self._configs)
+
+    def __contains__(self, path):
+        return str(path) in self._configs
+
+
+def _get_stamps(filenames):
+    # directories are included for detecting added and removed files
+    names = set(filenames)
+    names.update(os.path.dirname(filename) for filename in filenames)
+    stamps = {}
+    for name in names:
+        try:
+            stamps[name] = os.stat(name).st_mtime_ns
+        except OSError:
+            stamps[name] = None
+    return stamps
+
+
+def _are_stamps_fresh(stamps):
+    for name, mtime in stamps.items():
+        try:
+            if os.stat(name).st_mtime_ns != mtime:
+                return False
+        except OSError:
+            if mtime is not None:
+                return False
+    return True
+
+
+################################################################################
+
+def make_override_set(overrides):
+    """
+    Make an override-set from ``overrides``, which can be:
+
+    - None
+    - a string, as passed to ``figura_print --override``. E.g. ``'a.b=1,c=x'``
+    - a list of such strings
+    - a dict, mapping keys (e.g. ``'a.b'``) to values
+    - a ConfigContainer (returned as-is)
+    """
+    if isinstance(overrides, ConfigContainer):
+        return overrides
+    ov_container = ConfigContainer()
+    ov_container.get_metadata().is_override_set = True
+    if overrides is None:
+        return ov_container
+    if isinstance(overrides, str):
+        overrides = [overrides]
+    if isinstance(overrides, dict):
+        ov_container.update(overrides)
+    else:
+        for ov_string in overrides:
+            ov_container.update(_dict_from_string(ov_string))
+    return ov_container
+
+
+def format_config(config, fmt='json'):
+    """
+    :param fmt: one of the keys of ``FORMAT_MAP``
+    """
+    with tracing.span(PHASE_SERIALIZE, fmt):
+        if isinstance(config, ConfigContainer):
+            # format the container:
+            formatter_method = FORMAT_MAP[fmt]
+            return getattr(config, formatter_method)()
+        else:
+            # an atomic value:
+            return str(config)
+
+
+def render_config(paths, overrides=None, fmt='json', cache=None):
+    """
+    Build a config (like ``build_config``), apply extra ``overrides`` to it, and format it.
+
+    :param paths: paths of the config and override-sets to combine
+    :param overrides: extra overrides. See ``make_override_set``.
+    :param fmt: one of the keys of ``FORMAT_MAP``
+    :param cache: a ``ConfigCache``, for sharing reads between renders.
+    :return: a 2-tuple: (config, formatted config)
+    """
+    if fmt not in FORMAT_MAP:
+        raise ValueError('Unsupported format: %r' % (fmt, ))
+    if cache is not None:
+        paths = [cache.get(path) for path in paths]
+    config = build_config(*paths, enforce_override_set=False)
+    overrides = make_override_set(overrides)
+    if overrides:
+        config.apply_overrides(overrides)
+    return config, format_config(config, fmt)
+
+
+################################################################################
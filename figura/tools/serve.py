@@ -0,0 +1,227 @@
+"""
+A long-lived render server (``figura_print --serve SOCKET``).
+
+The server listens on a Unix domain socket, and answers render requests.  Configs are
+kept parsed (and their rendered outputs cached) between requests, and are re-read when
+their source files change.
+
+Protocol: newline-delimited JSON, in both directions.  A connection may be used for any
+number of requests, which are answered in order.
+
+A render request::
+
+    {"configs": ["myconf.web", "myconf.env.prod"], "overrides": "a.b=1", "format": "json",
+     "etag": "<etag of a previous response>"}
+
+``configs``, ``overrides`` and ``format`` are as in a `batch job
+<figura.tools.batch.html>`_.  ``etag`` is optional.
+
+The response contains an ``etag`` (a fingerprint of the rendered output), and either the
+``output`` or, if the request's ``etag`` matches, ``"not_modified": true``.
+On failure, the response contains ``error``.
+
+Other requests: ``{"op": "stats"}`` returns cache statistics, ``{"op": "ping"}`` returns
+``{"ok": true}``.
+
+See `figura.tools.client <figura.tools.client.html>`_ for a client.
+"""
+
+import os
+import sys
+import json
+import signal
+import socket
+import hashlib
+import threading
+import collections
+import socketserver
+
+from figura.container import copy_config_tree
+from figura.tools.render import ConfigCache, render_config
+from figura.tools.batch import make_job
+
+
+################################################################################
+
+class RenderService:
+    """
+    Handles requests (as dicts), keeping configs and outputs cached between requests.
+
+    Reading configs (which is serialized by the figura import lock anyway) and the cache
+    lookups are done under a lock, while rendering (applying the overrides and serializing)
+    is done concurrently.
+
+    :param maxsize: the maximal number of rendered outputs to cache. The least recently used
+        ones are dropped.
+    """
+
+    DEFAULT_MAX_OUTPUTS = 256
+
+    def __init__(self, maxsize=DEFAULT_MAX_OUTPUTS):
+        self.config_cache = ConfigCache(track_changes=True)
+        self.maxsize = maxsize
+        # request key -> (config versions, etag, output), in LRU order
+        self._outputs = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.num_requests = 0
+        self.num_renders = 0
+        self.num_not_modified = 0
+
+    def handle(self, request):
+        """
+        :return: the response (a dict)
+        """
+        try:
+            if not isinstance(request, dict):
+                raise ValueError('a request must be a JSON object')
+            op = request.get('op', 'render')
+            if op == 'render':
+                return self.render(request)
+            elif op == 'stats':
+                return self.stats()
+            elif op == 'ping':
+                return dict(ok=True)
+            else:
+                raise ValueError('unknown op: %r' % (op, ))
+        except Exception as e:
+            return dict(error='%s: %s' % (type(e).__name__, e))
+
+    def render(self, request):
+        request = dict(request)
+        request.pop('op', None)
+        client_etag = request.pop('etag', None)
+        job = make_job(request)
+        key = (job.configs, json.dumps(job.overrides, sort_keys=True), job.format)
+        etag, output = self._render(job, key)
+        if client_etag == etag:
+            with self._lock:
+                self.num_not_modified += 1
+            return dict(etag=etag, not_modified=True)
+        return dict(etag=etag, output=output)
+
+    def _render(self, job, key):
+        cache = self.config_cache
+        with self._lock:
+            self.num_requests += 1
+            # reading the configs from the cache re-reads them if their files changed:
+            configs = [cache.get(path, copy=False) for path in job.configs]
+            versions = tuple(cache.version(path) for path in job.configs)
+            cached = self._outputs.get(key)
+            if cached is not None and cached[0] == versions:
+                self._outputs.move_to_end(key)
+                return cached[1:]
+        # not holding the lock while rendering. The cached configs are never modified, so
+        # copying them is safe
+        configs = [copy_config_tree(config) for config in configs]
+        _, output = render_config(configs, job.overrides, fmt=job.format)
+        etag = hashlib.sha1(output.encode('utf-8')).hexdigest()
+        with self._lock:
+            self.num_renders += 1
+            cached = self._outputs.get(key)
+            # unless a concurrent request already rendered newer versions:
+            if cached is None or cached[0] <= versions:
+                self._outputs[key] = (versions, etag, output)
+                self._outputs.move_to_end(key)
+                while len(self._outputs) > self.maxsize:
+                    self._outputs.popitem(last=False)
+        return etag, output
+
+    def stats(self):
+        cache = self.config_cache
+        with self._lock:
+            return dict(
+                requests=self.num_requests,
+                renders=self.num_renders,
+                not_modified=self.num_not_modified,
+                cached_configs=len(cache),
+                cached_outputs=len(self._outputs),
+                config_hits=cache.hits,
+                config_misses=cache.misses,
+                config_invalidations=cache.invalidations,
+            )
+
+
+################################################################################
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        service = self.server.service
+        for line in self.rfile:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                request = json.loads(line.decode('utf-8'))
+            except ValueError as e:
+                response = dict(error='Invalid request: %s' % e)
+            else:
+                response = service.handle(request)
+            self.wfile.write(json.dumps(response).encode('utf-8') + b'\n')
+            self.wfile.flush()
+
+
+class RenderServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    A render server, listening on the Unix domain socket ``socket_path``.
+
+    Use ``serve_forever()`` to run it, and ``shutdown()`` (from another thread) to stop it.
+    The socket file is removed on ``server_close()``.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, socket_path, service=None):
+        _remove_stale_socket(socket_path)
+        self.socket_path = socket_path
+        self.service = service if service is not None else RenderService()
+        super().__init__(socket_path, _RequestHandler)
+
+    def server_close(self):
+        super().server_close()
+        try:
+            os.unlink(self.socket_path)
+        except OSError:
+            pass
+
+
+def _remove_stale_socket(socket_path):
+    if not os.path.exists(socket_path):
+        return
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+    except OSError:
+        # nobody is listening
+        os.unlink(socket_path)
+    else:
+        raise OSError('A server is already listening on %s' % socket_path)
+    finally:
+        sock.close()
+
+
+def serve(socket_path, max_outputs=None):
+    """
+    Run a render server until interrupted (SIGINT or SIGTERM).
+
+    :param max_outputs: the maximal number of rendered outputs to cache. Defaults to
+        ``RenderService.DEFAULT_MAX_OUTPUTS``
+    """
+    if max_outputs is None:
+        max_outputs = RenderService.DEFAULT_MAX_OUTPUTS
+    signal.signal(signal.SIGTERM, _exit_on_signal)
+    server = RenderServer(socket_path, RenderService(maxsize=max_outputs))
+    print('figura render server listening on %s' % socket_path, file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def _exit_on_signal(signum, frame):
+    sys.exit(0)
+
+
+################################################################################
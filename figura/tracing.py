@@ -0,0 +1,244 @@
+"""
+Lightweight tracing hooks, for measuring where config loading spends its time.
+
+Register a listener, which is called with a `TraceEvent <#figura.tracing.TraceEvent>`_
+for every traced phase (e.g. importing a config file, resolving a path, applying
+overrides)::
+
+    from figura import tracing, read_config
+
+    def listener(event):
+        print(event.phase, event.name, event.duration, event.count)
+
+    with tracing.listening(listener):
+        read_config('figura.tests.config')
+
+When no listener is registered, tracing costs close to nothing.
+
+The traced phases are:
+
+- ``read_config``: a full call to ``read_config`` (name is the path), including all phases below
+- ``lock_wait``: time spent waiting to acquire the figura import lock, held by another thread.
+  Only reported if the lock was not immediately available.
+- ``resolve_path``: splitting a path into its file-path and attr-path (name is the path)
+- ``import``: importing (compiling and executing) a single config file (name is its import
+  path).  Reported for every file, including ones imported by other config files, in which case
+  the duration of the importing file includes the duration of the imported one.
+- ``compile``: compiling the source of a single config file (part of ``import``)
+- ``convert``: converting an imported config file into a ConfigContainer (name is its import
+  path), including ``overlay``
+- ``overlay``: resolving auto-overlays during a ``convert`` (name is the import path, count is
+  the number of containers which were checked for overlayees)
+- ``walk_package``: reading all the config files under a package (name is the package path,
+  count is the number of config files read), including their ``import`` and ``convert``
+- ``intern``: deduplicating the strings of a package read (name is the package path, count is
+  the number of strings replaced). See ``figura.memory``
+- ``apply_overrides``: applying an override-set (name is the override-set's import path, if
+  it was read from a file, count is the number of overrides applied)
+
+Durations are measured in seconds, using ``time.perf_counter``.
+"""
+
+import collections
+from time import perf_counter
+
+
+################################################################################
+# Phases
+
+PHASE_READ_CONFIG = 'read_config'
+PHASE_LOCK_WAIT = 'lock_wait'
+PHASE_RESOLVE_PATH = 'resolve_path'
+PHASE_IMPORT = 'import'
+PHASE_COMPILE = 'compile'
+PHASE_CONVERT = 'convert'
+PHASE_OVERLAY = 'overlay'
+PHASE_WALK_PACKAGE = 'walk_package'
+PHASE_INTERN = 'intern'
+PHASE_APPLY_OVERRIDES = 'apply_overrides'
+
+
+################################################################################
+# Events
+
+TraceEvent = collections.namedtuple('TraceEvent', ['phase', 'name', 'start', 'duration', 'count'])
+TraceEvent.__doc__ = """
+An event describing a traced phase.
+
+:param phase: the phase (see the module docs)
+:param name: what the phase was applied to (e.g. a config import path), or None
+:param start: the start time of the phase (``time.perf_counter``)
+:param duration: duration of the phase, in seconds
+:param count: the number of items processed in the phase (depends on the phase)
+"""
+
+
+################################################################################
+# Listeners
+
+# the list is never modified in-place (it is replaced), so it is safe to iterate over it while
+# listeners are added or removed by other threads
+_listeners = []
+
+
+def add_listener(listener):
+    """
+    Register a listener, to be called with a `TraceEvent <#figura.tracing.TraceEvent>`_ for
+    every traced phase.
+    Listeners are called from the thread running the traced phase.
+    """
+    global _listeners
+    _listeners = _listeners + [listener]
+
+
+def remove_listener(listener):
+    """
+    Unregister a listener registered using ``add_listener``.
+
+    :raise ValueError: if not registered.
+    """
+    global _listeners
+    listeners = list(_listeners)
+    listeners.remove(listener)
+    _listeners = listeners
+
+
+class listening:
+    """
+    A context manager registering a listener on enter, and unregistering it on exit.
+    """
+
+    def __init__(self, listener):
+        self.listener = listener
+
+    def __enter__(self):
+        add_listener(self.listener)
+        return self.listener
+
+    def __exit__(self, *a, **kw):
+        remove_listener(self.listener)
+
+
+def is_enabled():
+    """
+    Is there any listener registered?
+    """
+    return bool(_listeners)
+
+
+def emit(phase, name, start, duration, count=1):
+    """
+    Report a traced phase to all listeners.
+    """
+    listeners = _listeners
+    if not listeners:
+        return
+    event = TraceEvent(phase, name, start, duration, count)
+    for listener in listeners:
+        listener(event)
+
+
+################################################################################
+# Spans
+
+def span(phase, name=None):
+    """
+    A context manager for tracing a phase.  On exit, a `TraceEvent
+    <#figura.tracing.TraceEvent>`_ is emitted, with the duration of the enclosed block.
+
+    If no listener is registered, a (shared) no-op context manager is returned.
+
+    The object returned on enter supports ``add(n)``, for counting the items processed
+    in the phase (the count defaults to 1 if ``add`` is never called).
+    """
+    if not _listeners:
+        return _NULL_SPAN
+    return _Span(phase, name)
+
+
+class _Span:
+
+    __slots__ = ('phase', 'name', 'start', 'count')
+
+    def __init__(self, phase, name):
+        self.phase = phase
+        self.name = name
+        self.count = None
+
+    def add(self, n=1):
+        self.count = (self.count or 0) + n
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *a, **kw):
+        duration = perf_counter() - self.start
+        count = 1 if self.count is None else self.count
+        emit(self.phase, self.name, self.start, duration, count)
+
+
+class _NullSpan:
+
+    __slots__ = ()
+
+    def add(self, n=1):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *a, **kw):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+################################################################################
+# Recording
+
+class TraceRecorder:
+    """
+    A listener which records all events, and summarizes them.
+
+    Use like::
+
+        recorder = TraceRecorder()
+        with tracing.listening(recorder):
+            read_config('figura.tests.config')
+        print(recorder.summary())
+
+    """
+
+    def __init__(self):
+        self.events = []
+
+    def __call__(self, event):
+        self.events.append(event)
+
+    def clear(self):
+        self.events = []
+
+    def summary(self, by_name=False):
+        """
+        Aggregate the recorded events.
+
+        :param by_name: if set, aggregate per (phase, name), instead of per phase.
+        :return: a dict mapping a phase (or a (phase, name) tuple) to a dict with:
+            ``duration`` (total), ``count`` (total), ``events`` (number of events).
+        """
+        summary = collections.OrderedDict()
+        for event in self.events:
+            key = (event.phase, event.name) if by_name else event.phase
+            try:
+                stats = summary[key]
+            except KeyError:
+                stats = summary[key] = dict(duration=0., count=0, events=0)
+            stats['duration'] += event.duration
+            stats['count'] += event.count
+            stats['events'] += 1
+        return summary
+
+
+################################################################################
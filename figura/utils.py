@@ -4,19 +4,23 @@ Useful tools when working with Figura configs.
 
 import os
 
+from . import tracing
 from .settings import get_setting
 from .errors import ConfigError, ConfigParsingError, ConfigValueError
 from .path import to_figura_path
 from .container import ConfigContainer
 from .parser import ConfigParser
-from .importutils import is_importable_path, figura_importing
+from .importutils import is_importable_path, get_config_file_extensions, FiguraImportContext
+from .importer import ZipSourceLoader
+from .bundle import read_config_from_bundle
+from .memory import intern_config
 
 
 ################################################################################
 # convenience functions
 
-@figura_importing
-def read_config(path, enable_path_spliting=True, should_step_in_package=True):
+def read_config(path, enable_path_spliting=True, should_step_in_package=True, bundle=None,
+                extensions=None):
     """
     Flexibly read/process a Figura config file.
 
@@ -29,6 +33,13 @@ def read_config(path, enable_path_spliting=True, should_step_in_package=True):
     :param path: a string or a `FiguraPath <#figura.path.FiguraPath>`_.
     :param enable_path_spliting: set to False if the path points to a file (as opposed to
         PATH.TO.FILE.PATH.TO.ATTR), if you want to suppress auto-splitting.
+    :param bundle: a bundle file (or a loaded ``ConfigBundle``) to read the config from,
+        instead of importing figura files. Defaults to the ``BUNDLE_FILE`` setting (set by
+        the ``FIGURA_BUNDLE_FILE`` env var). Pass ``False`` for reading the figura files even
+        if the setting is set. See `figura.bundle <#module-figura.bundle>`_.
+    :param extensions: the extensions of the figura files to read (e.g. ``'fig'``, or
+        ``('fig', 'customfig')``). Defaults to the ``CONFIG_FILE_EXT`` setting. See
+        `FiguraImportContext <#figura.importutils.FiguraImportContext>`_.
     :return: a `ConfigContainer <#figura.container.ConfigContainer>`_.
         In case of a deep path, the return value is the value from inside the
         conainer, which is not necessarilly a ConfigContainer.
@@ -44,11 +55,17 @@ def read_config(path, enable_path_spliting=True, should_step_in_package=True):
     >>> read_config('figura.tests.config').basic1.some_params.a  # read a dir of config files
     1
     """
-    return _read_config(
-        path,
-        enable_path_spliting=enable_path_spliting,
-        should_step_in_package=should_step_in_package,
-    )
+    if bundle is None:
+        bundle = get_setting('BUNDLE_FILE')
+    if bundle:
+        return read_config_from_bundle(path, bundle)
+    with tracing.span(tracing.PHASE_READ_CONFIG, str(path)):
+        with FiguraImportContext(extensions=extensions):
+            return _read_config(
+                path,
+                enable_path_spliting=enable_path_spliting,
+                should_step_in_package=should_step_in_package,
+            )
 
 
 def _read_config(path, enable_path_spliting=True, should_step_in_package=True):
@@ -58,7 +75,8 @@ def _read_config(path, enable_path_spliting=True, should_step_in_package=True):
 
     if enable_path_spliting:
         # process the path, split into file-path and attr-path
-        file_path, attr_path = to_figura_path(path).split_parts()
+        with tracing.span(tracing.PHASE_RESOLVE_PATH, str(path)):
+            file_path, attr_path = to_figura_path(path).split_parts()
     else:
         # path is known to be a file-path, so avoid the lookups
         file_path = path
@@ -74,11 +92,16 @@ def _read_config(path, enable_path_spliting=True, should_step_in_package=True):
     if should_step_in_package and is_pkg:
         # support reading all modules under a package, and create a ConfigContainer
         # reflecting the structure:
-        pkg_module = _get_module_of_config_container(config)
-        for filename, rel_mod_path, ispkg in _figura_walk_packages(pkg_module):
-            mod_path = '%s.%s' % (file_path, rel_mod_path)
-            sub_config = parser.parse(mod_path)
-            config.deep_setattr(rel_mod_path, sub_config)
+        with tracing.span(tracing.PHASE_WALK_PACKAGE, file_path) as trace:
+            pkg_module = _get_module_of_config_container(config)
+            for filename, rel_mod_path, ispkg in _figura_walk_packages(pkg_module):
+                mod_path = '%s.%s' % (file_path, rel_mod_path)
+                sub_config = parser.parse(mod_path)
+                config.deep_setattr(rel_mod_path, sub_config)
+                trace.add()
+        if get_setting('INTERN_STRINGS'):
+            with tracing.span(tracing.PHASE_INTERN, file_path) as trace:
+                trace.add(intern_config(config))
 
     # apply the attr-path:
     if attr_path:
@@ -95,11 +118,14 @@ def _figura_walk_packages(pkg_module, prefix=''):
     """
     ``pkgutil.walk_packages`` is completely broken, so we use our own implementation.
     """
-    fig_ext = get_setting('CONFIG_FILE_EXT')
+    fig_exts = get_config_file_extensions()
     base_path = pkg_module.__name__
     base_dir = os.path.dirname(pkg_module.__file__)
-    suffix = '.%s' % fig_ext
-    for rel_filename in os.listdir(base_dir):
+    suffixes = tuple('.%s' % fig_ext for fig_ext in fig_exts)
+    # with several extensions, a module may have several files (the one imported is found
+    # according to the order of the extensions)
+    seen_modules = set()
+    for rel_filename, is_dir in _list_package_dir(pkg_module, base_dir):
 
         if rel_filename.startswith('_'):
             # private, skip.
@@ -108,33 +134,48 @@ def _figura_walk_packages(pkg_module, prefix=''):
 
         abs_filename = os.path.join(base_dir, rel_filename)
 
-        if os.path.isdir(abs_filename):
+        if is_dir:
             # a sub-directory
             # check if it contains configs:
             rel_mod_path = rel_filename
             full_mod_path = '%s.%s' % (base_path, rel_mod_path)
             result_rel_mod_path = prefix + rel_mod_path
-            if is_importable_path(full_mod_path, with_ext=fig_ext):
+            if is_importable_path(full_mod_path, with_ext=fig_exts):
                 yield (abs_filename, result_rel_mod_path, True)
                 parser = ConfigParser()
                 subpkg_config = parser.parse(full_mod_path)
                 subpkg_module = _get_module_of_config_container(subpkg_config)
                 yield from _figura_walk_packages(subpkg_module, prefix=result_rel_mod_path + '.')
 
-        elif rel_filename.endswith(suffix):
+        elif rel_filename.endswith(suffixes):
             # a config file
+            suffix = next(sfx for sfx in suffixes if rel_filename.endswith(sfx))
             rel_mod_path = rel_filename[:-len(suffix)]
-            if rel_mod_path:
+            if rel_mod_path and rel_mod_path not in seen_modules:
+                seen_modules.add(rel_mod_path)
                 result_rel_mod_path = prefix + rel_mod_path
                 yield (abs_filename, result_rel_mod_path, False)
 
 
+def _list_package_dir(pkg_module, base_dir):
+    """
+    :return: a list of 2-tuples: (filename, is-directory)
+    """
+    loader = getattr(pkg_module, '__loader__', None)
+    if isinstance(loader, ZipSourceLoader):
+        # a package in a zip archive
+        return loader.list_dir(base_dir)
+    return [
+        (rel_filename, os.path.isdir(os.path.join(base_dir, rel_filename)))
+        for rel_filename in os.listdir(base_dir)
+    ]
+
+
 def _get_module_of_config_container(conf):
     parser = ConfigParser()
     return parser.get_module(conf.__name__)
 
 
-@figura_importing
 def build_config(*paths, **kwargs):
     """
     Build a configuration by reading Figura configs and optional
@@ -154,22 +195,39 @@ def build_config(*paths, **kwargs):
     :param kwargs['enforce_override_set']:
         ensure that an override-sets is not used as base-config, and that a non-override-set
         is not used for overriding.
+    :param kwargs['bundle']: a bundle file to read the configs from. See ``read_config``.
+    :param kwargs['extensions']: the extensions of the figura files to read. See
+        ``read_config``.
     :return: a `ConfigContainer <#figura.container.ConfigContainer>`_
     """
 
     default_config = kwargs.pop('default_config', None)
     extra_overrides = kwargs.pop('extra_overrides', None)
     enforce_override_set = kwargs.pop('enforce_override_set', True)
+    bundle = kwargs.pop('bundle', None)
+    extensions = kwargs.pop('extensions', None)
     if kwargs:
         raise TypeError('build_config() got an invalid keyword argument: %s' % list(kwargs)[0])
+    if bundle is None:
+        bundle = get_setting('BUNDLE_FILE')
+
+    if bundle:
+        # no importing involved
+        return _build_config(
+            paths, default_config, extra_overrides, enforce_override_set, bundle)
+    with FiguraImportContext(extensions=extensions):
+        return _build_config(
+            paths, default_config, extra_overrides, enforce_override_set, bundle)
+
 
-    configs = [_to_config(conf) for conf in paths]
+def _build_config(paths, default_config, extra_overrides, enforce_override_set, bundle):
+    configs = [_to_config(conf, bundle) for conf in paths]
 
     # using the default_config if the first config passed is an overrideset
     use_default = (len(configs) == 0) or \
         (isinstance(configs[0], ConfigContainer) and configs[0].get_metadata().is_override_set)
     if default_config is not None and use_default:
-        configs = [_to_config(default_config)] + configs
+        configs = [_to_config(default_config, bundle)] + configs
 
     # read each config and combine them:
     is_first = True
@@ -189,9 +247,11 @@ def build_config(*paths, **kwargs):
     return config
 
 
-def _to_config(x):
+def _to_config(x, bundle=None):
     if isinstance(x, ConfigContainer):
         return x
+    elif bundle:
+        return read_config_from_bundle(x, bundle)
     else:
         return _read_config(x)
 
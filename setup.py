@@ -33,6 +33,7 @@ setup(
     entry_points={
         'console_scripts': [
             'figura_print=figura.tools.figura_print:main',
+            'figura_bundle=figura.tools.figura_bundle:main',
         ],
     },
 
@@ -0,0 +1,53 @@
+"""
+Helpers shared by the unit-tests.
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+
+################################################################################
+
+class TempPackageTestCase(unittest.TestCase):
+    """
+    A TestCase which creates a config package in a new temp directory, which is added to
+    ``sys.path`` for the duration of each test.
+
+    On cleanup (after ``tearDown``), the directory is removed, along with the path-importer
+    cache entries and the modules loaded from it.
+    """
+
+    # the name of the package to create (if None, only the temp directory is created)
+    PACKAGE_NAME = None
+    # the files of the package, other than its (empty) __init__.fig: {filename: content}
+    FILES = {}
+    TEMPDIR_PREFIX = 'figura_test_'
+
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp(prefix=self.TEMPDIR_PREFIX)
+        self.addCleanup(self._remove_tempdir)
+        sys.path.insert(0, self.tempdir)
+        if self.PACKAGE_NAME is not None:
+            self.pkg_dir = os.path.join(self.tempdir, self.PACKAGE_NAME)
+            os.mkdir(self.pkg_dir)
+            for filename, content in sorted(dict({'__init__.fig': ''}, **self.FILES).items()):
+                with open(os.path.join(self.pkg_dir, filename), 'w') as f:
+                    f.write(content)
+
+    def _remove_tempdir(self):
+        if self.tempdir in sys.path:
+            sys.path.remove(self.tempdir)
+        prefix = os.path.join(self.tempdir, '')
+        for key in list(sys.path_importer_cache):
+            if key == self.tempdir or key.startswith(prefix):
+                del sys.path_importer_cache[key]
+        for name, module in list(sys.modules.items()):
+            if (getattr(module, '__file__', None) or '').startswith(prefix):
+                del sys.modules[name]
+        shutil.rmtree(self.tempdir)
+
+
+################################################################################
@@ -0,0 +1,124 @@
+"""
+Unit-tests of the asyncio API.
+"""
+
+import asyncio
+
+from figura import tracing, build_config
+from figura.errors import ConfigError
+from figura.tracing import TraceRecorder
+from figura.aio import aread_config, abuild_config, _in_flight_reads
+
+from .helpers import TempPackageTestCase
+
+
+################################################################################
+
+PACKAGE_NAME = 'figura_test_aio_pkg'
+
+SLOW_CONFIG = '''
+import threading as _threading
+_threading.Event().wait(%s)
+x = 1
+'''
+
+
+class AioTest(TempPackageTestCase):
+
+    PACKAGE_NAME = PACKAGE_NAME
+    FILES = {
+        'slow.fig': SLOW_CONFIG % 0.2,
+        'very_slow.fig': SLOW_CONFIG % 1,
+    }
+
+    def setUp(self):
+        super().setUp()
+        self.recorder = TraceRecorder()
+        tracing.add_listener(self.recorder)
+
+    def tearDown(self):
+        tracing.remove_listener(self.recorder)
+
+    def num_reads(self, path):
+        return sum(
+            1 for event in self.recorder.events
+            if event.phase == tracing.PHASE_READ_CONFIG and event.name == path)
+
+    def test_aread_config(self):
+        path = 'figura.tests.config.basic1.some_params'
+        config = asyncio.run(aread_config(path))
+        self.assertEqual(1, config.a)
+        self.assertRaises(
+            ConfigError, asyncio.run, aread_config(PACKAGE_NAME + '.no_such_config'))
+
+    def test_coalescing(self):
+        path = PACKAGE_NAME + '.slow'
+
+        async def read_many():
+            return await asyncio.gather(*[aread_config(path) for _ in range(5)])
+
+        configs = asyncio.run(read_many())
+        self.assertEqual(1, self.num_reads(path))
+        self.assertEqual([1] * 5, [config.x for config in configs])
+        # each caller gets its own copy:
+        configs[0].x = 2
+        self.assertEqual(1, configs[1].x)
+        # the read is not cached once done:
+        asyncio.run(read_many())
+        self.assertEqual(2, self.num_reads(path))
+
+    def test_cancel_and_timeout(self):
+        path = PACKAGE_NAME + '.slow'
+
+        async def main():
+            task1 = asyncio.ensure_future(aread_config(path))
+            task2 = asyncio.ensure_future(aread_config(path))
+            task3 = asyncio.ensure_future(aread_config(path, timeout=0.01))
+            await asyncio.sleep(0)
+            task1.cancel()
+            with self.assertRaises(asyncio.TimeoutError):
+                await task3
+            config = await task2  # not affected by the others
+            self.assertTrue(task1.cancelled())
+            return config
+
+        self.assertEqual(1, asyncio.run(main()).x)
+        self.assertEqual(1, self.num_reads(path))
+
+    def test_event_loop_not_blocked(self):
+        path = PACKAGE_NAME + '.very_slow'
+        ticks = []
+
+        async def tick():
+            while True:
+                ticks.append(asyncio.get_running_loop().time())
+                await asyncio.sleep(0.01)
+
+        async def main():
+            ticker = asyncio.ensure_future(tick())
+            await aread_config(path)
+            ticker.cancel()
+            self.assertFalse(_in_flight_reads[asyncio.get_running_loop()])
+
+        asyncio.run(main())
+        self.assertGreater(len(ticks), 10)
+
+    def test_abuild_config(self):
+        base = 'figura.tests.config.override.A'
+        overrides = 'figura.tests.config.override.A2_overrides'
+        config = asyncio.run(abuild_config(base, overrides))
+        self.assertEqual(build_config(base, overrides), config)
+        config = asyncio.run(abuild_config(overrides, default_config=base, timeout=10))
+        self.assertEqual(build_config(base, overrides), config)
+
+    def test_extensions(self):
+        path = 'figura.tests.config.basic2'
+        expected = build_config(path, extensions='customfig')
+        for extensions in ['customfig', ['customfig']]:
+            self.assertEqual(
+                expected, asyncio.run(abuild_config(path, extensions=extensions)))
+            self.assertEqual(
+                expected, asyncio.run(aread_config(path, extensions=extensions)))
+
+
+################################################################################
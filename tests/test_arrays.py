@@ -0,0 +1,80 @@
+"""
+Unit-tests of compact storage of large numeric sequences.
+"""
+
+import array
+import unittest
+
+from figura import read_config, ConfigContainer
+from figura.settings import set_setting
+from figura.schema import validate_config
+from figura.cli import compile_override_coercer
+from figura.errors import ConfigValidationError
+from figura.arrays import is_compact_sequence
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+################################################################################
+
+PATH = 'figura.tests.config.arrays'
+
+
+class CompactSequencesTest(unittest.TestCase):
+
+    def read(self, storage):
+        orig = set_setting('COMPACT_SEQUENCES', storage)
+        try:
+            return read_config(PATH)
+        finally:
+            set_setting('COMPACT_SEQUENCES', orig)
+
+    def test_default(self):
+        c = self.read(None)
+        self.assertIs(list, type(c.floats))
+        self.assertIs(tuple, type(c.ints))
+        self.assertEqual([0., .25, .5], c.floats[:3])
+        self.assertEqual([[0, 1], [1, 2]], c.nested.table[:2])
+
+    def test_array(self):
+        c = self.read('array')
+        self.assertEqual(array.array('d', [i / 4. for i in range(2000)]), c.floats)
+        self.assertEqual(array.array('q', range(2000)), c.ints)
+        # not stored compactly:
+        for key in ['big_ints', 'mixed', 'short', 'strings']:
+            self.assertIs(list, type(c[key]), key)
+        self.assertIs(list, type(c.nested.table))
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def test_numpy(self):
+        c = self.read('numpy')
+        self.assertIsInstance(c.floats, numpy.ndarray)
+        self.assertEqual('int64', c.ints.dtype.name)
+
+    def test_serialization(self):
+        expected = self.read(None)
+        c = self.read('array')
+        self.assertEqual(expected.to_json(), c.to_json())
+        # (compact sequences are serialized as lists, including ones defined as tuples)
+        self.assertIn('floats = [0.0, 0.25, 0.5, ', c.to_python_string())
+        self.assertEqual(expected.to_dict(), c.to_dict())
+
+    def test_schema(self):
+        c = self.read('array')
+        validate_config(c, {'floats': 'list[float]', 'ints': 'seq[int](2000..2000)'})
+        with self.assertRaises(ConfigValidationError):
+            validate_config(c, {'floats': 'list[int]'})
+
+    def test_coerce_overrides(self):
+        c = self.read('array')
+        coerce = compile_override_coercer(c)
+        overrides = coerce(ConfigContainer(floats='1,2.5', ints='7,8'))
+        self.assertEqual(array.array('d', [1., 2.5]), overrides.floats)
+        self.assertEqual(array.array('q', [7, 8]), overrides.ints)
+        self.assertTrue(is_compact_sequence(overrides.ints))
+
+
+################################################################################
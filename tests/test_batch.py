@@ -0,0 +1,101 @@
+"""
+Unit-tests of batch rendering (``figura_print --batch``).
+"""
+
+import io
+import os
+import json
+import shutil
+import tempfile
+import threading
+import unittest
+
+from figura import build_config, read_config
+from figura.importer import ImportRecorder
+from figura.tools.render import ConfigCache, render_config
+from figura.tools.batch import parse_manifest, run_batch, write_results
+
+
+################################################################################
+
+BASE = 'figura.tests.config.override.A'
+OVERRIDES = 'figura.tests.config.override.%s_overrides'
+RESULT = 'figura.tests.config.override.%s_result'
+
+
+class BatchTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp(prefix='figura_test_')
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def test_cache_isolation(self):
+        cache = ConfigCache()
+        config1, _ = render_config([BASE, OVERRIDES % 'A2'], cache=cache)
+        config2, _ = render_config([BASE], 'a=7', cache=cache)
+        self.assertEqual(build_config(RESULT % 'A2'), config1)
+        self.assertEqual(5, config2.B.C.c1)
+        self.assertEqual('7', config2.a)
+        self.assertEqual(2, len(cache))
+        self.assertEqual(1, cache.hits)
+        self.assertEqual(1, build_config(BASE).a)
+
+    def test_dependencies(self):
+        cache = ConfigCache(track_changes=True)
+        path = 'figura.tests.config.importer'
+        cache.get(path)
+        filenames = [os.path.basename(f) for f in cache.dependencies(path)]
+        self.assertIn('importer.fig', filenames)
+        self.assertIn('importee.fig', filenames)
+        self.assertNotIn('basic1.fig', filenames)
+
+    def test_import_recorder_is_per_thread(self):
+        with ImportRecorder() as recorder:
+            thread = threading.Thread(target=read_config, args=('figura.tests.config.basic1', ))
+            thread.start()
+            thread.join()
+            self.assertEqual(set(), recorder.filenames)
+            read_config('figura.tests.config.importee')
+        # (including the package's __init__)
+        self.assertEqual(
+            ['__init__.fig', 'importee.fig'],
+            sorted(os.path.basename(f) for f in recorder.filenames))
+
+    def test_manifest(self):
+        output = os.path.join(self.tempdir, 'out', 'a1.json')
+        lines = [
+            json.dumps(dict(id='a1', configs=[BASE, OVERRIDES % 'A1'], output=output)),
+            '# a comment',
+            '',
+            json.dumps(dict(configs=[BASE, OVERRIDES % 'A2'], format='python')),
+            json.dumps(dict(id='bad', configs=['figura.tests.config.nosuchfile'])),
+            json.dumps(dict(id='ov', configs=[BASE], overrides={'B.C.c2': 66})),
+        ]
+        jobs = list(parse_manifest(lines))
+        self.assertEqual(['a1', '4', 'bad', 'ov'], [job.id for job in jobs])
+
+        for num_workers in [1, 2]:
+            out = io.StringIO()
+            num_errors = write_results(run_batch(jobs, num_workers=num_workers), out)
+            self.assertEqual(1, num_errors)
+            results = [json.loads(line) for line in out.getvalue().splitlines()]
+            self.assertEqual(['a1', '4', 'bad', 'ov'], [r['id'] for r in results])
+            self.assertEqual(output, results[0]['file'])
+            with open(output) as f:
+                self.assertEqual(build_config(RESULT % 'A1'), json.load(f))
+            self.assertIn('c1 = 555', results[1]['output'])
+            self.assertIn('error', results[2])
+            self.assertEqual(66, json.loads(results[3]['output'])['B']['C']['c2'])
+
+    def test_invalid_manifest(self):
+        with self.assertRaises(ValueError):
+            list(parse_manifest(['{"configs": []}']))
+        with self.assertRaises(ValueError):
+            list(parse_manifest(['{"configs": ["a"], "foo": 1}']))
+        with self.assertRaises(ValueError):
+            list(parse_manifest(['not json']))
+
+
+################################################################################
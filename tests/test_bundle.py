@@ -0,0 +1,106 @@
+"""
+Unit-tests of config bundles.
+"""
+
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+
+from figura import tracing, read_config, build_config
+from figura.errors import ConfigError, ConfigParsingError, ConfigValueError
+from figura.settings import set_setting
+from figura.tracing import TraceRecorder
+from figura.bundle import build_bundle, load_bundle, BUNDLE_MAGIC
+
+
+################################################################################
+
+PACKAGE = 'figura.tests.config'
+
+
+class BundleTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tempdir = tempfile.mkdtemp(prefix='figura_test_')
+        cls.bundle_file = os.path.join(cls.tempdir, 'config.figbundle')
+        build_bundle(PACKAGE, cls.bundle_file)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tempdir)
+
+    def test_same_as_source(self):
+        for path in [
+                'figura.tests.config.basic1',
+                'figura.tests.config.basic1.some_params',
+                'figura.tests.config.basic1.some_params.c',
+                'figura.tests.config.deep1.deep2.conf2',
+                'figura.tests.config.override.A']:
+            expected = read_config(path)
+            c = read_config(path, bundle=self.bundle_file)
+            self.assertEqual(expected, c)
+            if hasattr(expected, 'get_metadata'):
+                self.assertEqual(expected.get_metadata(), c.get_metadata())
+
+    def test_build_config(self):
+        paths = ['figura.tests.config.override.A', 'figura.tests.config.override.A1_overrides']
+        self.assertEqual(build_config(*paths), build_config(*paths, bundle=self.bundle_file))
+
+    def test_no_importing(self):
+        recorder = TraceRecorder()
+        with tracing.listening(recorder):
+            read_config('figura.tests.config.more.xxx', bundle=self.bundle_file)
+        self.assertEqual([tracing.PHASE_READ_CONFIG], [e.phase for e in recorder.events])
+
+    def test_returns_copies(self):
+        c = read_config('figura.tests.config.basic1.some_params', bundle=self.bundle_file)
+        c.a = 'modified'
+        c = read_config('figura.tests.config.basic1.some_params', bundle=self.bundle_file)
+        self.assertEqual(1, c.a)
+
+    def test_deep_nesting(self):
+        c = read_config('figura.tests.config.deepnest', bundle=self.bundle_file)
+        d, depth = c.deep_dict, 0
+        while 'sub' in d:
+            d, depth = d['sub'], depth + 1
+        self.assertEqual((2000, 'bottom'), (depth, d['leaf']))
+
+    def test_private_not_included(self):
+        with self.assertRaises(ConfigValueError):
+            read_config('figura.tests.config._should_ignore_private', bundle=self.bundle_file)
+
+    def test_not_in_package(self):
+        with self.assertRaises(ConfigParsingError):
+            read_config('figura.tests.other', bundle=self.bundle_file)
+
+    def test_setting(self):
+        orig = set_setting('BUNDLE_FILE', self.bundle_file)
+        try:
+            bundle = load_bundle(self.bundle_file)
+            self.assertIn('figura.tests.config.basic1', bundle)
+            # the bundle is used, so a path not in the bundled package is an error:
+            with self.assertRaises(ConfigParsingError):
+                read_config('figura.tests.other')
+            # unless bundle=False:
+            c = read_config('figura.tests.config.basic1', bundle=False)
+            self.assertEqual(2, c.some_params.b)
+        finally:
+            set_setting('BUNDLE_FILE', orig)
+
+    def test_bad_format(self):
+        filename = os.path.join(self.tempdir, 'bad.figbundle')
+        with open(filename, 'wb') as f:
+            f.write(BUNDLE_MAGIC)
+            pickle.dump({'format': 999}, f)
+        with self.assertRaisesRegex(ConfigError, 'Unsupported'):
+            read_config('figura.tests.config.basic1', bundle=filename)
+        with open(filename, 'wb') as f:
+            f.write(b'not a bundle\n')
+        with self.assertRaisesRegex(ConfigError, 'Not a figura bundle'):
+            read_config('figura.tests.config.basic1', bundle=filename)
+
+
+################################################################################
@@ -0,0 +1,101 @@
+"""
+Unit-tests of parsing overrides from CLI.
+"""
+
+import random
+import argparse
+import unittest
+
+from figura import ConfigContainer
+from figura.errors import ConfigValueError
+from figura.cli import (
+    split_list_value, escape_list_value, _dict_from_string, add_override_argument,
+    build_config_from_cli, compile_override_coercer)
+
+
+################################################################################
+
+class SplitListValueTest(unittest.TestCase):
+
+    def test_escape_roundtrip(self):
+        rand = random.Random(0)
+        for _ in range(1000):
+            tokens = [
+                ''.join(rand.choice('ab@,=\n') for _ in range(rand.randint(0, 6)))
+                for _ in range(rand.randint(2, 5))
+            ]
+            value = ','.join(escape_list_value(token) for token in tokens)
+            self.assertEqual(tokens, split_list_value(value))
+
+    def test_other_delim(self):
+        self.assertEqual(['a,b', 'c;d', ''], split_list_value('a,b;c@;d;', delim=';'))
+
+    def test_long_values(self):
+        hosts = ['host%d:80' % i for i in range(50000)]
+        self.assertEqual(hosts, split_list_value(','.join(hosts)))
+        long_token = 'x@,y' * 100000
+        self.assertEqual(
+            [long_token, 'z'], split_list_value(escape_list_value(long_token) + ',z'))
+
+    def test_dict_from_string(self):
+        self.assertEqual(
+            {'a.b': '1', 'c': 'x,y', 'd': ''}, _dict_from_string('a.b=1,c=x@,y,d='))
+        self.assertRaises(ValueError, _dict_from_string, 'a=1,b')
+
+
+class CoerceOverridesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.parser = argparse.ArgumentParser()
+        self.parser.add_argument('config', nargs='*')
+        add_override_argument(self.parser)
+
+    def build(self, *args, **kwargs):
+        return build_config_from_cli(self.parser.parse_args(list(args)), **kwargs)
+
+    def test_coerce(self):
+        config = self.build(
+            'figura.tests.config.basic1.some_params', '-O', 'a=5,b=3,nested.d=six',
+            '-O', 'c=7@,8,new=9', coerce_overrides=True)
+        self.assertEqual(5, config.a)
+        self.assertEqual(3, config.b)
+        self.assertEqual([7, 8], config.c)
+        self.assertEqual('six', config.nested.d)
+        self.assertEqual('9', config.new)
+
+    def test_no_coerce(self):
+        config = self.build('figura.tests.config.basic1.some_params', '-O', 'a=5')
+        self.assertEqual('5', config.a)
+
+    def test_types(self):
+        config = ConfigContainer.from_dict(dict(
+            flag=True, t=(1.5, 2.5), empty=[], mixed=[1, 'x'], none=None,
+            sec=dict(n=1, sub=dict(s='x'))))
+        coerce = compile_override_coercer(config)
+        overrides = ConfigContainer.from_dict({
+            'flag': 'off', 't': '3,4.5', 'empty': 'a,b', 'mixed': '1,2', 'none': '1',
+            'sec': {'n': '2', 'sub__s': '3'}, 'sec.n': 7,
+        })
+        overrides.get_metadata().is_override_set = True
+        coerced = coerce(overrides)
+        self.assertEqual(dict(
+            flag=False, t=(3., 4.5), empty=['a', 'b'], mixed='1,2', none='1',
+            sec=dict(n=2, sub__s='3'), **{'sec.n': 7}), coerced)
+        self.assertTrue(coerced.get_metadata().is_override_set)
+        # the original is not modified:
+        self.assertEqual('2', overrides.sec.n)
+
+    def test_invalid_value(self):
+        with self.assertRaises(ConfigValueError) as cm:
+            self.build('figura.tests.config.basic1.some_params', '-O', 'nested.x=1,a=x',
+                       coerce_overrides=True)
+        self.assertIn("'a'", str(cm.exception))
+
+    def test_reuse_coercer(self):
+        coerce = compile_override_coercer(ConfigContainer(a=1))
+        config = self.build(
+            'figura.tests.config.basic1.some_params', '-O', 'a=5', coerce_overrides=coerce)
+        self.assertEqual(5, config.a)
+
+
+################################################################################
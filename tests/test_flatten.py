@@ -0,0 +1,93 @@
+"""
+Unit-tests of the flat (dotted-key) conversions and views of configs.
+"""
+
+import unittest
+
+from figura.errors import ConfigValueError
+from figura.container import ConfigContainer
+from figura.override import ConfigOverrideSet
+
+
+################################################################################
+
+def get_config():
+    return ConfigContainer.from_dict(dict(
+        a=dict(b=dict(c=1, d=[1, 2]), e='x'),
+        f=dict(),
+        g=None,
+    ))
+
+
+class FlattenTest(unittest.TestCase):
+
+    def test_flatten(self):
+        config = get_config()
+        self.assertEqual(
+            {'a.b.c': 1, 'a.b.d': [1, 2], 'a.e': 'x', 'f': ConfigContainer(), 'g': None},
+            config.flatten())
+        self.assertEqual({}, ConfigContainer().flatten())
+
+    def test_roundtrip(self):
+        config = get_config()
+        flat = config.flatten()
+        self.assertEqual(list(flat), ['a.b.c', 'a.b.d', 'a.e', 'f', 'g'])
+        unflattened = ConfigContainer.unflatten(flat)
+        self.assertEqual(config, unflattened)
+        self.assertIsInstance(unflattened.a.b, ConfigContainer)
+
+    def test_unflatten_conflict(self):
+        with self.assertRaises(ConfigValueError):
+            ConfigContainer.unflatten({'a': 1, 'a.b': 2})
+        with self.assertRaises(ConfigValueError):
+            ConfigContainer.unflatten({'a.b': 1, 'a': 2})
+        with self.assertRaises(ConfigValueError):
+            ConfigContainer.unflatten({'a.b.c': 1, 'a': 2})
+
+    def test_deep(self):
+        flat = {'.'.join(['x'] * 3000): 1}
+        config = ConfigContainer.unflatten(flat)
+        self.assertEqual(flat, config.flatten())
+
+
+class FlatViewTest(unittest.TestCase):
+
+    def test_lookup(self):
+        config = get_config()
+        view = config.flat_view()
+        self.assertEqual(1, view['a.b.c'])
+        self.assertIs(config.a.b, view['a.b'])
+        self.assertNotIn('a.b.x', view)
+        with self.assertRaises(TypeError):
+            view['a.b.x'] = 1
+
+    def test_cached(self):
+        config = get_config()
+        self.assertIs(config.flat_view(), config.flat_view())
+
+    def test_in_sync(self):
+        config = get_config()
+        view = config.flat_view()
+        config.deep_setattr('a.b.c', 2)
+        self.assertEqual(2, config.flat_view()['a.b.c'])
+        self.assertIsNot(view, config.flat_view())
+        config.apply_overrides(ConfigOverrideSet({'a.b.new': 3, 'f.x': 4}))
+        view = config.flat_view()
+        self.assertEqual((3, 4), (view['a.b.new'], view['f.x']))
+        del config.a.b
+        self.assertNotIn('a.b.c', config.flat_view())
+
+    def test_not_rebuilt_by_other_configs(self):
+        config = get_config()
+        view = config.flat_view()
+        other = get_config()
+        other.deep_setattr('a.b.c', 2)
+        other.apply_overrides(ConfigOverrideSet({'f.x': 4}))
+        ConfigContainer.from_dict(dict(a=dict(b=1)))
+        self.assertIs(view, config.flat_view())
+        # a nested section modified directly, not via the config:
+        config.a.b.c = 3
+        self.assertEqual(3, config.flat_view()['a.b.c'])
+
+
+################################################################################
@@ -0,0 +1,101 @@
+"""
+Stress-tests on synthetic config packages, generated by ``figura.tools.figura_gen``.
+"""
+
+import os
+import filecmp
+
+from figura import read_config, build_config, ConfigContainer
+from figura.tools.figura_gen import generate_config_tree
+
+from .helpers import TempPackageTestCase
+
+
+################################################################################
+
+PARAMS = dict(
+    num_files=30,
+    package_depth=2,
+    num_sections=6,
+    section_depth=3,
+    inherit_density=0.5,
+    import_density=0.5,
+    overlay_density=0.7,
+    opaque_density=0.2,
+    num_override_files=10,
+    overrides_per_file=30,
+)
+
+
+class GeneratedTest(TempPackageTestCase):
+
+    def generate(self, package_name, **kwargs):
+        return generate_config_tree(self.tempdir, package_name, **dict(PARAMS, **kwargs))
+
+    def test_read_package(self):
+        info = self.generate('figura_gen_read_pkg', seed=1)
+        config = read_config(info.package)
+        num_leaves = 0
+        for module in info.modules:
+            rel_path = module[len(info.package) + 1:]
+            sub_config = config.deep_getattr(rel_path)
+            self.assertIsInstance(sub_config, ConfigContainer)
+            self.assertEqual(module, sub_config.__name__)
+            num_leaves += _count_leaves(sub_config)
+        # sections also inherit leaves, so there are at least as many as generated
+        self.assertGreaterEqual(num_leaves, info.num_leaves)
+        self.assertEqual(PARAMS['num_files'], len(info.modules))
+
+    def test_override_sets(self):
+        info = self.generate('figura_gen_overrides', seed=2)
+        self.assertEqual(PARAMS['num_override_files'], len(info.override_sets))
+        for ov_path, (target, overrides) in sorted(info.override_sets.items()):
+            config = build_config(target, ov_path)
+            for key, value in overrides.items():
+                self.assertEqual(value, config.deep_getattr(key), (ov_path, key))
+
+    def test_deterministic(self):
+        def gen(subdir, seed):
+            dest_dir = os.path.join(self.tempdir, subdir)
+            return generate_config_tree(dest_dir, 'figura_gen_det', **dict(PARAMS, seed=seed))
+        info1 = gen('a', seed=3)
+        info2 = gen('b', seed=3)
+        info3 = gen('c', seed=4)
+        self.assertTrue(_same_tree(info1.package_dir, info2.package_dir))
+        self.assertFalse(_same_tree(info1.package_dir, info3.package_dir))
+
+    def test_overwrite(self):
+        self.generate('figura_gen_overwrite')
+        self.assertRaises(FileExistsError, self.generate, 'figura_gen_overwrite')
+        self.generate('figura_gen_overwrite', overwrite=True)  # should not raise
+
+
+def _count_leaves(config):
+    count = 0
+    stack = [config]
+    while stack:
+        for v in stack.pop().values():
+            if isinstance(v, ConfigContainer):
+                stack.append(v)
+            else:
+                count += 1
+    return count
+
+
+def _same_tree(dir1, dir2):
+    cmp = filecmp.dircmp(dir1, dir2)
+    stack = [cmp]
+    while stack:
+        cmp = stack.pop()
+        if cmp.left_only or cmp.right_only or cmp.diff_files or cmp.funny_files:
+            return False
+        # compare file contents, not just stats
+        _, mismatch, errors = filecmp.cmpfiles(
+            cmp.left, cmp.right, cmp.common_files, shallow=False)
+        if mismatch or errors:
+            return False
+        stack.extend(cmp.subdirs.values())
+    return True
+
+
+################################################################################
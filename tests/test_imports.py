@@ -4,14 +4,22 @@ Unit-tests of the import and reloading functionality.
 
 import sys
 import os
+import time
+import threading
 import shutil
 import unittest
 import tempfile
 import errno
 
-from figura import read_config
+from figura import read_config, build_config
 from figura.errors import ConfigParsingError
 from figura.settings import get_setting, set_setting
+from figura.importutils import (
+    FiguraImportContext, is_importable_path, get_import_probe_cache_stats,
+    clear_import_probe_cache, get_config_file_extensions,
+)
+
+from .helpers import TempPackageTestCase
 
 ################################################################################
 
@@ -158,6 +166,167 @@ class BasicTest(unittest.TestCase):
             set_setting('CONFIG_FILE_EXT', orig_ext)
 
 
+class ExtensionsTest(unittest.TestCase):
+
+    standard_path = '%s.basic1' % BASE_IMPORT_PATH
+    custom_path = '%s.basic2' % BASE_IMPORT_PATH
+
+    def test_per_call(self):
+        read_config(self.custom_path, enable_path_spliting=False, extensions='customfig')
+        self.assertRaises(ConfigParsingError, read_config, self.standard_path,
+                          enable_path_spliting=False, extensions='customfig')
+        for extensions in [('fig', 'customfig'), 'fig,customfig', ['.customfig', '.fig']]:
+            for path in [self.standard_path, self.custom_path]:
+                read_config(path, enable_path_spliting=False, extensions=extensions)
+        # the setting is not affected:
+        self.assertEqual('fig', get_setting('CONFIG_FILE_EXT'))
+        self.assertRaises(ConfigParsingError, read_config, self.custom_path,
+                          enable_path_spliting=False)
+
+    def test_attr_path(self):
+        self.assertEqual(
+            'five', read_config('%s.some_params.nested.d' % self.custom_path,
+                                extensions='customfig'))
+        self.assertEqual(
+            'five', build_config('%s.some_params.nested' % self.custom_path,
+                                 extensions=('fig', 'customfig')).d)
+
+    def test_setting(self):
+        orig_ext = set_setting('CONFIG_FILE_EXT', 'fig,customfig')
+        try:
+            self.assertEqual(('fig', 'customfig'), get_config_file_extensions())
+            read_config(self.standard_path)
+            read_config(self.custom_path)
+        finally:
+            set_setting('CONFIG_FILE_EXT', orig_ext)
+
+    def test_package(self):
+        self.assertNotIn('basic2', read_config(BASE_IMPORT_PATH))
+        config = read_config(BASE_IMPORT_PATH, extensions=('fig', 'customfig'))
+        self.assertEqual(1, config.basic2.some_params.a)
+        self.assertEqual(1, config.basic1.some_params.a)
+
+    def test_nested_contexts(self):
+        self.assertEqual(('fig', ), get_config_file_extensions())
+        with FiguraImportContext(extensions='customfig'):
+            self.assertEqual(('customfig', ), get_config_file_extensions())
+            with FiguraImportContext(extensions=('fig', 'customfig')):
+                self.assertEqual(('fig', 'customfig'), get_config_file_extensions())
+            self.assertEqual(('customfig', ), get_config_file_extensions())
+        self.assertEqual(('fig', ), get_config_file_extensions())
+
+    def test_concurrent(self):
+        errors = []
+
+        def read(path, extensions):
+            try:
+                for _ in range(10):
+                    read_config(path, extensions=extensions)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [
+            threading.Thread(target=read, args=(self.standard_path, 'fig')),
+            threading.Thread(target=read, args=(self.custom_path, 'customfig')),
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual([], errors)
+
+
+class ImportProbeCacheTest(TempPackageTestCase):
+
+    PACKAGE_NAME = 'probepkg'
+    TEMPDIR_PREFIX = 'figura_probe_'
+
+    def setUp(self):
+        super().setUp()
+        clear_import_probe_cache()
+        # failures are not cached right after a searched directory is modified
+        time.sleep(0.05)
+
+    def tearDown(self):
+        clear_import_probe_cache()
+
+    def probe(self, path):
+        with FiguraImportContext():
+            return is_importable_path(path, 'fig')
+
+    def assertStats(self, hits, misses, invalidations):
+        stats = get_import_probe_cache_stats()
+        self.assertEqual(
+            (hits, misses, invalidations), (stats.hits, stats.misses, stats.invalidations))
+
+    def test_cached_failures(self):
+        for _ in range(3):
+            self.assertFalse(self.probe('probepkg.conf'))
+            self.assertFalse(self.probe('probepkg.conf.x.y'))
+        self.assertStats(hits=4, misses=2, invalidations=0)
+        self.assertEqual(2, get_import_probe_cache_stats().size)
+        self.assertAlmostEqual(4 / 6, get_import_probe_cache_stats().hit_rate)
+        # creating the file modifies the package directory
+        touch(os.path.join(self.pkg_dir, 'conf.fig'))
+        self.assertTrue(self.probe('probepkg.conf'))
+        self.assertStats(hits=4, misses=3, invalidations=1)
+
+    def test_missing_package(self):
+        self.assertFalse(self.probe('newpkg.conf'))
+        self.assertFalse(self.probe('newpkg.conf'))
+        self.assertStats(hits=1, misses=1, invalidations=0)
+        newpkg_dir = os.path.join(self.tempdir, 'newpkg')
+        os.mkdir(newpkg_dir)
+        touch(os.path.join(newpkg_dir, '__init__.fig'))
+        touch(os.path.join(newpkg_dir, 'conf.fig'))
+        self.assertTrue(self.probe('newpkg.conf'))
+
+    def test_failing_package_modified_in_place(self):
+        badpkg_dir = os.path.join(self.tempdir, 'badpkg')
+        os.mkdir(badpkg_dir)
+        init_file = os.path.join(badpkg_dir, '__init__.fig')
+        with open(init_file, 'w') as f:
+            f.write('import figura_no_such_module\n')
+        touch(os.path.join(badpkg_dir, 'conf.fig'))
+        past = time.time() - 10
+        for path in [init_file, badpkg_dir, self.tempdir]:
+            os.utime(path, (past, past))
+        self.assertFalse(self.probe('badpkg.conf'))
+        self.assertFalse(self.probe('badpkg.conf'))
+        self.assertStats(hits=1, misses=1, invalidations=0)
+        # fixing the package doesn't modify its directory, only the file
+        dir_mtime = os.stat(badpkg_dir).st_mtime_ns
+        with open(init_file, 'w') as f:
+            f.write('x = 1\n')
+        os.utime(init_file, (past + 1, past + 1))
+        self.assertEqual(dir_mtime, os.stat(badpkg_dir).st_mtime_ns)
+        self.assertTrue(self.probe('badpkg.conf'))
+        self.assertStats(hits=1, misses=2, invalidations=1)
+
+    def test_scoped_by_sys_path(self):
+        self.assertFalse(self.probe('probepkg.conf'))
+        sys.path.append(os.path.join(self.tempdir, 'nosuchdir'))
+        try:
+            self.assertFalse(self.probe('probepkg.conf'))
+        finally:
+            sys.path.pop()
+        self.assertStats(hits=0, misses=2, invalidations=1)
+
+    def test_disabled(self):
+        orig = set_setting('IMPORT_PROBE_CACHE', False)
+        try:
+            self.assertFalse(self.probe('probepkg.conf'))
+            self.assertFalse(self.probe('probepkg.conf'))
+        finally:
+            set_setting('IMPORT_PROBE_CACHE', orig)
+        self.assertStats(hits=0, misses=0, invalidations=0)
+
+
+def touch(filename):
+    with open(filename, 'w'):
+        pass
+
+
 def append_line(filename, line):
     with open(filename, 'a') as f:
         f.write('\n' + line + '\n')
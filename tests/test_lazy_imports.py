@@ -0,0 +1,52 @@
+"""
+Unit-tests making sure ``import figura`` stays light (public names are imported lazily).
+"""
+
+import os
+import sys
+import subprocess
+import unittest
+
+import figura
+
+
+################################################################################
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(figura.__file__)))
+
+
+def _run_python(code):
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        [ROOT_DIR] + [p for p in [os.environ.get('PYTHONPATH')] if p])
+    return subprocess.check_output(
+        [sys.executable, '-c', code], env=env, universal_newlines=True).split()
+
+
+class LazyImportsTest(unittest.TestCase):
+
+    def test_import_figura_is_light(self):
+        imported = _run_python(
+            'import sys, figura; print(" ".join(sorted(sys.modules)))')
+        for module in ['json', 'argparse', 'inspect', 'figura.utils', 'figura.parser']:
+            self.assertNotIn(module, imported)
+
+    def test_import_cli_is_light(self):
+        imported = _run_python(
+            'import sys, figura.cli; print(" ".join(sorted(sys.modules)))')
+        self.assertNotIn('argparse', imported)
+
+    def test_public_names(self):
+        from figura.utils import read_config
+        from figura.container import ConfigContainer
+        self.assertIs(read_config, figura.read_config)
+        self.assertIs(ConfigContainer, figura.ConfigContainer)
+        self.assertIn('build_config', dir(figura))
+        self.assertIs(sys.modules['figura.tracing'], figura.tracing)
+        with self.assertRaises(AttributeError):
+            figura.no_such_name
+        for name in figura.__all__:
+            self.assertTrue(hasattr(figura, name), name)
+
+
+################################################################################
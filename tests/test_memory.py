@@ -0,0 +1,145 @@
+"""
+Unit-tests of the memory-related tools.
+"""
+
+import gc
+import unittest
+
+from figura import read_config
+from figura.container import ConfigContainer
+from figura.override import ConfigOverrideSet
+from figura.settings import set_setting
+from figura.tools.profiling import count_nodes
+from figura.memory import (
+    intern_config, memory_report, format_memory_report, preload_for_fork,
+)
+
+
+################################################################################
+
+def fresh(s):
+    # a new string object, equal to s
+    return ''.join(list(s))
+
+
+class InternTest(unittest.TestCase):
+
+    def test_values(self):
+        config = ConfigContainer(
+            a=fresh('value'),
+            b=ConfigContainer(c=fresh('value'), d=[fresh('value'), (fresh('value'), )]),
+            e={'f': fresh('value')},
+        )
+        self.assertEqual(4, intern_config(config))
+        values = [config.a, config.b.c, config.b.d[0], config.b.d[1][0], config.e['f']]
+        self.assertEqual(1, len(set(map(id, values))))
+        self.assertIsInstance(config.b.d[1], tuple)
+
+    def test_long_values(self):
+        config = ConfigContainer(a=fresh('x' * 100), b=fresh('x' * 100))
+        self.assertEqual(0, intern_config(config))
+        self.assertEqual(1, intern_config(config, max_length=100))
+        self.assertIs(config.a, config.b)
+
+    def test_keys(self):
+        config = ConfigContainer(first=1)
+        config[fresh('second')] = 2
+        config['third'] = 3
+        self.assertEqual(1, intern_config(config))
+        self.assertEqual(['first', 'second', 'third'], list(config))
+        self.assertIs('second', list(config)[1])
+
+    def test_metadata(self):
+        config = ConfigContainer(
+            a=ConfigContainer(metadata=dict(package=fresh('pkg'))),
+            b=ConfigContainer(metadata=dict(package=fresh('pkg'))))
+        intern_config(config)
+        self.assertIs(config.a.get_metadata().package, config.b.get_metadata().package)
+
+    def test_shared_table(self):
+        table = {}
+        config1 = ConfigContainer(a=fresh('value'))
+        config2 = ConfigContainer(a=fresh('value'))
+        intern_config(config1, table=table)
+        intern_config(config2, table=table)
+        self.assertIs(config1.a, config2.a)
+
+    def test_deep(self):
+        c = read_config('figura.tests.config.deepnest')
+        intern_config(c)
+
+    def test_read_package(self):
+        # off by default
+        c = read_config('figura.tests.config')
+        self.assertIsNot(
+            c.deep1.get_metadata().package, c.deep1.conf1.get_metadata().package)
+        orig = set_setting('INTERN_STRINGS', True)
+        try:
+            c = read_config('figura.tests.config')
+        finally:
+            set_setting('INTERN_STRINGS', orig)
+        self.assertIs(
+            c.deep1.get_metadata().package, c.deep1.conf1.get_metadata().package)
+
+
+class MemoryReportTest(unittest.TestCase):
+
+    def test_report(self):
+        config = ConfigContainer(
+            small=ConfigContainer(a=1),
+            big=ConfigContainer(
+                x=ConfigContainer(y=ConfigContainer(z='z' * 10000)),
+                w=ConfigContainer(a=1, b=2, c=3, d=4)),
+            leaf=[1, 2, 3],
+        )
+        report = config.memory_report(num_largest=2)
+        self.assertEqual(6, report.num_containers)
+        self.assertEqual(7, report.num_leaves)
+        self.assertEqual(4, report.max_depth)
+        self.assertEqual(('big.w', 4), report.widest)
+        self.assertEqual(['big', 'small', 'leaf'], [k for k, _ in report.sections])
+        self.assertGreater(report.sections[0][1], 10000)
+        self.assertLess(sum(size for _, size in report.sections), report.total_bytes)
+        self.assertEqual(['big.x.y.z', 'leaf'], [path for path, _ in report.largest_values])
+        self.assertIn('big.x.y.z', format_memory_report(report))
+
+    def test_matches_count_nodes(self):
+        for path in ['figura.tests.config', 'figura.tests.config.deepnest']:
+            config = read_config(path)
+            report = memory_report(config)
+            self.assertEqual(
+                count_nodes(config),
+                (report.num_containers, report.num_leaves, report.max_depth))
+
+    def test_deep(self):
+        report = memory_report(read_config('figura.tests.config.deepnest'))
+        self.assertEqual(2002, report.max_depth)
+        self.assertEqual(['deep_dict'], [path for path, _ in report.largest_values[:1]])
+
+
+@unittest.skipUnless(hasattr(gc, 'freeze'), 'requires gc.freeze')
+class PreloadForForkTest(unittest.TestCase):
+
+    def tearDown(self):
+        gc.unfreeze()
+
+    def test_preload(self):
+        base = ConfigContainer(a=ConfigContainer(b=fresh('value')), c=fresh('value'))
+        configs = preload_for_fork([
+            'figura.tests.config.escape',
+            ('figura.tests.config.escape', ConfigOverrideSet({'c.x': 1})),
+            base,
+        ])
+        self.assertEqual(read_config('figura.tests.config.escape'), configs[0])
+        self.assertEqual(1, configs[1].c.x)
+        self.assertEqual(base, configs[2])
+        self.assertIsNot(base.a, configs[2].a)  # containers are copied
+        self.assertIs(configs[2].a.b, configs[2].c)  # strings are deduplicated
+        self.assertGreater(gc.get_freeze_count(), 0)
+
+    def test_no_freeze(self):
+        preload_for_fork(['figura.tests.config.escape'], freeze_gc=False)
+        self.assertEqual(0, gc.get_freeze_count())
+
+
+################################################################################
@@ -0,0 +1,100 @@
+"""
+Unit-tests of configs nested deeper than python's recursion limit.
+"""
+
+import sys
+import unittest
+from figura import read_config, ConfigContainer, ConfigOverrideSet
+from figura.errors import ConfigParsingError
+
+from .helpers import TempPackageTestCase
+
+
+################################################################################
+
+DEPTH = 2000  # see config/deepnest.fig
+
+
+def _make_deep_dict(depth, leaf):
+    root = cur = {}
+    for _ in range(depth):
+        cur['sub'] = {}
+        cur = cur['sub']
+    cur['leaf'] = leaf
+    return root
+
+
+def _get_deep_leaf(x, depth):
+    for _ in range(depth):
+        x = x['sub']
+    return x['leaf']
+
+
+################################################################################
+
+class BasicTest(unittest.TestCase):
+
+    def setUp(self):
+        self.assertGreater(DEPTH, sys.getrecursionlimit())
+
+    def test_read_config_deep_dict(self):
+        c = read_config('figura.tests.config.deepnest')
+        self.assertEqual('bottom', _get_deep_leaf(c.deep_dict, DEPTH))
+
+    def test_read_config_deep_section(self):
+        c = read_config('figura.tests.config.deepnest')
+        x = c.deep_section
+        self.assertIsInstance(x, ConfigContainer)
+        self.assertEqual(1, x.level)
+        self.assertEqual('bottom', _get_deep_leaf(x, DEPTH))
+
+    def test_from_dict(self):
+        c = ConfigContainer.from_dict(_make_deep_dict(DEPTH, 'bottom'))
+        x = c
+        for _ in range(DEPTH):
+            x = x.sub
+            self.assertIsInstance(x, ConfigContainer)
+        self.assertEqual('bottom', x.leaf)
+
+    def test_to_python_string(self):
+        c = ConfigContainer.from_dict(_make_deep_dict(DEPTH, 'bottom'))
+        lines = c.to_python_string().splitlines()
+        self.assertEqual(DEPTH + 1, len(lines))
+        self.assertEqual('%sleaf = %r' % ('  ' * DEPTH, 'bottom'), lines[-1])
+
+    def test_apply_overrides(self):
+        c = ConfigContainer.from_dict(_make_deep_dict(DEPTH, 'bottom'))
+        ov = ConfigOverrideSet.from_dict(_make_deep_dict(DEPTH, 'overridden'))
+        reported = []
+        c.apply_overrides(ov, callback=lambda *args: reported.append(args))
+        self.assertEqual('overridden', _get_deep_leaf(c, DEPTH))
+        key = '.'.join(['sub'] * DEPTH + ['leaf'])
+        self.assertEqual([(key, 'overridden', 'bottom')], reported)
+
+
+class CycleTest(TempPackageTestCase):
+
+    PACKAGE_NAME = 'figura_test_cycles_pkg'
+
+    FILES = {
+        'section.fig': 'class a:\n    x = 1\na.me = a\n',
+        'nested_section.fig': 'class a:\n    class b:\n        pass\na.b.up = a\n',
+        'dict.fig': 'd = {}\nd["me"] = d\n',
+        'list.fig': 'l = [1]\nl.append([l])\n',
+        # the same value referenced twice is not a cycle:
+        'shared.fig': '_s = {"x": 1}\nl = [_s, _s]\nclass a:\n    s = _s\n    t = (_s, )\n',
+    }
+
+    def test_cycles(self):
+        for name in ['section', 'nested_section', 'dict', 'list']:
+            with self.assertRaises(ConfigParsingError, msg=name):
+                read_config('%s.%s' % (self.PACKAGE_NAME, name))
+
+    def test_shared(self):
+        c = read_config(self.PACKAGE_NAME + '.shared')
+        self.assertEqual([{'x': 1}, {'x': 1}], c.l)
+        self.assertEqual(1, c.a.s['x'])
+        self.assertEqual(({'x': 1}, ), c.a.t)
+
+
+################################################################################
@@ -0,0 +1,82 @@
+"""
+Unit-tests of applying overrides, and of auditing the changes they make.
+"""
+
+import unittest
+
+from figura.container import ConfigContainer
+from figura.override import (
+    ConfigOverrideSet, OverrideChange, OverrideAuditLog, MISSING_VALUE, apply_override,
+)
+
+
+################################################################################
+
+def get_config():
+    return ConfigContainer.from_dict(dict(
+        a=dict(b=dict(c=1, d=2), e='x'),
+        f=3,
+    ))
+
+
+class ApplyOverrideTest(unittest.TestCase):
+
+    def test_returns_old_value(self):
+        config = get_config()
+        self.assertEqual(1, apply_override(config, 'a.b.c', 10))
+        self.assertEqual(MISSING_VALUE, apply_override(config, 'a.new.x', 20))
+        self.assertEqual(ConfigContainer(c=10, d=2), apply_override(config, 'a.b', 30))
+        self.assertEqual(MISSING_VALUE, apply_override(config, 'a.b__c', 40))
+        self.assertEqual(dict(a={'b': 30, 'e': 'x', 'new': dict(x=20), 'b.c': 40}, f=3), config)
+
+    def test_callback(self):
+        config = get_config()
+        reported = []
+        apply_override(config, 'c', 4, callback=lambda *args: reported.append(args),
+                       callback_key_prefix='a.b.', callback_missing_value=None)
+        self.assertEqual([('a.b.c', 4, None)], reported)
+
+
+class AuditTest(unittest.TestCase):
+
+    def test_changes(self):
+        config = get_config()
+        overrides = ConfigOverrideSet.from_dict({
+            'a': {'b': {'c': 10, 'new': 4}, 'g.h': 5},
+            'f': 6,
+        })
+        log = config.apply_overrides(overrides, audit=True)
+        self.assertIsInstance(log, OverrideAuditLog)
+        self.assertEqual(4, len(log))
+        self.assertEqual([
+            OverrideChange('a.b.c', 1, 10),
+            OverrideChange('a.b.new', MISSING_VALUE, 4),
+            OverrideChange('a.g.h', MISSING_VALUE, 5),
+            OverrideChange('f', 3, 6),
+        ], list(log))
+        self.assertEqual(
+            ["a.b.c: 1 -> 10", "a.b.new: 4 (new)", "a.g.h: 5 (new)", "f: 3 -> 6"],
+            list(log.format_lines()))
+        self.assertEqual(10, config.a.b.c)
+
+    def test_no_audit(self):
+        config = get_config()
+        self.assertIsNone(config.apply_overrides(ConfigOverrideSet(f=1)))
+
+    def test_opaque(self):
+        config = get_config()
+        value = ConfigContainer(x=1)
+        value.get_metadata().is_opaque_override = True
+        log = config.apply_overrides(ConfigOverrideSet(a=value), audit=True)
+        self.assertEqual([('a', get_config().a, value)], list(log))
+
+    def test_matches_callback(self):
+        overrides = ConfigOverrideSet.from_dict(
+            {'a': {'b.c': 10, 'b': {'d': 20}}, 'g__h': 30})
+        reported = []
+        get_config().apply_overrides(overrides, callback=lambda *args: reported.append(args))
+        log = get_config().apply_overrides(overrides, audit=True)
+        self.assertEqual([(key, old, new) for key, new, old in reported], list(log))
+
+
+################################################################################
@@ -0,0 +1,50 @@
+"""
+Unit-tests of the profiling support of figura tools.
+"""
+
+import io
+import unittest
+
+from figura import tracing, build_config
+from figura.container import ConfigContainer
+from figura.tools.profiling import Profiler, count_nodes
+
+
+################################################################################
+
+class ProfilingTest(unittest.TestCase):
+
+    def test_report(self):
+        with Profiler() as profiler:
+            config = build_config('figura.tests.config.importer')
+        profiler.set_config(config)
+        out = io.StringIO()
+        profiler.report(out)
+        report = out.getvalue()
+        self.assertIn('import files', report)
+        self.assertIn('figura.tests.config.importer', report)
+        self.assertIn('figura.tests.config.importee', report)
+        self.assertIn('nodes: ', report)
+        self.assertFalse(tracing.is_enabled())
+
+    def test_file_stats_nesting(self):
+        profiler = Profiler()
+        emit = profiler.recorder
+        # importee is loaded while loading importer, and emitted first:
+        emit(tracing.TraceEvent(tracing.PHASE_IMPORT, 'importee', 1.5, 1., 1))
+        emit(tracing.TraceEvent(tracing.PHASE_IMPORT, 'importer', 1., 3., 1))
+        emit(tracing.TraceEvent(tracing.PHASE_IMPORT, 'other', 5., 1., 1))
+        stats = dict(profiler.get_file_stats())
+        self.assertEqual(3., stats['importer']['total'])
+        self.assertEqual(2., stats['importer']['self'])
+        self.assertEqual(1., stats['importee']['self'])
+        self.assertEqual(1., stats['other']['self'])
+        self.assertEqual(1, stats['other']['loads'])
+
+    def test_count_nodes(self):
+        config = ConfigContainer(a=1, b=ConfigContainer(c=2, d=ConfigContainer(e=3)))
+        self.assertEqual((3, 3, 3), count_nodes(config))
+        self.assertEqual((0, 1, 0), count_nodes(5))
+
+
+################################################################################
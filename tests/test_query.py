@@ -0,0 +1,142 @@
+"""
+Unit-tests of querying configs by path patterns.
+"""
+
+import pickle
+import unittest
+
+from figura import read_config
+from figura.errors import ConfigError
+from figura.container import ConfigContainer, copy_config_tree
+from figura.override import ConfigOverrideSet
+from figura.query import query, compile_query, get_path_index
+
+
+################################################################################
+
+def get_config():
+    return ConfigContainer.from_dict(dict(
+        web=dict(db=dict(host='h1', port=5432), enabled=True, name='web'),
+        jobs=dict(db=dict(host='h2', port=3306), enabled=False,
+                  workers=dict(db=dict(host='h3', port='5432'))),
+        db=dict(host='h0'),
+        version=3,
+    ))
+
+
+def paths(results):
+    return [path for path, _ in results]
+
+
+class QueryTest(unittest.TestCase):
+
+    def test_literal(self):
+        config = get_config()
+        self.assertEqual([('web.db.host', 'h1')], query(config, 'web.db.host'))
+        self.assertEqual([('version', 3)], config.query('version'))
+        self.assertEqual([], config.query('web.db.user'))
+        self.assertEqual([], config.query('version.x'))
+
+    def test_wildcard(self):
+        config = get_config()
+        self.assertEqual(
+            [('web.db.host', 'h1'), ('jobs.db.host', 'h2')], config.query('*.db.host'))
+        self.assertEqual(['web.db', 'web.enabled', 'web.name'], paths(config.query('web.*')))
+
+    def test_recursive_wildcard(self):
+        config = get_config()
+        self.assertEqual(
+            ['web.db.host', 'jobs.db.host', 'jobs.workers.db.host', 'db.host'],
+            paths(config.query('**.host')))
+        self.assertEqual(['jobs.db', 'jobs.workers.db'], paths(config.query('jobs.**.db')))
+        self.assertEqual(
+            ['jobs.workers.db', 'jobs.workers.db.host', 'jobs.workers.db.port'],
+            paths(config.query('jobs.**.workers.**.*')))
+        # the root itself is not matched
+        self.assertEqual(len(get_path_index(config).paths), len(config.query('**')))
+
+    def test_predicates(self):
+        config = get_config()
+        self.assertEqual(['web'], paths(config.query('**[enabled == True]')))
+        self.assertEqual(['web', 'jobs'], paths(config.query('*[enabled]')))
+        self.assertEqual(['web.db'], paths(config.query('**.db[port > 4000]')))
+        # comparing a str to an int is not an error, and does not match:
+        self.assertEqual(['jobs.workers.db'], paths(config.query("**.db[port == '5432']")))
+        self.assertEqual(['jobs'], paths(config.query('*[db.port <= 3306][workers]')))
+        self.assertEqual(['jobs.db.host'], paths(config.query('*[enabled != True].db.host')))
+        self.assertEqual([], config.query('*[version]'))
+
+    def test_invalid_patterns(self):
+        for pattern in ['', 'a..b', 'a.', '.a', 'a[b ~ 1]', 'a[b == x]', 'a[b']:
+            with self.assertRaises(ConfigError, msg=pattern):
+                compile_query(pattern)
+
+    def test_compiled_queries_are_cached(self):
+        self.assertIs(compile_query('a.*.b'), compile_query('a.*.b'))
+
+
+class PathIndexTest(unittest.TestCase):
+
+    def test_reused(self):
+        config = get_config()
+        index = get_path_index(config)
+        config.query('**.host')
+        config.query('web.*')
+        self.assertIs(index, get_path_index(config))
+
+    def test_invalidated_by_mutations(self):
+        config = get_config()
+        self.assertEqual(['web.db.host'], paths(config.query('web.**.host')))
+        config.web.db.deep_setattr('replica', ConfigContainer(host='h4'))
+        self.assertEqual(['web.db.host', 'web.db.replica.host'],
+                         paths(config.query('web.**.host')))
+        config.apply_overrides(ConfigOverrideSet({'web.db.replica.host': 'h5'}))
+        self.assertEqual('h5', config.query('web.db.replica.host')[0][1])
+        del config.web.db.replica
+        self.assertEqual(['web.db.host'], paths(config.query('web.**.host')))
+        config.web.db.update(port=1)
+        self.assertEqual([], config.query('web.db[port > 4000]'))
+
+    def test_not_invalidated_by_other_configs(self):
+        config = get_config()
+        other = get_config()
+        index = get_path_index(config)
+        other.web.db.port = 1
+        other.apply_overrides(ConfigOverrideSet({'jobs.enabled': True}))
+        read_config('figura.tests.config.basic1')
+        self.assertIs(index, get_path_index(config))
+
+    def test_shared_sections(self):
+        config = get_config()
+        other = config.copy()  # shallow: the sections are shared
+        index, other_index = get_path_index(config), get_path_index(other)
+        config.web.db.port = 1
+        self.assertIsNot(index, get_path_index(config))
+        self.assertIsNot(other_index, get_path_index(other))
+        self.assertEqual([], other.query('web.db[port > 4000]'))
+        # a section added after the index was built is tracked too
+        config.web.cache = ConfigContainer(port=5000)
+        self.assertEqual(['web.cache'], paths(config.query('**[port > 4000]')))
+        config.web.cache.port = 1
+        self.assertEqual([], config.query('**[port > 4000]'))
+
+    def test_not_copied_or_pickled(self):
+        config = get_config()
+        get_path_index(config)
+        for other in [copy_config_tree(config), config.copy(),
+                      pickle.loads(pickle.dumps(config))]:
+            self.assertNotIn('_path_index', other.__dict__)
+            self.assertEqual(['web.db.host'], paths(query(other, 'web.db.host')))
+        for other in [copy_config_tree(config), pickle.loads(pickle.dumps(config))]:
+            self.assertNotIn('_tree_versions', other.web.__dict__)
+
+    def test_deep(self):
+        config = ConfigContainer()
+        x = config
+        for _ in range(5000):
+            x.sub = ConfigContainer(value=1)
+            x = x.sub
+        self.assertEqual(5000, len(config.query('**.value')))
+
+
+################################################################################
@@ -0,0 +1,87 @@
+"""
+Unit-tests of schema validation.
+"""
+
+import unittest
+
+from figura import read_config, ConfigContainer
+from figura.errors import ConfigError, ConfigValidationError
+from figura.schema import Schema, Field, validate_config
+
+
+################################################################################
+
+SCHEMA_PATH = 'figura.tests.config.schema.server_schema'
+
+
+class SchemaTest(unittest.TestCase):
+
+    def test_valid(self):
+        config = read_config('figura.tests.config.schema.valid_server')
+        schema = Schema(SCHEMA_PATH)
+        self.assertEqual([], schema.validate(config))
+        self.assertIs(config, schema.check(config))
+
+    def test_invalid(self):
+        config = read_config('figura.tests.config.schema.invalid_server')
+        errors = dict(Schema(SCHEMA_PATH).validate(config))
+        self.assertEqual({
+            'host', 'port', 'log_level', 'workers.count', 'workers.queues',
+            'workers.enabled'}, set(errors))
+        self.assertIn('length must be >= 1', errors['host'])
+        self.assertIn('value must be <= 65535', errors['port'])
+        self.assertIn('must be one of', errors['log_level'])
+        self.assertEqual('expected int, got bool', errors['workers.count'])
+        self.assertEqual('item 1: expected str, got int', errors['workers.queues'])
+        self.assertEqual('missing required key', errors['workers.enabled'])
+
+    def test_check(self):
+        config = read_config('figura.tests.config.schema.invalid_server')
+        with self.assertRaises(ConfigValidationError) as cm:
+            validate_config(config, SCHEMA_PATH, allow_extra_keys=False)
+        self.assertEqual(7, len(cm.exception.errors))
+        self.assertIn(('extra', 'unexpected key'), cm.exception.errors)
+        self.assertIn('workers.queues', str(cm.exception))
+
+    def test_python_schema(self):
+        schema = Schema({
+            'a': Field('number', min=0),
+            'b': {'c': 'seq[int]', 'd': Field('any', required=False)},
+            'e': 'section',
+        })
+        self.assertEqual([], schema.validate(ConfigContainer.from_dict(
+            dict(a=1.5, b=dict(c=(1, 2)), e=dict(x=1)))))
+        errors = schema.validate(ConfigContainer.from_dict(dict(a=-1, b=3, e=None)))
+        self.assertEqual([
+            ('a', 'value must be >= 0 (got -1)'),
+            ('b', 'expected a section, got int'),
+            ('e', 'missing required key'),
+        ], errors)
+
+    def test_fractional_bounds(self):
+        for spec, lo, hi in [
+                ('float(0.5..1.5)', 0.5, 1.5), ('float(..2.5)', None, 2.5),
+                ('number(1e-3..)', 0.001, None), ('float(-2.5e2..1E3)', -250.0, 1000.0),
+                ('float(.5..1)', 0.5, 1)]:
+            field = Field.from_string(spec)
+            self.assertEqual((lo, hi), (field.min, field.max), spec)
+        schema = Schema({'a': 'float(0.5..1.5)'})
+        self.assertEqual([], schema.validate(ConfigContainer(a=1.0)))
+        self.assertEqual(
+            [('a', 'value must be >= 0.5 (got 0.25)')], schema.validate(ConfigContainer(a=0.25)))
+
+    def test_unhashable_choices(self):
+        schema = Schema({'a': 'any{x,y}'})
+        self.assertEqual([], schema.validate(ConfigContainer(a='x')))
+        self.assertEqual(
+            [('a', "must be one of ['x', 'y'] (got [1, 2])")],
+            schema.validate(ConfigContainer(a=[1, 2])))
+
+    def test_invalid_schema(self):
+        for spec in ['integer', 'int(1..', 'int[str]', 'list[foo]', 'int(a..b)',
+                     'list[int]{1,2}', 'seq{a}', 'section{a}']:
+            self.assertRaises(ConfigError, Schema, {'a': spec})
+        self.assertRaises(ConfigError, Schema, {'a': 1})
+
+
+################################################################################
@@ -0,0 +1,105 @@
+"""
+Unit-tests of the render server (``figura_print --serve``).
+"""
+
+import os
+import json
+import time
+import threading
+
+from figura.errors import ConfigError
+from figura.tools.serve import RenderServer, RenderService
+from figura.tools.client import RenderClient
+
+from .helpers import TempPackageTestCase
+
+
+################################################################################
+
+PACKAGE_NAME = 'figura_test_serve_pkg'
+
+
+class ServeTest(TempPackageTestCase):
+
+    PACKAGE_NAME = PACKAGE_NAME
+
+    def setUp(self):
+        super().setUp()
+        self.write('base.fig', 'from .imported import x\nclass sec:\n    a = 1\n')
+        self.write('imported.fig', 'x = 10\n')
+        self.socket_path = os.path.join(self.tempdir, 'figura.sock')
+        self.server = RenderServer(self.socket_path)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+        self.client = RenderClient(self.socket_path, timeout=10).connect()
+
+    def tearDown(self):
+        self.client.close()
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+    def write(self, filename, content):
+        path = os.path.join(self.pkg_dir, filename)
+        with open(path, 'w') as f:
+            f.write(content)
+        # make sure the modification time changes, even on coarse-grained filesystems:
+        mtime = time.time() + len(content)
+        os.utime(path, (mtime, mtime))
+
+    def render(self, *args, **kwargs):
+        return json.loads(self.client.render(*args, **kwargs))
+
+    def test_render(self):
+        config = self.render([PACKAGE_NAME + '.base'], 'sec.a=2')
+        self.assertEqual(dict(x=10, sec=dict(a='2')), config)
+        config = self.render([PACKAGE_NAME + '.base'])
+        self.assertEqual(1, config['sec']['a'])
+        self.assertRaises(ConfigError, self.client.render, [PACKAGE_NAME + '.nosuchfile'])
+        self.assertIn('error', self.client.request(dict(op='nosuchop')))
+
+    def test_not_modified(self):
+        path = PACKAGE_NAME + '.base'
+        request = dict(configs=[path])
+        response1 = self.client.request(request)
+        response2 = self.client.request(dict(request, etag=response1['etag']))
+        self.assertEqual(dict(etag=response1['etag'], not_modified=True), response2)
+        # the client re-uses outputs it received:
+        self.assertEqual(json.loads(response1['output']), self.render([path]))
+        self.assertEqual(json.loads(response1['output']), self.render([path]))
+        stats = self.client.stats()
+        self.assertEqual(1, stats['renders'])
+        self.assertEqual(2, stats['not_modified'])
+
+    def test_invalidation(self):
+        path = PACKAGE_NAME + '.base'
+        self.assertEqual(10, self.render([path])['x'])
+        # modify an imported file:
+        self.write('imported.fig', 'x = 20\n')
+        self.assertEqual(20, self.render([path])['x'])
+        self.assertEqual(1, self.client.stats()['config_invalidations'])
+        # add a file to the package:
+        self.assertNotIn('added', self.render([PACKAGE_NAME]))
+        self.write('added.fig', 'y = 1\n')
+        self.assertEqual(dict(y=1), self.render([PACKAGE_NAME])['added'])
+
+    def test_outputs_lru(self):
+        service = RenderService(maxsize=2)
+        path = PACKAGE_NAME + '.base'
+
+        def render(value):
+            response = service.handle(dict(configs=[path], overrides='sec.a=%d' % value))
+            return json.loads(response['output'])['sec']['a']
+
+        for value in [1, 2, 1, 3]:  # 2 is the least recently used when adding 3
+            self.assertEqual(str(value), render(value))
+        stats = service.stats()
+        self.assertEqual((3, 2), (stats['renders'], stats['cached_outputs']))
+        render(1)
+        render(3)
+        self.assertEqual(3, service.stats()['renders'])
+        render(2)
+        self.assertEqual((4, 2), (service.stats()['renders'], service.stats()['cached_outputs']))
+
+
+################################################################################
@@ -0,0 +1,140 @@
+"""
+Unit-tests of frozen configs, and of publishing config snapshots.
+"""
+
+import gc
+import copy
+import pickle
+import unittest
+import threading
+
+from figura.errors import ConfigError
+from figura.container import ConfigContainer
+from figura.override import ConfigOverrideSet
+from figura.snapshot import (
+    FrozenConfigContainer, ConfigSnapshotHolder, freeze_config, thaw_config,
+)
+
+
+################################################################################
+
+def get_config(value=1, d=(1, 2)):
+    return ConfigContainer.from_dict(dict(a=dict(b=dict(c=value)), d=list(d)))
+
+
+class FrozenTest(unittest.TestCase):
+
+    def test_frozen(self):
+        config = freeze_config(get_config())
+        self.assertIsInstance(config.a.b, FrozenConfigContainer)
+        self.assertEqual(get_config(), config)
+        for func in [
+            lambda: setattr(config, 'x', 1),
+            lambda: setattr(config.a.b, 'c', 2),
+            lambda: delattr(config, 'a'),
+            lambda: config.update(x=1),
+            lambda: config.a.setdefault('x', 1),
+            lambda: config.pop('a'),
+            lambda: config.clear(),
+            lambda: config.deep_setattr('a.b.c', 2),
+            lambda: config.apply_overrides(ConfigOverrideSet({'a.b.c': 2})),
+        ]:
+            with self.assertRaises(ConfigError):
+                func()
+        self.assertEqual(get_config(), config)
+
+    def test_copies(self):
+        orig = get_config()
+        orig.a.get_metadata().doc = 'doc'
+        config = freeze_config(orig)
+        orig.a.b.c = 2
+        self.assertEqual(1, config.a.b.c)
+        self.assertEqual('doc', config.a.get_metadata().doc)
+        self.assertIs(orig.d, config.d)  # leaf values are shared
+        thawed = thaw_config(config)
+        thawed.a.b.c = 3
+        self.assertEqual(1, config.a.b.c)
+        self.assertNotIsInstance(thawed.a, FrozenConfigContainer)
+        mutable = config.copy()
+        mutable.x = 1
+        self.assertNotIn('x', config)
+
+    def test_pickle(self):
+        config = freeze_config(get_config())
+        for other in [pickle.loads(pickle.dumps(config)), copy.deepcopy(config)]:
+            self.assertEqual(config, other)
+            self.assertIsInstance(other.a.b, FrozenConfigContainer)
+
+
+class HolderTest(unittest.TestCase):
+
+    def test_publish(self):
+        holder = ConfigSnapshotHolder()
+        self.assertIsNone(holder.get())
+        config = get_config()
+        snapshot = holder.publish(config)
+        self.assertIs(snapshot, holder.get())
+        self.assertEqual((1, snapshot), holder.get_with_version())
+        config.a.b.c = 2
+        self.assertEqual(1, holder.get().a.b.c)
+        holder.publish(config)
+        self.assertEqual(2, holder.version)
+        self.assertEqual(1, snapshot.a.b.c)  # old snapshots are unaffected
+        self.assertEqual(2, holder.get().a.b.c)
+
+    def test_update(self):
+        holder = ConfigSnapshotHolder(get_config(0))
+
+        def increment(config):
+            config.a.b.c += 1
+            return config
+
+        threads = [
+            threading.Thread(target=lambda: [holder.update(increment) for _ in range(50)])
+            for _ in range(4)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(200, holder.get().a.b.c)
+        self.assertEqual(201, holder.version)
+
+    def test_old_snapshots_reclaimed(self):
+        holder = ConfigSnapshotHolder(get_config(0))
+        in_use = holder.get()
+        for i in range(10):
+            holder.publish(get_config(i + 1))
+        gc.collect()
+        # the current snapshot, and the one still in use
+        self.assertEqual(2, holder.num_live_snapshots())
+        del in_use
+        gc.collect()
+        self.assertEqual(1, holder.num_live_snapshots())
+
+    def test_concurrent_readers(self):
+        holder = ConfigSnapshotHolder(get_config(0, d=[0]))
+        stop = threading.Event()
+        errors = []
+
+        def read():
+            while not stop.is_set():
+                config = holder.get()
+                # each snapshot is consistent, no matter what is published meanwhile
+                if config.a.b.c != config.d[0]:
+                    errors.append(config)
+
+        readers = [threading.Thread(target=read) for _ in range(4)]
+        for t in readers:
+            t.start()
+        try:
+            for i in range(200):
+                holder.publish(get_config(i, d=[i]))
+        finally:
+            stop.set()
+        for t in readers:
+            t.join()
+        self.assertEqual([], errors)
+
+
+################################################################################
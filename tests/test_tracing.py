@@ -0,0 +1,101 @@
+"""
+Unit-tests of the tracing hooks.
+"""
+
+import threading
+import unittest
+
+from figura import tracing, read_config, build_config
+from figura.tracing import TraceRecorder
+from figura.importer import _ImpLockedContext
+from figura.container import ConfigContainer
+from figura.override import apply_overrides_to_config
+
+
+################################################################################
+
+class TracingTest(unittest.TestCase):
+
+    def record(self, func, *args, **kwargs):
+        recorder = TraceRecorder()
+        with tracing.listening(recorder):
+            func(*args, **kwargs)
+        return recorder
+
+    def test_no_listeners(self):
+        self.assertFalse(tracing.is_enabled())
+        recorder = TraceRecorder()
+        with tracing.listening(recorder):
+            self.assertTrue(tracing.is_enabled())
+        self.assertFalse(tracing.is_enabled())
+        read_config('figura.tests.config.basic1')
+        self.assertEqual([], recorder.events)
+
+    def test_read_config_phases(self):
+        path = 'figura.tests.config.importer.some_params'
+        recorder = self.record(read_config, path)
+        phases = recorder.summary()
+        for phase in [tracing.PHASE_READ_CONFIG, tracing.PHASE_RESOLVE_PATH,
+                      tracing.PHASE_IMPORT, tracing.PHASE_COMPILE, tracing.PHASE_CONVERT,
+                      tracing.PHASE_OVERLAY]:
+            self.assertIn(phase, phases)
+        events = {(e.phase, e.name): e for e in recorder.events}
+        read_event = events[(tracing.PHASE_READ_CONFIG, path)]
+        # the importee is imported by the importer, so it is included in its duration:
+        importer = events[(tracing.PHASE_IMPORT, 'figura.tests.config.importer')]
+        importee = events[(tracing.PHASE_IMPORT, 'figura.tests.config.importee')]
+        self.assertGreaterEqual(importer.duration, importee.duration)
+        self.assertLessEqual(importer.start, importee.start)
+        # all other phases are included in read_config:
+        for event in recorder.events:
+            self.assertGreaterEqual(event.start, read_event.start)
+            self.assertLessEqual(event.duration, read_event.duration)
+
+    def test_walk_package(self):
+        recorder = self.record(read_config, 'figura.tests.config.deep1')
+        walks = [e for e in recorder.events if e.phase == tracing.PHASE_WALK_PACKAGE]
+        self.assertEqual(1, len(walks))
+        self.assertEqual('figura.tests.config.deep1', walks[0].name)
+        self.assertEqual(3, walks[0].count)  # conf1, deep2 and deep2.conf2
+
+    def test_apply_overrides(self):
+        recorder = self.record(
+            build_config,
+            'figura.tests.config.override.A', 'figura.tests.config.override.A3_overrides')
+        events = [e for e in recorder.events if e.phase == tracing.PHASE_APPLY_OVERRIDES]
+        self.assertEqual(1, len(events))
+        self.assertEqual(3, events[0].count)  # a, B, D
+
+    def test_apply_unnamed_overrides(self):
+        # e.g. a plain dict, which has no __name__
+        for overrides in [{'a': 2}, ConfigContainer(a=2)]:
+            config = ConfigContainer(a=1)
+            recorder = self.record(
+                apply_overrides_to_config, config, overrides, enforce_override_set=False)
+            self.assertEqual(2, config.a)
+            events = [e for e in recorder.events if e.phase == tracing.PHASE_APPLY_OVERRIDES]
+            self.assertEqual([None], [e.name for e in events])
+
+    def test_lock_wait(self):
+        locked = threading.Event()
+        release = threading.Event()
+
+        def hold_lock():
+            with _ImpLockedContext():
+                locked.set()
+                release.wait()
+
+        thread = threading.Thread(target=hold_lock)
+        thread.start()
+        locked.wait()
+        recorder = TraceRecorder()
+        with tracing.listening(recorder):
+            threading.Timer(0.05, release.set).start()
+            read_config('figura.tests.config.basic1')
+        thread.join()
+        waits = [e for e in recorder.events if e.phase == tracing.PHASE_LOCK_WAIT]
+        self.assertEqual(1, len(waits))
+        self.assertGreater(waits[0].duration, 0.01)
+
+
+################################################################################
@@ -0,0 +1,82 @@
+"""
+Unit-tests of loading figura config files from zip archives.
+"""
+
+import os
+import sys
+import shutil
+import zipfile
+import tempfile
+import unittest
+import importlib
+
+from figura import read_config, build_config
+from figura.errors import ConfigError
+
+
+################################################################################
+
+PACKAGE_NAME = 'figura_test_zip_pkg'
+
+FILES = {
+    '__init__.fig': 'top = 1\n',
+    'base.fig': 'class section:\n    a = 1\n    b = "bee"\n',
+    'derived.fig': 'from .base import section\n\nclass more:\n    c = [1, 2]\n',
+    'overrides.fig': '__override__ = True\n\nclass section:\n    a = 100\n',
+    '_private.fig': 'x = 1\n',
+    'helper.py': 'VALUE = 7\n',
+    'sub/__init__.fig': '',
+    'sub/leaf.fig': 'from ..helper import VALUE as _VALUE\n\nvalue = _VALUE\n',
+}
+
+
+class ZipImportTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp(prefix='figura_test_')
+        self.archive = os.path.join(self.tempdir, 'configs.zip')
+        self.write_archive(FILES)
+        sys.path.insert(0, self.archive)
+
+    def tearDown(self):
+        sys.path.remove(self.archive)
+        for key in list(sys.path_importer_cache):
+            if key.startswith(self.archive):
+                del sys.path_importer_cache[key]
+        shutil.rmtree(self.tempdir)
+
+    def write_archive(self, files):
+        with zipfile.ZipFile(self.archive, 'w') as zf:
+            for filename, content in sorted(files.items()):
+                zf.writestr('%s/%s' % (PACKAGE_NAME, filename), content)
+
+    def test_read_module(self):
+        c = read_config('%s.derived' % PACKAGE_NAME)
+        self.assertEqual({'a': 1, 'b': 'bee'}, c.section)
+        self.assertEqual([1, 2], c.more.c)
+        self.assertEqual(os.path.join(self.archive, PACKAGE_NAME, 'derived.fig'), c.__file__)
+
+    def test_read_attr_path(self):
+        self.assertEqual('bee', read_config('%s.base.section.b' % PACKAGE_NAME))
+
+    def test_read_package(self):
+        c = read_config(PACKAGE_NAME)
+        self.assertEqual(['base', 'derived', 'overrides', 'sub', 'top'], sorted(c))
+        self.assertEqual(7, c.sub.leaf.value)
+
+    def test_build_config(self):
+        c = build_config('%s.base' % PACKAGE_NAME, '%s.overrides' % PACKAGE_NAME)
+        self.assertEqual(100, c.section.a)
+
+    def test_missing(self):
+        with self.assertRaises(ConfigError):
+            read_config('%s.no_such_conf' % PACKAGE_NAME)
+
+    def test_modified_archive(self):
+        self.assertEqual(1, read_config('%s.base.section.a' % PACKAGE_NAME))
+        self.write_archive(dict(FILES, **{'base.fig': 'class section:\n    a = 2\n'}))
+        importlib.invalidate_caches()
+        self.assertEqual(2, read_config('%s.base.section.a' % PACKAGE_NAME))
+
+
+################################################################################